@@ -0,0 +1,255 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from ai.trends_engine import (
+    InsightsRollupStore,
+    KeywordMatcher,
+    SharedHTTPSession,
+    TrendRecord,
+    TrendsCache,
+    TrendsFetcher,
+    VIRAL_KEYWORD_TIERS,
+    dynamic_pricing_batch,
+    dynamic_pricing_suggestion,
+    generate_weekly_insights,
+    fetch_viral_trends,
+    get_viral_scanner,
+)
+
+
+def _naive_counts(text):
+    text = text.lower()
+    return [sum(1 for word in words if word in text) for _, words, _ in VIRAL_KEYWORD_TIERS]
+
+
+def test_keyword_matcher_matches_substring_semantics():
+    matcher = KeywordMatcher([(name, words) for name, words, _ in VIRAL_KEYWORD_TIERS])
+    samples = ["AI chair", "Smartwatch", "Gaming Headset Wireless", "techno digital", "plain", ""]
+    for text in samples:
+        assert matcher.counts(text) == _naive_counts(text)
+
+
+def test_keyword_matcher_counts_prefix_keywords():
+    matcher = KeywordMatcher([("t", ["smart", "smartwatch", "watch"])])
+    assert matcher.find("SmartWatch pro") == {"smart", "smartwatch", "watch"}
+
+    # bitset: كلمة مشتركة بين جدولين تضيء البتين
+    shared = KeywordMatcher([("a", ["phone case", "cable"]), ("b", ["phone", "charger"]), ("c", ["toy"])])
+    assert shared.mask("Phone Case") == 0b011
+    assert shared.mask("USB cable") == 0b001 and shared.mask("plain") == 0
+
+
+def test_score_batch_range_and_order():
+    fetcher = TrendsFetcher()
+    keywords = ["AI robot", "blue sky over sea", "gaming chair"] * 100
+    scores = fetcher.score_batch(keywords, rng=np.random.default_rng(0))
+    assert scores.shape == (300,)
+    assert scores.min() >= 5 and scores.max() <= 100
+    # كلمات بلا مطابقات لا تتجاوز 50 + 15
+    assert scores[1::3].max() <= 65
+
+
+def test_analyze_many_returns_record_per_keyword():
+    fetcher = TrendsFetcher()
+    results = asyncio.run(fetcher.analyze_many(["AI", "phone case"]))
+    assert [r["keyword"] for r in results] == ["AI", "phone case"]
+    assert all(5 <= r["overall_viral_score"] <= 100 for r in results)
+
+
+def test_analyze_combined_trends_marks_timed_out_stage_degraded():
+    fetcher = TrendsFetcher()
+    fetcher.stage_timeouts["market_data"] = 0.01
+    result = asyncio.run(fetcher.analyze_combined_trends("gaming chair"))
+    assert result["degraded_sections"] == ["market_data"]
+    assert result["data_source"] == "partial_multi_source"
+    assert "error" in result["market_data"]
+    assert "positive" in result["social_sentiment"]
+
+
+def test_trends_cache_evicts_least_recently_used():
+    cache = TrendsCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_trends_cache_expires_entries():
+    cache = TrendsCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_trends_cache_coalesces_concurrent_requests():
+    cache = TrendsCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"value": 42} for r in results)
+    assert cache.stats()["coalesced_requests"] == 9
+
+
+def test_trends_cache_cancelled_leader_does_not_cancel_waiters():
+    cache = TrendsCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {"value": 7}
+
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == ({"value": 7}, True)
+    assert cache.get("k") == {"value": 7}
+    assert cache.stats()["inflight"] == 0
+
+
+def test_shared_http_session_closes_session_of_previous_loop():
+    http = SharedHTTPSession()
+    first = asyncio.run(http.get())
+    second = asyncio.run(http.get())
+    assert first is not second
+    assert first.closed and not second.closed
+    asyncio.run(http.close())
+    assert second.closed
+
+
+def test_fetch_viral_trends_uses_shared_scanner_and_plain_dicts():
+    assert get_viral_scanner() is get_viral_scanner()
+    result = fetch_viral_trends("gaming", 4)
+    assert len(result["top_keywords"]) == 4
+    assert all(isinstance(t, dict) and "entry_cost" in t for t in result["top_keywords"])
+    assert not hasattr(TrendRecord("k", 50, "", "", "", "", "", "", "", "", "", ""), "__dict__")
+
+
+def test_dynamic_pricing_batch_vectorizes_catalog():
+    frame = pd.DataFrame({
+        "base_price": [10.0, 150.0, 60.0],
+        "viral_score": [95, 20, 70],
+        "category": ["Technology", "home", "unknown"],
+    })
+    result = dynamic_pricing_batch(frame=frame, explain=[0], rng=np.random.default_rng(3))
+    assert list(result["category_factor"]) == [1.2, 1.0, 1.0]
+    assert list(result["price_factor"]) == [1.15, 1.0, 1.05]
+    assert (result["suggested_price"] > result["base_price"]).all()
+    assert result["confidence"].between(45, 98).all()
+    assert isinstance(result.loc[0, "pricing_strategy"], str)
+    assert pd.isna(result.loc[1, "pricing_strategy"])
+
+
+def test_pricing_and_insights_build_only_requested_sections():
+    pricing = dynamic_pricing_suggestion(19.99, 75, fields=("recommendation",))
+    assert "recommendation" in pricing
+    assert "comparative_analysis" not in pricing and "market_forecast" not in pricing
+
+    insights = generate_weekly_insights(categories=["Gaming"], sections=["market_overview"])
+    assert list(insights) == ["market_overview"]
+
+
+def test_insights_rollup_folds_daily_summaries_into_week():
+    from datetime import date, timedelta
+
+    store = InsightsRollupStore(window_days=7)
+    today = date.today()
+    store.record("Gaming", [{"keyword": "d", "viral_score": 10}], day=today - timedelta(days=9))
+    store.record("Gaming", [{"keyword": "c", "viral_score": 40}], day=today - timedelta(days=1))
+    store.record("Gaming", [{"keyword": "a", "viral_score": 80}, {"keyword": "b", "viral_score": 60}], day=today)
+
+    summary = store.summary("gaming", today=today)
+    assert summary["count"] == 3
+    assert summary["mean"] == 60
+    assert summary["max"] == 80
+    assert summary["top_trend"] == "a"
+
+
+def test_insights_rollup_job_survives_failed_refresh():
+    import threading
+
+    store = InsightsRollupStore(refresh_interval=0)
+    calls = []
+
+    def refresh(categories):
+        calls.append(threading.current_thread() is threading.main_thread())
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+
+    store.refresh = refresh
+
+    async def run():
+        task = asyncio.get_running_loop().create_task(store.run_forever(["Gaming"]))
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(run())
+    assert calls[:2] == [False, False]
+
+
+def test_seasonal_index_matches_rule_tables():
+    from seasonality import PRODUCT_DEMAND_RULES, PRODUCT_RISK_RULES, get_seasonal_index
+
+    names = ["Christmas Gift Box", "Beach Towel", "Laptop Stand", "Yoga Mat", "Winter Coat", "Plain Mug"]
+    for month in range(1, 13):
+        index = get_seasonal_index(month)
+        for name in names:
+            lower = name.lower()
+            expected_factor = 1.0
+            for words, months, off_season in PRODUCT_DEMAND_RULES:
+                if any(word in lower for word in words):
+                    expected_factor = next((f for group, f in months.items() if month in group), off_season)
+                    break
+            expected_risk = 10
+            for _, words, peak in PRODUCT_RISK_RULES:
+                if any(word in lower for word in words):
+                    expected_risk += 5 if month in peak else 50
+                    break
+            assert index.product_factor(name) == expected_factor
+            assert index.product_risk(name) == expected_risk
+        assert list(index.product_factors(names)) == [index.product_factor(n) for n in names]
+        assert list(index.product_risks(names)) == [index.product_risk(n) for n in names]
+
+    assert get_seasonal_index(12).viral_boost("Gaming") == 15
+    assert get_seasonal_index(4).viral_boost("Gaming") == 0
+    assert get_seasonal_index(10).category_impact("gaming")["is_peak_season"] is True
+
+
+def test_weekly_insights_reports_slow_category_as_partial(monkeypatch):
+    import time
+
+    import ai.trends_engine as engine
+
+    real_fetch = engine.fetch_viral_trends
+
+    def fetch(category, limit=10):
+        if category == "Home":
+            time.sleep(0.5)
+        return real_fetch(category, limit=limit)
+
+    monkeypatch.setattr(engine, "fetch_viral_trends", fetch)
+    categories = ["Gaming", "Home", "Beauty"]
+    insights = generate_weekly_insights(categories=categories, use_rollup=False, category_timeout=0.2)
+
+    assert list(insights["category_analysis"]) == categories
+    assert insights["category_analysis"]["Home"]["timed_out"] is True
+    assert "average_score" in insights["category_analysis"]["Beauty"]
+    assert insights["analysis_metadata"]["partial_categories"] == ["Home"]
@@ -6,27 +6,294 @@
 """
 
 import random
+import json
+import time
 import asyncio
 import aiohttp
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Callable, Awaitable
 import logging
 import os
+import threading
+from datetime import date
 from dotenv import load_dotenv
 
+from keyword_matcher import KeywordMatcher
+from seasonality import get_seasonal_index, VIRAL_SEASONAL_FACTORS, VIRAL_SEASONAL_BOOST
+
 # تحميل متغيرات البيئة
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# جداول الكلمات الساخنة (2024-2025) مع نطاق النقاط لكل مستوى
+VIRAL_KEYWORD_TIERS = (
+    ("ultra_hot", ('ai', 'chatgpt', 'robot', 'smart', 'crypto', 'nft', 'metaverse'), (25, 35)),
+    ("hot", ('wireless', 'bluetooth', 'gaming', 'fitness', 'tech', 'digital'), (15, 25)),
+    ("trending", ('earbuds', 'watch', 'phone', 'chair', 'headset', 'speaker'), (8, 18)),
+)
+
+_VIRAL_MATCHER = KeywordMatcher([(name, words) for name, words, _ in VIRAL_KEYWORD_TIERS])
+
+# المهلة القصوى (ثوانٍ) لكل مصدر بيانات في التحليل المدمج
+STAGE_TIMEOUTS = {
+    "reddit": 3.0,
+    "market_data": 5.0,
+    "social_sentiment": 5.0
+}
+
+# إعدادات اتصالات HTTP المشتركة لكل مصادر الترندات
+HTTP_POOL_SETTINGS = {
+    "limit": 100,             # أقصى عدد اتصالات إجمالي
+    "limit_per_host": 10,     # أقصى عدد اتصالات لكل مضيف
+    "ttl_dns_cache": 300,     # كاش DNS (ثوانٍ)
+    "keepalive_timeout": 30,  # إبقاء الاتصال مفتوحاً (ثوانٍ)
+    "total_timeout": 30       # مهلة الطلب الكاملة (ثوانٍ)
+}
+
+class SharedHTTPSession:
+    """
+    🌐 جلسة aiohttp مشتركة على مستوى التطبيق
+    
+    تُنشأ عند أول استخدام وتُعاد لكل الطلبات (keep-alive + كاش DNS)،
+    وتُعاد إنشاؤها تلقائياً إذا أُغلقت أو تغيرت حلقة الأحداث (مع إغلاق الجلسة السابقة).
+    """
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = dict(HTTP_POOL_SETTINGS, **(settings or {}))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def get(self) -> aiohttp.ClientSession:
+        """الحصول على الجلسة المشتركة (إنشاؤها عند الحاجة)"""
+        loop = asyncio.get_running_loop()
+        if self._is_usable(loop):
+            return self._session
+        
+        stale: Optional[Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = None
+        if self._lock is None or self._loop is not loop:
+            if self.is_open:
+                # جلسة من حلقة أحداث سابقة لا يمكن استخدامها هنا - تُغلق بدل تركها مفتوحة
+                stale = (self._session, self._loop)
+                self._session = None
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        
+        if stale is not None:
+            await self._close_stale(*stale)
+        
+        async with self._lock:
+            if not self._is_usable(loop):
+                self._session = self._create_session()
+                logger.info("🌐 Shared HTTP session created")
+        
+        return self._session
+    
+    @staticmethod
+    async def _close_stale(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]):
+        """إغلاق جلسة حلقة أحداث سابقة - على حلقتها إن كانت ما زالت تعمل"""
+        logger.warning("⚠️ Closing HTTP session bound to another event loop")
+        try:
+            if loop is not None and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                # الحلقة السابقة متوقفة - الإغلاق هنا يحرر الـ connector ويعلم الجلسة كمغلقة
+                await session.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to close stale HTTP session: {e}")
+    
+    async def close(self):
+        """إغلاق الجلسة وتحرير الاتصالات"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("🔌 Shared HTTP session closed")
+    
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None and not self._session.closed
+    
+    def _is_usable(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self.is_open and self._loop is loop
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.settings["limit"],
+            limit_per_host=self.settings["limit_per_host"],
+            ttl_dns_cache=self.settings["ttl_dns_cache"],
+            keepalive_timeout=self.settings["keepalive_timeout"]
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.settings["total_timeout"]),
+            headers={"User-Agent": os.getenv('REDDIT_USER_AGENT', 'bravebot/1.0')}
+        )
+
+_shared_http_session = SharedHTTPSession()
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """الجلسة المشتركة لكل طلبات الترندات الخارجية"""
+    return await _shared_http_session.get()
+
+async def close_http_session():
+    """إغلاق الجلسة المشتركة - يُستدعى عند إيقاف التطبيق"""
+    await _shared_http_session.close()
+
+class TrendsCache:
+    """
+    🗃️ كاش محدود الحجم مع TTL و LRU ودمج الطلبات المتزامنة
+    
+    - حد أقصى لعدد العناصر وللحجم التقريبي بالبايت
+    - انتهاء الصلاحية بساعة monotonic (لا تتأثر بتغيير الوقت)
+    - الطلبات المتزامنة لنفس المفتاح تنتظر حساباً واحداً (single-flight)
+    """
+    
+    def __init__(self, max_entries: int = 512, max_bytes: int = 8 * 1024 * 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """جلب قيمة صالحة (ونقلها لآخر ترتيب LRU)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """حفظ قيمة مع إخلاء الأقدم استخداماً عند تجاوز الحدود"""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"⚠️ Cache entry too large to store: {key} ({size} bytes)")
+            return
+        
+        if key in self._entries:
+            self._remove(key)
+        
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+    
+    def clear(self):
+        """مسح الكاش بالكامل"""
+        self._entries.clear()
+        self._bytes = 0
+    
+    async def get_or_compute(self, key: str, factory: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        جلب من الكاش أو الحساب مرة واحدة لكل الطلبات المتزامنة
+        
+        Args:
+            key: مفتاح الكاش
+            factory: دالة تعيد coroutine للحساب
+            cacheable: شرط حفظ النتيجة (النتائج الجزئية تُشارك لكن لا تُحفظ)
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # الحساب مهمة مستقلة - إلغاء أي طالب (حتى الأول) لا يلغيه للبقية
+            task = asyncio.ensure_future(self._compute(key, factory, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._compute_done(key, done))
+        return await asyncio.shield(task)
+    
+    async def _compute(self, key: str, factory: Callable[[], Awaitable[Any]],
+                       cacheable: Optional[Callable[[Any], bool]]) -> Any:
+        value = await factory()
+        if cacheable is None or cacheable(value):
+            self.set(key, value)
+        return value
+    
+    def _compute_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # تجنب تحذير "exception was never retrieved" إذا أُلغي كل المنتظرين
+        if not task.cancelled():
+            task.exception()
+    
+    def stats(self) -> Dict[str, Any]:
+        """إحصائيات الكاش"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced_requests": self.coalesced,
+            "inflight": len(self._inflight)
+        }
+    
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """تقدير حجم القيمة بالبايت (حجم JSON)"""
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+        except (TypeError, ValueError):
+            return len(repr(value))
+
 class TrendsFetcher:
     """جالب الترندات المتقدم مع دعم APIs متعددة"""
     
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, cache_ttl: float = 300, cache_max_entries: int = 512):
+        self.cache = TrendsCache(max_entries=cache_max_entries, ttl=cache_ttl)
         self.last_update = datetime.now()
         self.reddit_enabled = bool(os.getenv('REDDIT_CLIENT_ID'))
-        self.session = None
+        self.http = _shared_http_session
+        self.stage_timeouts = dict(STAGE_TIMEOUTS)
         
         # إعدادات Reddit
         if self.reddit_enabled:
@@ -39,20 +306,40 @@ class TrendsFetcher:
     async def analyze_combined_trends(self, keyword: str, **kwargs) -> Dict[str, Any]:
         """تحليل الترندات المدمج من مصادر متعددة"""
         
-        # فحص الكاش أولاً
+        # الكاش أولاً - والطلبات المتزامنة لنفس الكلمة تتشارك حساباً واحداً
         cache_key = f"trends_{keyword.lower()}"
         if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            if (datetime.now() - cached_data['timestamp']).seconds < 300:  # 5 دقائق
-                logger.info(f"📋 Returning cached data for: {keyword}")
-                return cached_data['data']
+            logger.info(f"📋 Returning cached data for: {keyword}")
         
-        # تحليل متقدم
+        return await self.cache.get_or_compute(
+            cache_key,
+            lambda: self._compute_combined_trends(keyword),
+            cacheable=lambda result: not result.get("degraded_sections") and "error" not in result
+        )
+    
+    async def _compute_combined_trends(self, keyword: str) -> Dict[str, Any]:
+        """الحساب الفعلي للتحليل المدمج (بدون كاش)"""
+        
+        # تحليل متقدم - المصادر المستقلة تعمل بالتوازي
         try:
-            viral_score = await self._calculate_advanced_viral_score(keyword)
+            (reddit_boost, reddit_ok), (market_data, market_ok), (social_sentiment, sentiment_ok) = await asyncio.gather(
+                self._run_stage("reddit", self._get_reddit_trend_boost(keyword), 0)
+                if self.reddit_enabled else self._skip_stage(0),
+                self._run_stage("market_data", self._fetch_market_data(keyword),
+                                {"error": "Market data unavailable"}),
+                self._run_stage("social_sentiment", self._analyze_social_sentiment(keyword),
+                                {"error": "Sentiment data unavailable"})
+            )
+            
+            viral_score = await self._calculate_advanced_viral_score(keyword, reddit_boost=reddit_boost)
             category = self._categorize_trend(viral_score)
             recommendations = self._generate_smart_recommendations(viral_score, keyword)
-            market_data = await self._fetch_market_data(keyword)
+            
+            degraded_sections = [
+                name for name, ok in (("reddit", reddit_ok), ("market_data", market_ok),
+                                      ("social_sentiment", sentiment_ok))
+                if not ok
+            ]
             
             result = {
                 "keyword": keyword,
@@ -60,20 +347,15 @@ class TrendsFetcher:
                 "trend_category": category,
                 "recommendations": recommendations,
                 "confidence": random.randint(75, 95),
-                "data_source": "advanced_multi_source",
+                "data_source": "partial_multi_source" if degraded_sections else "advanced_multi_source",
                 "timestamp": datetime.now().isoformat(),
                 "market_potential": self._assess_market_potential(viral_score),
                 "competition_level": self._assess_competition(keyword),
                 "growth_forecast": self._forecast_growth(viral_score),
                 "market_data": market_data,
-                "social_sentiment": await self._analyze_social_sentiment(keyword),
-                "search_volume": self._estimate_search_volume(keyword, viral_score)
-            }
-            
-            # حفظ في الكاش
-            self.cache[cache_key] = {
-                'data': result,
-                'timestamp': datetime.now()
+                "social_sentiment": social_sentiment,
+                "search_volume": self._estimate_search_volume(keyword, viral_score),
+                "degraded_sections": degraded_sections
             }
             
             return result
@@ -82,58 +364,169 @@ class TrendsFetcher:
             logger.error(f"❌ Advanced analysis failed for {keyword}: {e}")
             return self._fallback_analysis(keyword)
     
-    async def _calculate_advanced_viral_score(self, keyword: str) -> int:
-        """حساب نقاط الفيروسية المتقدم"""
+    async def _run_stage(self, name: str, coro, fallback: Any) -> Tuple[Any, bool]:
+        """
+        تشغيل مرحلة تحليل بمهلة محددة
+        
+        Returns:
+            (النتيجة، نجحت؟) - عند الفشل أو انتهاء المهلة تُعاد القيمة الاحتياطية
+        """
+        try:
+            result = await asyncio.wait_for(coro, timeout=self.stage_timeouts.get(name, 5.0))
+        except asyncio.TimeoutError:
+            logger.warning(f"⏰ Stage '{name}' timed out - marking as degraded")
+            return fallback, False
+        except Exception as e:
+            logger.warning(f"⚠️ Stage '{name}' failed: {e} - marking as degraded")
+            return fallback, False
+        
+        if isinstance(result, dict) and "error" in result:
+            return result, False
+        return result, True
+    
+    @staticmethod
+    async def _skip_stage(value: Any) -> Tuple[Any, bool]:
+        """مرحلة غير مفعلة - تُعتبر ناجحة"""
+        return value, True
+    
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """الجلسة المشتركة الحالية (None قبل أول طلب)"""
+        return self.http._session if self.http.is_open else None
+    
+    async def _calculate_advanced_viral_score(self, keyword: str, reddit_boost: Optional[int] = None) -> int:
+        """
+        حساب نقاط الفيروسية المتقدم
+        
+        Args:
+            keyword: الكلمة المفتاحية
+            reddit_boost: دفعة Reddit المحسوبة مسبقاً (وإلا تُجلب هنا)
+        """
         
         base_score = 50
         
-        # تحليل الكلمة المفتاحية المتقدم
-        keyword_lower = keyword.lower()
+        # تحليل الكلمة المفتاحية المتقدم (تمريرة واحدة على كل الجداول)
+        found = _VIRAL_MATCHER.find(keyword)
+        for tier_index, (tier, words, (low, high)) in enumerate(VIRAL_KEYWORD_TIERS):
+            for word in words:
+                if word in found:
+                    base_score += random.randint(low, high)
+                    if tier_index == 0:
+                        logger.info(f"🔥 Ultra hot keyword detected: {word}")
         
-        # كلمات عالية الترند (2024-2025)
-        ultra_hot_keywords = ['ai', 'chatgpt', 'robot', 'smart', 'crypto', 'nft', 'metaverse']
-        hot_keywords = ['wireless', 'bluetooth', 'gaming', 'fitness', 'tech', 'digital']
-        trending_keywords = ['earbuds', 'watch', 'phone', 'chair', 'headset', 'speaker']
+        base_score += self._keyword_shape_bonus(keyword, datetime.now().month)
         
-        # نقاط الكلمات الساخنة جداً
-        for ultra_word in ultra_hot_keywords:
-            if ultra_word in keyword_lower:
-                base_score += random.randint(25, 35)
-                logger.info(f"🔥 Ultra hot keyword detected: {ultra_word}")
+        # إضافة عشوائية للواقعية
+        base_score += random.randint(-8, 15)
         
-        # نقاط الكلمات الساخنة
-        for hot_word in hot_keywords:
-            if hot_word in keyword_lower:
-                base_score += random.randint(15, 25)
+        # محاكاة بيانات من APIs (إذا كانت متاحة)
+        if reddit_boost is not None:
+            base_score += reddit_boost
+        elif self.reddit_enabled:
+            base_score += await self._get_reddit_trend_boost(keyword)
         
-        # نقاط الكلمات الترندية
-        for trend_word in trending_keywords:
-            if trend_word in keyword_lower:
-                base_score += random.randint(8, 18)
+        # ضمان النطاق 0-100
+        return max(5, min(100, base_score))
+    
+    @staticmethod
+    def _keyword_shape_bonus(keyword: str, current_month: int) -> int:
+        """نقاط طول الكلمة والعامل الموسمي (بدون عشوائية)"""
+        bonus = 0
         
         # تحليل طول الكلمة (الكلمات المحددة أفضل)
         word_count = len(keyword.split())
         if word_count == 2:
-            base_score += 5  # مثل "AI technology"
+            bonus += 5  # مثل "AI technology"
         elif word_count > 3:
-            base_score -= 3  # الكلمات الطويلة أقل ترنداً
+            bonus -= 3  # الكلمات الطويلة أقل ترنداً
         
         # عامل الوقت (بعض الكلمات موسمية)
-        current_month = datetime.now().month
+        keyword_lower = keyword.lower()
         if 'fitness' in keyword_lower and current_month in [1, 6, 7]:  # يناير وصيف
-            base_score += 10
+            bonus += 10
         elif 'gaming' in keyword_lower and current_month in [11, 12]:  # موسم الألعاب
-            base_score += 8
+            bonus += 8
         
-        # إضافة عشوائية للواقعية
-        base_score += random.randint(-8, 15)
+        return bonus
+    
+    def score_batch(self, keywords: Sequence[str], reddit_boost: Optional[np.ndarray] = None,
+                    rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        📦 حساب نقاط الفيروسية لدفعة كلمات بتمريرة واحدة
         
-        # محاكاة بيانات من APIs (إذا كانت متاحة)
-        if self.reddit_enabled:
-            base_score += await self._get_reddit_trend_boost(keyword)
+        Args:
+            keywords: قائمة الكلمات المفتاحية
+            reddit_boost: دفعة Reddit لكل كلمة (اختياري)
+            rng: مولد أرقام عشوائية (للاختبار)
+            
+        Returns:
+            مصفوفة int بنفس ترتيب الكلمات (النطاق 5-100)
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        count = len(keywords)
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
         
-        # ضمان النطاق 0-100
-        return max(5, min(100, base_score))
+        hits = _VIRAL_MATCHER.count_matrix(keywords)
+        scores = np.full(count, 50, dtype=np.int64)
+        
+        # مجموع k سحبات randint(low, high) لكل مستوى = k*low + مجموع k سحبات من [0, span]
+        for tier_index, (_, _, (low, high)) in enumerate(VIRAL_KEYWORD_TIERS):
+            tier_hits = hits[:, tier_index]
+            max_hits = int(tier_hits.max())
+            if max_hits == 0:
+                continue
+            draws = rng.integers(0, high - low + 1, size=(count, max_hits))
+            mask = np.arange(max_hits) < tier_hits[:, None]
+            scores += tier_hits * low + (draws * mask).sum(axis=1)
+        
+        current_month = datetime.now().month
+        scores += np.fromiter(
+            (self._keyword_shape_bonus(k, current_month) for k in keywords),
+            dtype=np.int64, count=count
+        )
+        scores += rng.integers(-8, 16, size=count)
+        
+        if reddit_boost is not None:
+            scores += np.asarray(reddit_boost, dtype=np.int64)
+        
+        return np.clip(scores, 5, 100)
+    
+    async def analyze_many(self, keywords: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        📊 تحليل مختصر لعدد كبير من الكلمات (للتحليل الليلي)
+        
+        يعيد النقاط والتصنيف فقط لكل كلمة، بدون بيانات السوق والمشاعر.
+        """
+        keywords = list(keywords)
+        reddit_boost = await self._get_reddit_trend_boost_batch(len(keywords)) if self.reddit_enabled else None
+        scores = self.score_batch(keywords, reddit_boost=reddit_boost)
+        
+        return [
+            {
+                "keyword": keyword,
+                "overall_viral_score": int(score),
+                "trend_category": self._categorize_trend(int(score))
+            }
+            for keyword, score in zip(keywords, scores)
+        ]
+    
+    async def _get_reddit_trend_boost_batch(self, count: int) -> np.ndarray:
+        """دفعة Reddit لعدة كلمات بطلب واحد"""
+        try:
+            # محاكاة طلب Reddit API واحد للدفعة كاملة
+            await asyncio.sleep(0.1)
+            
+            rng = np.random.default_rng()
+            mentions = rng.integers(0, 51, size=count)
+            return np.select(
+                [mentions > 30, mentions > 15],
+                [rng.integers(10, 21, size=count), rng.integers(5, 13, size=count)],
+                default=rng.integers(0, 6, size=count)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Reddit API simulation failed: {e}")
+            return np.zeros(count, dtype=np.int64)
     
     async def _get_reddit_trend_boost(self, keyword: str) -> int:
         """الحصول على دفعة من Reddit trends"""
@@ -332,103 +725,140 @@ class TrendsFetcher:
             "error": "Advanced analysis failed - using fallback"
         }
 
+# بيانات الفئات الثابتة - تُبنى مرة واحدة لكل العملية ولا تتغير
+VIRAL_TRENDING_CATEGORIES = MappingProxyType({
+    "technology": (
+        "AI Assistant", "ChatGPT Alternative", "Smart Robot", "Wireless Earbuds", 
+        "Smart Watch", "Robot Vacuum", "Gaming Headset", "VR Glasses",
+        "Smart Speaker", "Drone Camera", "3D Printer", "Smart Ring"
+    ),
+    "gaming": (
+        "Gaming Chair RGB", "Mechanical Keyboard", "Gaming Mouse Wireless", 
+        "RGB Lighting Kit", "VR Headset Meta", "Gaming Desk Setup",
+        "Controller Wireless", "Gaming Monitor 4K", "Streaming Equipment", "Gaming Laptop"
+    ),
+    "home": (
+        "Smart Bulb Philips", "Air Purifier HEPA", "Coffee Maker Smart", 
+        "Bluetooth Speaker Waterproof", "Security Camera Wireless", "Smart Doorbell",
+        "Robot Mop", "Smart Thermostat", "LED Strip Lights", "Smart Lock"
+    ),
+    "fashion": (
+        "Sneakers Limited Edition", "Backpack Anti-theft", "Sunglasses Polarized", 
+        "Phone Case Magnetic", "Fitness Tracker Waterproof", "Smart Jewelry",
+        "Wireless Charger Stand", "Crossbody Bag", "Running Shoes", "Smart Clothing"
+    ),
+    "health": (
+        "Protein Powder Organic", "Yoga Mat Non-slip", "Resistance Bands Set", 
+        "Water Bottle Smart", "Sleep Tracker Ring", "Massage Gun Percussive",
+        "Essential Oils Diffuser", "Fitness Equipment Home", "Supplements Natural", "Air Quality Monitor"
+    ),
+    "beauty": (
+        "LED Face Mask", "Hair Straightener Ceramic", "Makeup Brushes Set",
+        "Skincare Serum Vitamin C", "Electric Toothbrush", "Nail Lamp UV",
+        "Face Roller Jade", "Hair Dryer Ionic", "Perfume Long-lasting", "Skincare Tool"
+    )
+})
+
+# خيارات تكلفة الدخول حسب نوع المنتج
+_HIGH_ENTRY_COST_ITEMS = ("gaming laptop", "vr headset", "3d printer", "drone camera")
+_MEDIUM_ENTRY_COST_ITEMS = ("gaming chair", "smart watch", "robot vacuum")
+_ENTRY_COST_CHOICES = (
+    ("عالي ($10K+)", "مرتفع ($15K+)", "باهظ ($20K+)"),
+    ("متوسط ($5K+)", "معتدل ($7K+)"),
+    ("منخفض ($1K+)", "رمزي ($500+)", "مناسب ($2K+)")
+)
+
+def _entry_cost_choices(item: str) -> Tuple[str, ...]:
+    """خيارات تكلفة الدخول للعنصر"""
+    item_lower = item.lower()
+    if any(high_item in item_lower for high_item in _HIGH_ENTRY_COST_ITEMS):
+        return _ENTRY_COST_CHOICES[0]
+    elif any(med_item in item_lower for med_item in _MEDIUM_ENTRY_COST_ITEMS):
+        return _ENTRY_COST_CHOICES[1]
+    return _ENTRY_COST_CHOICES[2]
+
+# عناصر كل فئة مع خيارات تكلفة الدخول محسوبة مسبقاً
+_CATEGORY_ITEMS = MappingProxyType({
+    category: tuple((item, _entry_cost_choices(item)) for item in items)
+    for category, items in VIRAL_TRENDING_CATEGORIES.items()
+})
+
+class TrendRecord:
+    """سجل ترند مضغوط - يُحول إلى dict فقط عند واجهة الـ API"""
+    
+    __slots__ = (
+        "keyword", "viral_score", "category", "growth_rate", "market_size",
+        "difficulty", "profit_potential", "competition_level", "entry_cost",
+        "roi_estimate", "time_to_market", "risk_level"
+    )
+    
+    def __init__(self, keyword: str, viral_score: int, category: str, growth_rate: str,
+                 market_size: str, difficulty: str, profit_potential: str, competition_level: str,
+                 entry_cost: str, roi_estimate: str, time_to_market: str, risk_level: str):
+        self.keyword = keyword
+        self.viral_score = viral_score
+        self.category = category
+        self.growth_rate = growth_rate
+        self.market_size = market_size
+        self.difficulty = difficulty
+        self.profit_potential = profit_potential
+        self.competition_level = competition_level
+        self.entry_cost = entry_cost
+        self.roi_estimate = roi_estimate
+        self.time_to_market = time_to_market
+        self.risk_level = risk_level
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class ViralTrendScanner:
     """كاشف الترندات الفيروسية المتقدم"""
     
     def __init__(self):
-        self.trending_categories = {
-            "technology": [
-                "AI Assistant", "ChatGPT Alternative", "Smart Robot", "Wireless Earbuds", 
-                "Smart Watch", "Robot Vacuum", "Gaming Headset", "VR Glasses",
-                "Smart Speaker", "Drone Camera", "3D Printer", "Smart Ring"
-            ],
-            "gaming": [
-                "Gaming Chair RGB", "Mechanical Keyboard", "Gaming Mouse Wireless", 
-                "RGB Lighting Kit", "VR Headset Meta", "Gaming Desk Setup",
-                "Controller Wireless", "Gaming Monitor 4K", "Streaming Equipment", "Gaming Laptop"
-            ],
-            "home": [
-                "Smart Bulb Philips", "Air Purifier HEPA", "Coffee Maker Smart", 
-                "Bluetooth Speaker Waterproof", "Security Camera Wireless", "Smart Doorbell",
-                "Robot Mop", "Smart Thermostat", "LED Strip Lights", "Smart Lock"
-            ],
-            "fashion": [
-                "Sneakers Limited Edition", "Backpack Anti-theft", "Sunglasses Polarized", 
-                "Phone Case Magnetic", "Fitness Tracker Waterproof", "Smart Jewelry",
-                "Wireless Charger Stand", "Crossbody Bag", "Running Shoes", "Smart Clothing"
-            ],
-            "health": [
-                "Protein Powder Organic", "Yoga Mat Non-slip", "Resistance Bands Set", 
-                "Water Bottle Smart", "Sleep Tracker Ring", "Massage Gun Percussive",
-                "Essential Oils Diffuser", "Fitness Equipment Home", "Supplements Natural", "Air Quality Monitor"
-            ],
-            "beauty": [
-                "LED Face Mask", "Hair Straightener Ceramic", "Makeup Brushes Set",
-                "Skincare Serum Vitamin C", "Electric Toothbrush", "Nail Lamp UV",
-                "Face Roller Jade", "Hair Dryer Ionic", "Perfume Long-lasting", "Skincare Tool"
-            ]
-        }
-        
-        # بيانات إضافية للترندات
-        self.trend_metadata = {
-            "seasonal_factors": {
-                1: ["fitness", "health", "technology"],  # يناير
-                2: ["beauty", "fashion", "home"],        # فبراير
-                3: ["home", "technology", "gaming"],     # مارس
-                6: ["fashion", "health", "beauty"],      # يونيو
-                11: ["gaming", "technology", "home"],    # نوفمبر
-                12: ["gaming", "fashion", "beauty"]      # ديسمبر
-            }
-        }
+        # مراجع للبيانات المشتركة - لا يُعاد بناؤها لكل مثيل
+        self.trending_categories = VIRAL_TRENDING_CATEGORIES
+        self.trend_metadata = {"seasonal_factors": VIRAL_SEASONAL_FACTORS}
     
     def get_category_trends(self, category: str, limit: int = 10) -> Dict[str, Any]:
         """الحصول على ترندات الفئة مع تحليل متقدم"""
         
         category_lower = category.lower()
-        category_items = self.trending_categories.get(
-            category_lower, 
-            self.trending_categories["technology"]
-        )
+        category_items = _CATEGORY_ITEMS.get(category_lower, _CATEGORY_ITEMS["technology"])
         
         # إضافة عامل موسمي
-        current_month = datetime.now().month
-        seasonal_boost = 0
-        if category_lower in self.trend_metadata["seasonal_factors"].get(current_month, []):
-            seasonal_boost = 15
+        seasonal_boost = get_seasonal_index().viral_boost(category_lower)
+        if seasonal_boost:
             logger.info(f"🗓️ Seasonal boost applied for {category}: +{seasonal_boost}")
         
         trends = []
-        for item in category_items[:limit]:
-            base_score = random.randint(35, 85) + seasonal_boost
-            viral_score = min(100, base_score)
+        for item, entry_cost_choices in category_items[:limit]:
+            viral_score = min(100, random.randint(35, 85) + seasonal_boost)
             
             # تحليل متقدم لكل عنصر
-            trend_data = {
-                "keyword": item,
-                "viral_score": viral_score,
-                "category": self._categorize_score(viral_score),
-                "growth_rate": f"+{random.randint(5, 65)}%",
-                "market_size": self._estimate_market_size(viral_score),
-                "difficulty": self._assess_difficulty(viral_score),
-                "profit_potential": self._assess_profit_potential(viral_score),
-                "competition_level": random.choice(["Low", "Medium", "High", "Very High"]),
-                "entry_cost": self._estimate_entry_cost(item),
-                "roi_estimate": f"{random.randint(15, 200)}%",
-                "time_to_market": self._estimate_time_to_market(viral_score),
-                "risk_level": self._assess_risk_level(viral_score)
-            }
-            
-            trends.append(trend_data)
+            trends.append(TrendRecord(
+                keyword=item,
+                viral_score=viral_score,
+                category=self._categorize_score(viral_score),
+                growth_rate=f"+{random.randint(5, 65)}%",
+                market_size=self._estimate_market_size(viral_score),
+                difficulty=self._assess_difficulty(viral_score),
+                profit_potential=self._assess_profit_potential(viral_score),
+                competition_level=random.choice(["Low", "Medium", "High", "Very High"]),
+                entry_cost=random.choice(entry_cost_choices),
+                roi_estimate=f"{random.randint(15, 200)}%",
+                time_to_market=self._estimate_time_to_market(viral_score),
+                risk_level=self._assess_risk_level(viral_score)
+            ))
         
         # ترتيب حسب النقاط مع عوامل إضافية
-        trends.sort(key=lambda x: x["viral_score"] + random.randint(-5, 5), reverse=True)
+        trends.sort(key=lambda x: x.viral_score + random.randint(-5, 5), reverse=True)
         
         # إحصائيات الفئة
-        avg_score = sum(t["viral_score"] for t in trends) / len(trends) if trends else 0
+        avg_score = sum(t.viral_score for t in trends) / len(trends) if trends else 0
         
         return {
             "category": category.title(),
-            "top_keywords": trends,
+            "top_keywords": [t.to_dict() for t in trends],
             "total_found": len(trends),
             "average_score": round(avg_score, 1),
             "category_health": self._assess_category_health(avg_score),
@@ -492,17 +922,7 @@ class ViralTrendScanner:
     
     def _estimate_entry_cost(self, item: str) -> str:
         """تقدير تكلفة الدخول"""
-        high_cost_items = ["gaming laptop", "vr headset", "3d printer", "drone camera"]
-        medium_cost_items = ["gaming chair", "smart watch", "robot vacuum"]
-        
-        item_lower = item.lower()
-        
-        if any(high_item in item_lower for high_item in high_cost_items):
-            return random.choice(["عالي ($10K+)", "مرتفع ($15K+)", "باهظ ($20K+)"])
-        elif any(med_item in item_lower for med_item in medium_cost_items):
-            return random.choice(["متوسط ($5K+)", "معتدل ($7K+)"])
-        else:
-            return random.choice(["منخفض ($1K+)", "رمزي ($500+)", "مناسب ($2K+)"])
+        return random.choice(_entry_cost_choices(item))
     
     def _estimate_time_to_market(self, score: int) -> str:
         """تقدير الوقت للوصول للسوق"""
@@ -537,14 +957,14 @@ class ViralTrendScanner:
         else:
             return "📊 مقبولة - نمو بطيء"
     
-    def _generate_detailed_market_summary(self, trends: List[Dict], category: str) -> str:
+    def _generate_detailed_market_summary(self, trends: List[TrendRecord], category: str) -> str:
         """توليد ملخص السوق التفصيلي"""
         if not trends:
             return f"لا توجد بيانات كافية لفئة {category}"
         
-        avg_score = sum(t["viral_score"] for t in trends) / len(trends)
-        top_trend = trends[0]["keyword"]
-        high_potential_count = len([t for t in trends if t["viral_score"] >= 70])
+        avg_score = sum(t.viral_score for t in trends) / len(trends)
+        top_trend = trends[0].keyword
+        high_potential_count = sum(1 for t in trends if t.viral_score >= 70)
         
         summary = f"فئة {category} تظهر "
         
@@ -572,13 +992,13 @@ class ViralTrendScanner:
         else:
             return f"📊 {category} للاستثمار الحذر طويل المدى"
     
-    def _identify_top_opportunities(self, top_trends: List[Dict]) -> List[str]:
+    def _identify_top_opportunities(self, top_trends: List[TrendRecord]) -> List[str]:
         """تحديد أفضل الفرص"""
         opportunities = []
         
         for trend in top_trends:
-            score = trend["viral_score"]
-            keyword = trend["keyword"]
+            score = trend.viral_score
+            keyword = trend.keyword
             
             if score >= 80:
                 opportunities.append(f"🎯 {keyword}: فرصة ذهبية - تحرك فوراً!")
@@ -590,65 +1010,114 @@ class ViralTrendScanner:
         return opportunities[:4]  # أفضل 4 فرص
 
 # الدوال المستقلة المتقدمة
+_viral_scanner_instance = None
+
+def get_viral_scanner() -> ViralTrendScanner:
+    """الكاشف المشترك على مستوى العملية"""
+    global _viral_scanner_instance
+    
+    if _viral_scanner_instance is None:
+        _viral_scanner_instance = ViralTrendScanner()
+    
+    return _viral_scanner_instance
+
 def fetch_viral_trends(keyword: str = "technology", limit: int = 10) -> Dict[str, Any]:
     """جلب الترندات الفيروسية - نسخة متقدمة"""
-    scanner = ViralTrendScanner()
-    return scanner.get_category_trends(keyword, limit)
+    return get_viral_scanner().get_category_trends(keyword, limit)
+
+# شرائح مضاعف النقاط الفيروسية: (الحد الأدنى، الأساس، أقل إضافة، أعلى إضافة)
+PRICING_VIRAL_TIERS = (
+    (90, 1.6, 0.1, 0.4),     # 1.7-2.0x
+    (80, 1.4, 0.1, 0.2),     # 1.5-1.6x
+    (65, 1.25, 0.05, 0.15),  # 1.3-1.4x
+    (50, 1.15, 0.05, 0.1),   # 1.2-1.25x
+    (35, 1.05, 0.02, 0.08),  # 1.07-1.13x
+    (None, 1.0, 0.01, 0.05)  # 1.01-1.05x
+)
+
+# عامل الفئة
+PRICING_CATEGORY_MULTIPLIERS = MappingProxyType({
+    "technology": 1.2,   # التقنية عادة أغلى
+    "gaming": 1.15,      # الألعاب سوق جيد
+    "health": 1.1,       # الصحة مهمة
+    "fashion": 1.05,     # الموضة متنوعة
+    "home": 1.0,         # المنزل أساسي
+    "general": 1.0       # عام
+})
+
+# عامل السعر الأساسي (الأسعار المنخفضة يمكن رفعها أكثر): (أقل من، العامل)
+PRICING_PRICE_FACTORS = ((20, 1.15), (50, 1.1), (100, 1.05))
 
-def dynamic_pricing_suggestion(base_price: float, viral_score: int, category: str = "general") -> Dict[str, Any]:
-    """اقتراح التسعير الديناميكي المتقدم"""
+# شرائح الإستراتيجية حسب هامش الربح: (الحد الأدنى، الإستراتيجية، المخاطر)
+PRICING_STRATEGY_TIERS = (
+    (60, "🚀 تسعير عدواني - استغل الذروة", "مرتفع - قد يرفض بعض المشترين"),
+    (40, "💎 تسعير بريميوم - فرصة ذهبية", "متوسط - مناسب للأسواق الساخنة"),
+    (25, "📈 تسعير متوازن - الخيار الأمثل", "منخفض - توازن جيد"),
+    (15, "⚡ تسعير محافظ - أمان أولاً", "منخفض جداً - آمن للغاية"),
+    (None, "📊 تسعير تنافسي - احذر الخسارة", "منخفض - لكن ربح محدود")
+)
+
+def _pricing_viral_tier(viral_score: float) -> Tuple[float, float, float]:
+    """شريحة مضاعف النقاط الفيروسية"""
+    for threshold, base, low, high in PRICING_VIRAL_TIERS:
+        if threshold is None or viral_score >= threshold:
+            return base, low, high
+
+def _pricing_price_factor(base_price: float) -> float:
+    """عامل السعر الأساسي"""
+    for limit, factor in PRICING_PRICE_FACTORS:
+        if base_price < limit:
+            return factor
+    return 1.0  # الأسعار العالية أصلاً حساسة
+
+def _pricing_time_factor(hour: int) -> float:
+    """عامل وقتي (بعض الأوقات أفضل للأسعار العالية)"""
+    if 18 <= hour <= 22:  # المساء - وقت تسوق
+        return 1.03
+    elif 10 <= hour <= 14:  # الضحى - وقت عمل
+        return 1.02
+    return 1.0
+
+def _pricing_strategy_tier(profit_margin: float) -> int:
+    """رقم شريحة الإستراتيجية حسب هامش الربح"""
+    for index, (threshold, _, _) in enumerate(PRICING_STRATEGY_TIERS):
+        if threshold is None or profit_margin >= threshold:
+            return index
+
+# الحقول الاختيارية لاقتراح التسعير (تُحسب فقط عند طلبها)
+PRICING_OPTIONAL_FIELDS = (
+    "market_analysis", "price_factors", "comparative_analysis",
+    "market_forecast", "recommendation", "optimal_timing"
+)
+
+def dynamic_pricing_suggestion(base_price: float, viral_score: int, category: str = "general",
+                               fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    اقتراح التسعير الديناميكي المتقدم
+    
+    Args:
+        base_price: السعر الأساسي
+        viral_score: النقاط الفيروسية
+        category: الفئة
+        fields: الحقول الاختيارية المطلوبة من PRICING_OPTIONAL_FIELDS
+                (None = كل الحقول، () = الحقول الأساسية فقط)
+    """
     
     # حساب المضاعف المتقدم مع عوامل متعددة
-    base_multiplier = 1.0
-    
     # عامل النقاط الفيروسية (الأساسي)
-    if viral_score >= 90:
-        base_multiplier = 1.6 + random.uniform(0.1, 0.4)  # 1.7-2.0x
-    elif viral_score >= 80:
-        base_multiplier = 1.4 + random.uniform(0.1, 0.2)  # 1.5-1.6x
-    elif viral_score >= 65:
-        base_multiplier = 1.25 + random.uniform(0.05, 0.15)  # 1.3-1.4x
-    elif viral_score >= 50:
-        base_multiplier = 1.15 + random.uniform(0.05, 0.1)  # 1.2-1.25x
-    elif viral_score >= 35:
-        base_multiplier = 1.05 + random.uniform(0.02, 0.08)  # 1.07-1.13x
-    else:
-        base_multiplier = 1.0 + random.uniform(0.01, 0.05)  # 1.01-1.05x
+    tier_base, tier_low, tier_high = _pricing_viral_tier(viral_score)
+    base_multiplier = tier_base + random.uniform(tier_low, tier_high)
     
     # عامل الفئة
-    category_multipliers = {
-        "technology": 1.2,   # التقنية عادة أغلى
-        "gaming": 1.15,      # الألعاب سوق جيد
-        "health": 1.1,       # الصحة مهمة
-        "fashion": 1.05,     # الموضة متنوعة
-        "home": 1.0,         # المنزل أساسي
-        "general": 1.0       # عام
-    }
-    
-    category_factor = category_multipliers.get(category.lower(), 1.0)
+    category_factor = PRICING_CATEGORY_MULTIPLIERS.get(category.lower(), 1.0)
     base_multiplier *= category_factor
     
-    # عامل السعر الأساسي (الأسعار المنخفضة يمكن رفعها أكثر)
-    if base_price < 20:
-        price_factor = 1.15
-    elif base_price < 50:
-        price_factor = 1.1
-    elif base_price < 100:
-        price_factor = 1.05
-    else:
-        price_factor = 1.0  # الأسعار العالية أصلاً حساسة
-    
+    # عامل السعر الأساسي
+    price_factor = _pricing_price_factor(base_price)
     base_multiplier *= price_factor
     
-    # عامل وقتي (بعض الأوقات أفضل للأسعار العالية)
-    current_hour = datetime.now().hour
-    if 18 <= current_hour <= 22:  # المساء - وقت تسوق
-        time_factor = 1.03
-    elif 10 <= current_hour <= 14:  # الضحى - وقت عمل
-        time_factor = 1.02
-    else:
-        time_factor = 1.0
-    
+    # عامل وقتي
+    time_factor = _pricing_time_factor(datetime.now().hour)
     base_multiplier *= time_factor
     
     # حساب السعر المقترح
@@ -662,29 +1131,9 @@ def dynamic_pricing_suggestion(base_price: float, viral_score: int, category: st
     confidence = max(45, min(98, confidence_base))
     
     # تحديد الإستراتيجية المتقدمة
-    if profit_margin >= 60:
-        strategy = "🚀 تسعير عدواني - استغل الذروة"
-        risk = "مرتفع - قد يرفض بعض المشترين"
-    elif profit_margin >= 40:
-        strategy = "💎 تسعير بريميوم - فرصة ذهبية"
-        risk = "متوسط - مناسب للأسواق الساخنة"
-    elif profit_margin >= 25:
-        strategy = "📈 تسعير متوازن - الخيار الأمثل"
-        risk = "منخفض - توازن جيد"
-    elif profit_margin >= 15:
-        strategy = "⚡ تسعير محافظ - أمان أولاً"
-        risk = "منخفض جداً - آمن للغاية"
-    else:
-        strategy = "📊 تسعير تنافسي - احذر الخسارة"
-        risk = "منخفض - لكن ربح محدود"
-    
-    # تحليل مقارن
-    comparative_analysis = _generate_price_comparison(base_price, suggested_price, category, viral_score)
+    _, strategy, risk = PRICING_STRATEGY_TIERS[_pricing_strategy_tier(profit_margin)]
     
-    # توقعات السوق
-    market_forecast = _generate_market_forecast(viral_score, profit_margin)
-    
-    return {
+    result = {
         "base_price": base_price,
         "suggested_price": suggested_price,
         "viral_score": viral_score,
@@ -692,21 +1141,132 @@ def dynamic_pricing_suggestion(base_price: float, viral_score: int, category: st
         "profit_margin": round(profit_margin, 1),
         "confidence": round(confidence),
         "pricing_strategy": strategy,
-        "risk_assessment": risk,
-        "market_analysis": _analyze_pricing_market(viral_score, category),
-        "price_factors": {
+        "risk_assessment": risk
+    }
+    
+    # الأقسام الاختيارية - تُبنى فقط إذا طُلبت
+    builders = {
+        "market_analysis": lambda: _analyze_pricing_market(viral_score, category),
+        "price_factors": lambda: {
             "viral_factor": f"{((base_multiplier/price_factor/time_factor/category_factor - 1) * 100):.1f}%",
             "category_factor": f"{((category_factor - 1) * 100):.1f}%",
             "price_factor": f"{((price_factor - 1) * 100):.1f}%",
             "time_factor": f"{((time_factor - 1) * 100):.1f}%"
         },
-        "comparative_analysis": comparative_analysis,
-        "market_forecast": market_forecast,
-        "recommendation": _generate_advanced_pricing_recommendation(profit_margin, viral_score, confidence),
-        "optimal_timing": _suggest_optimal_timing(viral_score),
-        "source": "advanced_pricing_engine_v2",
-        "timestamp": datetime.now().isoformat()
+        # تحليل مقارن
+        "comparative_analysis": lambda: _generate_price_comparison(base_price, suggested_price, category, viral_score),
+        # توقعات السوق
+        "market_forecast": lambda: _generate_market_forecast(viral_score, profit_margin),
+        "recommendation": lambda: _generate_advanced_pricing_recommendation(profit_margin, viral_score, confidence),
+        "optimal_timing": lambda: _suggest_optimal_timing(viral_score)
     }
+    for name in PRICING_OPTIONAL_FIELDS:
+        if fields is None or name in fields:
+            result[name] = builders[name]()
+    
+    result["source"] = "advanced_pricing_engine_v2"
+    result["timestamp"] = datetime.now().isoformat()
+    return result
+
+def dynamic_pricing_batch(base_price=None, viral_score=None, category="general",
+                          frame: Optional[pd.DataFrame] = None,
+                          explain: Optional[Sequence[int]] = None,
+                          rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """
+    💰 تسعير ديناميكي دفعي لكتالوج كامل (أعمدة NumPy)
+    
+    Args:
+        base_price: مصفوفة الأسعار الأساسية
+        viral_score: مصفوفة النقاط الفيروسية
+        category: مصفوفة الفئات أو فئة واحدة لكل الصفوف
+        frame: DataFrame بالأعمدة base_price و viral_score و category (بديل عن المصفوفات)
+        explain: أرقام الصفوف (بالموضع) التي تحتاج نصوص الإستراتيجية والتوصية
+        rng: مولد أرقام عشوائية (للاختبار)
+        
+    Returns:
+        DataFrame بالمضاعفات والسعر المقترح والهامش والثقة لكل صف
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    
+    if frame is not None:
+        base_price = frame["base_price"]
+        viral_score = frame["viral_score"]
+        category = frame["category"] if "category" in frame else "general"
+    
+    prices = np.asarray(base_price, dtype=np.float64)
+    scores = np.asarray(viral_score, dtype=np.float64)
+    count = prices.shape[0]
+    
+    # عامل النقاط الفيروسية
+    conditions = [scores >= threshold for threshold, *_ in PRICING_VIRAL_TIERS[:-1]]
+    _, default_base, default_low, default_high = PRICING_VIRAL_TIERS[-1]
+    tier_base = np.select(conditions, [t[1] for t in PRICING_VIRAL_TIERS[:-1]], default_base)
+    tier_low = np.select(conditions, [t[2] for t in PRICING_VIRAL_TIERS[:-1]], default_low)
+    tier_high = np.select(conditions, [t[3] for t in PRICING_VIRAL_TIERS[:-1]], default_high)
+    viral_factor = tier_base + rng.uniform(tier_low, tier_high)
+    
+    # عامل الفئة
+    if isinstance(category, str):
+        categories = np.full(count, category, dtype=object)
+        category_factor = np.full(count, PRICING_CATEGORY_MULTIPLIERS.get(category.lower(), 1.0))
+    else:
+        categories = np.asarray(category, dtype=object)
+        category_factor = (pd.Series(categories).str.lower()
+                           .map(PRICING_CATEGORY_MULTIPLIERS).fillna(1.0).to_numpy(dtype=np.float64))
+    
+    # عامل السعر والعامل الوقتي
+    price_factor = np.select(
+        [prices < limit for limit, _ in PRICING_PRICE_FACTORS],
+        [factor for _, factor in PRICING_PRICE_FACTORS],
+        1.0
+    )
+    time_factor = _pricing_time_factor(datetime.now().hour)
+    
+    multiplier = viral_factor * category_factor * price_factor * time_factor
+    suggested_price = np.round(prices * multiplier, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_margin = (suggested_price - prices) / prices * 100
+    
+    confidence = np.clip(60 + (scores - 40) / 2 + rng.integers(-5, 11, size=count), 45, 98)
+    
+    strategy_tier = np.select(
+        [profit_margin >= threshold for threshold, _, _ in PRICING_STRATEGY_TIERS[:-1]],
+        np.arange(len(PRICING_STRATEGY_TIERS) - 1),
+        len(PRICING_STRATEGY_TIERS) - 1
+    )
+    
+    result = pd.DataFrame({
+        "base_price": prices,
+        "viral_score": scores,
+        "category": categories,
+        "viral_factor": viral_factor,
+        "category_factor": category_factor,
+        "price_factor": price_factor,
+        "time_factor": time_factor,
+        "multiplier": multiplier,
+        "suggested_price": suggested_price,
+        "profit_margin": np.round(profit_margin, 1),
+        "confidence": np.round(confidence),
+        "strategy_tier": strategy_tier
+    }, index=frame.index if frame is not None else None)
+    
+    # النصوص تُولد فقط للصفوف المطلوبة
+    if explain is not None:
+        rows = np.asarray(explain, dtype=np.int64)
+        texts = {name: np.full(count, None, dtype=object) for name in
+                 ("pricing_strategy", "risk_assessment", "recommendation", "optimal_timing")}
+        for row in rows:
+            _, strategy, risk = PRICING_STRATEGY_TIERS[strategy_tier[row]]
+            texts["pricing_strategy"][row] = strategy
+            texts["risk_assessment"][row] = risk
+            texts["recommendation"][row] = _generate_advanced_pricing_recommendation(
+                profit_margin[row], scores[row], confidence[row]
+            )
+            texts["optimal_timing"][row] = _suggest_optimal_timing(scores[row])
+        for name, values in texts.items():
+            result[name] = values
+    
+    return result
 
 def _generate_price_comparison(base_price: float, suggested_price: float, category: str, viral_score: int) -> Dict[str, Any]:
     """توليد مقارنة الأسعار"""
@@ -815,30 +1375,269 @@ def _suggest_optimal_timing(viral_score: int) -> str:
     else:
         return "🗓️ تجنب التغييرات السريعة - استثمر في تحسين المنتج أولاً."
 
-def generate_weekly_insights(time_period: str = "week", categories: List[str] = None) -> Dict[str, Any]:
-    """توليد الرؤى الأسبوعية المتقدمة مع تحليل عميق"""
+class InsightsRollupStore:
+    """
+    📦 مخزن ملخصات الفئات للرؤى الأسبوعية
+    
+    يحفظ لكل فئة ملخصاً يومياً (العدد، المجموع، مجموع المربعات، الأعلى)
+    ويدمج آخر window_days أيام عند القراءة - فيُبنى التقرير في O(عدد الفئات)
+    بدلاً من إعادة فحص كل الفئات في كل طلب.
+    """
+    
+    def __init__(self, window_days: int = 7, refresh_interval: float = 3600, sample_limit: int = 5):
+        self.window_days = window_days
+        self.refresh_interval = refresh_interval
+        self.sample_limit = sample_limit
+        self._daily: Dict[str, Dict[date, List[float]]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, category: str, top_trends: List[Dict[str, Any]], day: Optional[date] = None):
+        """دمج عينة ترندات جديدة في ملخص اليوم"""
+        if not top_trends:
+            return
+        
+        key = category.lower()
+        day = day or date.today()
+        scores = [float(t["viral_score"]) for t in top_trends]
+        
+        with self._lock:
+            days = self._daily.setdefault(key, {})
+            summary = days.setdefault(day, [0, 0.0, 0.0, float("-inf")])
+            summary[0] += len(scores)
+            summary[1] += sum(scores)
+            summary[2] += sum(score * score for score in scores)
+            summary[3] = max(summary[3], max(scores))
+            
+            # حذف الأيام خارج النافذة
+            cutoff = day - timedelta(days=self.window_days - 1)
+            for old_day in [d for d in days if d < cutoff]:
+                del days[old_day]
+            
+            self._latest[key] = {
+                "top_trend": top_trends[0]["keyword"],
+                "trend_count": len(top_trends),
+                "top_opportunities": [t["keyword"] for t in top_trends[:3] if t["viral_score"] >= 60],
+                "refreshed_at": time.monotonic()
+            }
+    
+    def refresh(self, categories: Optional[Sequence[str]] = None,
+                category_timeout: Optional[float] = None) -> List[str]:
+        """
+        تحديث ملخصات الفئات من الكاشف بالتوازي (يُستدعى من المهمة الخلفية)
+        
+        Returns:
+            الفئات التي تجاوزت مهلتها
+        """
+        results = _fetch_categories_parallel(
+            categories or DEFAULT_INSIGHTS_CATEGORIES, self.sample_limit, category_timeout
+        )
+        timed_out = []
+        for category, trends in results.items():
+            if isinstance(trends, TimeoutError):
+                logger.warning(f"⏱️ Rollup refresh timed out for {category}")
+                timed_out.append(category)
+            elif isinstance(trends, Exception):
+                logger.error(f"❌ Rollup refresh failed for {category}: {trends}")
+            else:
+                self.record(category, trends.get("top_keywords", []))
+        return timed_out
+    
+    def is_fresh(self, category: str) -> bool:
+        latest = self._latest.get(category.lower())
+        return latest is not None and time.monotonic() - latest["refreshed_at"] < self.refresh_interval
+    
+    def summary(self, category: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """ملخص الفئة على نافذة الأسبوع"""
+        key = category.lower()
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.window_days - 1)
+        
+        with self._lock:
+            latest = self._latest.get(key)
+            days = self._daily.get(key, {})
+            count, total, total_sq, max_score = 0, 0.0, 0.0, float("-inf")
+            for day, (day_count, day_sum, day_sq, day_max) in days.items():
+                if cutoff <= day <= today:
+                    count += day_count
+                    total += day_sum
+                    total_sq += day_sq
+                    max_score = max(max_score, day_max)
+        
+        if not count or latest is None:
+            return None
+        
+        mean = total / count
+        return {
+            "count": count,
+            "mean": mean,
+            "std": max(0.0, total_sq / count - mean * mean) ** 0.5,
+            "max": int(max_score) if max_score.is_integer() else max_score,
+            "top_trend": latest["top_trend"],
+            "trend_count": latest["trend_count"],
+            "top_opportunities": latest["top_opportunities"]
+        }
+    
+    async def run_forever(self, categories: Optional[Sequence[str]] = None):
+        """مهمة خلفية تحدث الملخصات كل refresh_interval ثانية (الجلب في thread خارج event loop)"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh, categories)
+            except Exception as e:
+                # فشل تحديث واحد لا يوقف المهمة - المحاولة التالية في الموعد التالي
+                logger.error(f"❌ Insights rollup refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+DEFAULT_INSIGHTS_CATEGORIES = ("Technology", "Gaming", "Home", "Fashion", "Health", "Beauty")
+
+insights_rollup = InsightsRollupStore()
+
+def start_insights_rollup_job(categories: Optional[Sequence[str]] = None) -> asyncio.Task:
+    """تشغيل مهمة تحديث ملخصات الرؤى في حلقة الأحداث الحالية"""
+    logger.info(f"🗓️ Insights rollup job started (every {insights_rollup.refresh_interval:.0f}s)")
+    return asyncio.get_running_loop().create_task(insights_rollup.run_forever(categories))
+
+# إعدادات تحليل الفئات المتوازي
+INSIGHTS_MAX_WORKERS = 6
+INSIGHTS_CATEGORY_TIMEOUT = 10.0
+
+_insights_executor: Optional[ThreadPoolExecutor] = None
+_insights_executor_lock = threading.Lock()
+
+def _get_insights_executor() -> ThreadPoolExecutor:
+    """مجمع العمال المشترك لتحليل الفئات (يُنشأ عند أول استخدام)"""
+    global _insights_executor
+    
+    if _insights_executor is None:
+        with _insights_executor_lock:
+            if _insights_executor is None:
+                _insights_executor = ThreadPoolExecutor(
+                    max_workers=INSIGHTS_MAX_WORKERS, thread_name_prefix="insights"
+                )
+    return _insights_executor
+
+def _fetch_categories_parallel(categories: Sequence[str], limit: int = 5,
+                               category_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    جلب ترندات عدة فئات على مجمع عمال محدود
+    
+    مهلة كل فئة تُحسب من لحظة بدء تنفيذها، مع حد أقصى للتقرير كله
+    (المهلة × عدد الدفعات). الفئة المتأخرة تُسجل TimeoutError ولا توقف البقية.
+    
+    Returns:
+        {الفئة: نتيجة fetch_viral_trends أو الاستثناء} بترتيب الإدخال
+    """
+    timeout = INSIGHTS_CATEGORY_TIMEOUT if category_timeout is None else category_timeout
+    executor = _get_insights_executor()
+    started: Dict[str, float] = {}
+    
+    def run(category: str) -> Dict[str, Any]:
+        started[category] = time.monotonic()
+        return fetch_viral_trends(category, limit=limit)
+    
+    futures: Dict[str, Future] = {}
+    for category in categories:
+        if category not in futures:
+            futures[category] = executor.submit(run, category)
+    
+    waves = -(-len(futures) // INSIGHTS_MAX_WORKERS)
+    hard_deadline = time.monotonic() + timeout * max(1, waves)
+    owners = {future: category for category, future in futures.items()}
+    pending = set(owners)
+    results: Dict[str, Any] = {}
+    
+    while pending:
+        # الفئات التي انتهت مهلتها
+        now = time.monotonic()
+        for future in list(pending):
+            start = started.get(owners[future])
+            if now >= hard_deadline or (start is not None and now - start >= timeout):
+                future.cancel()
+                pending.discard(future)
+                results[owners[future]] = TimeoutError(f"timed out after {timeout:g}s")
+        if not pending:
+            break
+        
+        next_deadline = min(
+            [started[owners[f]] + timeout for f in pending if owners[f] in started] + [hard_deadline]
+        )
+        done, pending = wait(pending, timeout=min(max(0.0, next_deadline - now), timeout),
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                results[owners[future]] = future.result()
+            except Exception as e:
+                results[owners[future]] = e
+    
+    # دمج حتمي بترتيب الإدخال بغض النظر عن ترتيب الانتهاء
+    return {category: results[category] for category in futures}
+
+def _timed_out_category(timeout: Optional[float] = None) -> Dict[str, Any]:
+    timeout = INSIGHTS_CATEGORY_TIMEOUT if timeout is None else timeout
+    return {"error": f"Analysis timed out after {timeout:g}s", "timed_out": True}
+
+# أقسام تقرير الرؤى الأسبوعية بالترتيب
+INSIGHTS_SECTIONS = (
+    "analysis_metadata", "market_overview", "category_analysis", "performance_rankings",
+    "strategic_insights", "future_outlook", "technical_data"
+)
+
+def generate_weekly_insights(time_period: str = "week", categories: List[str] = None,
+                             sections: Optional[Sequence[str]] = None,
+                             use_rollup: bool = True,
+                             category_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    توليد الرؤى الأسبوعية المتقدمة مع تحليل عميق
+    
+    Args:
+        time_period: الفترة الزمنية
+        categories: الفئات المطلوبة
+        sections: الأقسام المطلوبة من INSIGHTS_SECTIONS (None = كل الأقسام)
+        use_rollup: القراءة من ملخصات insights_rollup (False = فحص كامل الآن)
+        category_timeout: مهلة كل فئة بالثواني (None = INSIGHTS_CATEGORY_TIMEOUT)
+    """
     
     if not categories:
-        categories = ["Technology", "Gaming", "Home", "Fashion", "Health", "Beauty"]
+        categories = list(DEFAULT_INSIGHTS_CATEGORIES)
     
     logger.info(f"📊 Generating weekly insights for {len(categories)} categories")
     
-    # تحليل الترندات لكل فئة
+    if use_rollup:
+        collected = _collect_category_analysis_from_rollup(categories, insights_rollup, category_timeout)
+    else:
+        collected = _collect_category_analysis(categories, category_timeout)
+    category_analysis, overall_scores, trending_up, trending_down = collected
+    
+    return _build_insights_report(
+        time_period, categories, category_analysis, overall_scores,
+        trending_up, trending_down, sections
+    )
+
+def _collect_category_analysis(categories: List[str], category_timeout: Optional[float] = None
+                               ) -> Tuple[Dict[str, Any], List[float], List[str], List[str]]:
+    """تحليل الترندات لكل فئة (الجلب بالتوازي والدمج بترتيب الفئات)"""
     category_analysis = {}
     overall_scores = []
     trending_up = []
     trending_down = []
     
+    fetched = _fetch_categories_parallel(categories, 5, category_timeout)
+    
     for category in categories:
+        trends = fetched[category]
+        if isinstance(trends, TimeoutError):
+            logger.warning(f"⏱️ Category {category} timed out - reported as partial")
+            category_analysis[category] = _timed_out_category(category_timeout)
+            continue
+        
         try:
-            trends = fetch_viral_trends(category, limit=5)
+            if isinstance(trends, Exception):
+                raise trends
             top_trends = trends.get("top_keywords", [])
             
             if top_trends:
-                # حساب متوسط النقاط للفئة
                 scores = [t["viral_score"] for t in top_trends]
                 avg_score = sum(scores) / len(scores)
-                max_score = max(scores)
                 overall_scores.append(avg_score)
                 
                 # تحديد الاتجاه
@@ -847,60 +1646,89 @@ def generate_weekly_insights(time_period: str = "week", categories: List[str] =
                 elif avg_score <= 35:
                     trending_down.append(category)
                 
-                # تحليل تفصيلي للفئة
-                category_analysis[category] = {
-                    "average_score": round(avg_score, 1),
-                    "max_score": max_score,
-                    "top_trend": top_trends[0]["keyword"],
-                    "trend_count": len(top_trends),
-                    "growth_potential": _assess_growth_potential(avg_score),
-                    "investment_rating": _rate_investment_potential(avg_score, max_score),
-                    "risk_level": _assess_category_risk(avg_score),
-                    "market_maturity": _assess_market_maturity(category, avg_score),
-                    "seasonal_factor": _check_seasonal_impact(category),
-                    "top_opportunities": [t["keyword"] for t in top_trends[:3] if t["viral_score"] >= 60]
-                }
+                category_analysis[category] = _summarize_category(
+                    category, avg_score, max(scores), top_trends[0]["keyword"], len(top_trends),
+                    [t["keyword"] for t in top_trends[:3] if t["viral_score"] >= 60]
+                )
                 
         except Exception as e:
             logger.error(f"❌ Failed to analyze category {category}: {e}")
             category_analysis[category] = {"error": f"Analysis failed: {str(e)[:50]}"}
     
+    return category_analysis, overall_scores, trending_up, trending_down
+
+def _collect_category_analysis_from_rollup(categories: List[str], store: InsightsRollupStore,
+                                           category_timeout: Optional[float] = None
+                                           ) -> Tuple[Dict[str, Any], List[float], List[str], List[str]]:
+    """تحليل الفئات من الملخصات المحسوبة مسبقاً (الفئات القديمة تُحدث أولاً)"""
+    stale = [category for category in categories if not store.is_fresh(category)]
+    timed_out = store.refresh(stale, category_timeout) if stale else []
+    
+    category_analysis = {}
+    overall_scores = []
+    trending_up = []
+    trending_down = []
+    
+    for category in categories:
+        summary = store.summary(category)
+        if summary is None:
+            if category in timed_out:
+                category_analysis[category] = _timed_out_category(category_timeout)
+            else:
+                category_analysis[category] = {"error": "Analysis failed: no rollup data"}
+            continue
+        
+        avg_score = summary["mean"]
+        overall_scores.append(avg_score)
+        
+        # تحديد الاتجاه
+        if avg_score >= 70:
+            trending_up.append(category)
+        elif avg_score <= 35:
+            trending_down.append(category)
+        
+        category_analysis[category] = _summarize_category(
+            category, avg_score, summary["max"], summary["top_trend"],
+            summary["trend_count"], summary["top_opportunities"]
+        )
+    
+    return category_analysis, overall_scores, trending_up, trending_down
+
+def _summarize_category(category: str, avg_score: float, max_score: float, top_trend: str,
+                        trend_count: int, top_opportunities: List[str]) -> Dict[str, Any]:
+    """تحليل تفصيلي للفئة"""
+    return {
+        "average_score": round(avg_score, 1),
+        "max_score": max_score,
+        "top_trend": top_trend,
+        "trend_count": trend_count,
+        "growth_potential": _assess_growth_potential(avg_score),
+        "investment_rating": _rate_investment_potential(avg_score, max_score),
+        "risk_level": _assess_category_risk(avg_score),
+        "market_maturity": _assess_market_maturity(category, avg_score),
+        "seasonal_factor": _check_seasonal_impact(category),
+        "top_opportunities": top_opportunities
+    }
+
+def _build_insights_report(time_period: str, categories: List[str], category_analysis: Dict[str, Any],
+                           overall_scores: List[float], trending_up: List[str], trending_down: List[str],
+                           sections: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """بناء تقرير الرؤى من تحليل الفئات - الأقسام غير المطلوبة لا تُحسب"""
+    
     # حساب التوقعات العامة
     market_average = sum(overall_scores) / len(overall_scores) if overall_scores else 50
     market_volatility = _calculate_market_volatility(overall_scores)
     
-    # تحديد الاتجاه العام مع تحليل متقدم
-    market_sentiment, market_outlook = _generate_market_sentiment(market_average, market_volatility)
-    
-    # توليد التوصيات الذكية المتقدمة
-    smart_recommendations = _generate_comprehensive_recommendations(category_analysis, market_average, trending_up)
-    
     # تحديد القطاعات حسب الأداء
     growth_sectors = [cat for cat, data in category_analysis.items() 
                      if isinstance(data, dict) and data.get("average_score", 0) >= 65]
     declining_sectors = [cat for cat, data in category_analysis.items()
                         if isinstance(data, dict) and data.get("average_score", 0) <= 35]
     
-    # تحليل المخاطر والفرص
-    market_risks = _identify_comprehensive_risks(market_average, market_volatility, declining_sectors)
-    market_opportunities = _identify_comprehensive_opportunities(category_analysis, growth_sectors)
-    
-    # توقعات المستقبل
-    future_predictions = _generate_future_predictions(category_analysis, market_average)
-    
-    # تحليل الاستثمار
-    investment_guide = _generate_investment_guide(category_analysis, market_average)
-    
-    return {
-        "analysis_metadata": {
-            "time_period": time_period,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
-            "categories_analyzed": len(categories),
-            "data_quality": "high" if len(overall_scores) >= len(categories) * 0.8 else "medium",
-            "confidence_level": _calculate_overall_confidence(overall_scores)
-        },
-        
-        "market_overview": {
+    def market_overview():
+        # تحديد الاتجاه العام مع تحليل متقدم
+        market_sentiment, market_outlook = _generate_market_sentiment(market_average, market_volatility)
+        return {
             "market_sentiment": market_sentiment,
             "market_outlook": market_outlook,
             "market_average_score": round(market_average, 1),
@@ -908,11 +1736,30 @@ def generate_weekly_insights(time_period: str = "week", categories: List[str] =
             "trending_up_count": len(trending_up),
             "trending_down_count": len(trending_down),
             "stable_markets": len(categories) - len(trending_up) - len(trending_down)
+        }
+    
+    def strategic_insights():
+        # التوصيات وتحليل المخاطر والفرص ودليل الاستثمار
+        return {
+            "recommendations": _generate_comprehensive_recommendations(category_analysis, market_average, trending_up),
+            "market_opportunities": _identify_comprehensive_opportunities(category_analysis, growth_sectors),
+            "risk_factors": _identify_comprehensive_risks(market_average, market_volatility, declining_sectors),
+            "investment_guide": _generate_investment_guide(category_analysis, market_average)
+        }
+    
+    builders = {
+        "analysis_metadata": lambda: {
+            "time_period": time_period,
+            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+            "categories_analyzed": len(categories),
+            "data_quality": "high" if len(overall_scores) >= len(categories) * 0.8 else "medium",
+            "confidence_level": _calculate_overall_confidence(overall_scores),
+            "partial_categories": [cat for cat, data in category_analysis.items()
+                                   if isinstance(data, dict) and data.get("timed_out")]
         },
-        
-        "category_analysis": category_analysis,
-        
-        "performance_rankings": {
+        "market_overview": market_overview,
+        "category_analysis": lambda: category_analysis,
+        "performance_rankings": lambda: {
             "top_performing_categories": sorted(
                 [cat for cat, data in category_analysis.items() 
                  if isinstance(data, dict) and "average_score" in data], 
@@ -924,21 +1771,13 @@ def generate_weekly_insights(time_period: str = "week", categories: List[str] =
             "trending_up": trending_up,
             "trending_down": trending_down
         },
-        
-        "strategic_insights": {
-            "recommendations": smart_recommendations,
-            "market_opportunities": market_opportunities,
-            "risk_factors": market_risks,
-            "investment_guide": investment_guide
-        },
-        
-        "future_outlook": {
-            "predictions": future_predictions,
+        "strategic_insights": strategic_insights,
+        "future_outlook": lambda: {
+            "predictions": _generate_future_predictions(category_analysis, market_average),
             "optimal_strategies": _suggest_optimal_strategies(market_average, growth_sectors),
             "timeline_recommendations": _generate_timeline_recommendations(category_analysis)
         },
-        
-        "technical_data": {
+        "technical_data": lambda: {
             "confidence": random.randint(80, 95),
             "source": "advanced_insights_generator_v2",
             "timestamp": datetime.now().isoformat(),
@@ -946,6 +1785,12 @@ def generate_weekly_insights(time_period: str = "week", categories: List[str] =
             "data_sources": ["viral_scanner", "trends_fetcher", "market_analyzer"]
         }
     }
+    
+    return {
+        name: builders[name]()
+        for name in INSIGHTS_SECTIONS
+        if sections is None or name in sections
+    }
 
 def _assess_growth_potential(score: float) -> str:
     """تقييم إمكانات النمو"""
@@ -1005,26 +1850,7 @@ def _assess_market_maturity(category: str, score: float) -> str:
 
 def _check_seasonal_impact(category: str) -> Dict[str, Any]:
     """فحص التأثير الموسمي"""
-    seasonal_patterns = {
-        "technology": {"peak_months": [11, 12, 1], "impact": "high"},
-        "gaming": {"peak_months": [10, 11, 12], "impact": "very_high"},
-        "fashion": {"peak_months": [3, 4, 9, 10], "impact": "high"},
-        "health": {"peak_months": [1, 6, 7], "impact": "medium"},
-        "home": {"peak_months": [3, 4, 5, 9], "impact": "medium"},
-        "beauty": {"peak_months": [2, 5, 11, 12], "impact": "medium"}
-    }
-    
-    current_month = datetime.now().month
-    pattern = seasonal_patterns.get(category.lower(), {"peak_months": [], "impact": "low"})
-    
-    is_peak_season = current_month in pattern["peak_months"]
-    
-    return {
-        "is_peak_season": is_peak_season,
-        "impact_level": pattern["impact"],
-        "peak_months": pattern["peak_months"],
-        "current_factor": "positive" if is_peak_season else "neutral"
-    }
+    return get_seasonal_index().category_impact(category)
 
 def _calculate_market_volatility(scores: List[float]) -> str:
     """حساب تقلبات السوق"""
@@ -1505,27 +2331,9 @@ def _identify_market_gaps(competitors: List[Dict]) -> List[str]:
 def generate_seasonal_forecast(months_ahead: int = 6) -> Dict[str, Any]:
     """توليد توقعات موسمية"""
     
-    current_month = datetime.now().month
     forecasts = []
     
-    seasonal_patterns = {
-        1: {"trends": ["Fitness", "Health", "New Year Resolutions"], "intensity": "High"},
-        2: {"trends": ["Valentine's Day", "Beauty", "Romance"], "intensity": "Medium"},
-        3: {"trends": ["Spring Cleaning", "Home Improvement", "Gardening"], "intensity": "Medium"},
-        4: {"trends": ["Easter", "Spring Fashion", "Outdoor Activities"], "intensity": "Medium"},
-        5: {"trends": ["Mother's Day", "Summer Prep", "Graduation"], "intensity": "Medium"},
-        6: {"trends": ["Summer Products", "Vacation", "Outdoor Fun"], "intensity": "High"},
-        7: {"trends": ["Summer Peak", "Beach Products", "Travel"], "intensity": "High"},
-        8: {"trends": ["Back to School", "Tech Products", "Study Supplies"], "intensity": "High"},
-        9: {"trends": ["Fall Fashion", "Home Comfort", "Autumn Prep"], "intensity": "Medium"},
-        10: {"trends": ["Halloween", "Spooky Products", "Costumes"], "intensity": "Medium"},
-        11: {"trends": ["Black Friday", "Holiday Prep", "Gift Shopping"], "intensity": "Very High"},
-        12: {"trends": ["Christmas", "Holiday Gifts", "Year End"], "intensity": "Very High"}
-    }
-    
-    for i in range(months_ahead):
-        target_month = ((current_month + i - 1) % 12) + 1
-        month_data = seasonal_patterns.get(target_month, {"trends": ["General"], "intensity": "Low"})
+    for i, (target_month, month_data) in enumerate(get_seasonal_index().upcoming_months(months_ahead)):
         
         # حساب النقاط المتوقعة
         base_score = {"Very High": 85, "High": 75, "Medium": 60, "Low": 45}.get(month_data["intensity"], 50)
@@ -1534,7 +2342,7 @@ def generate_seasonal_forecast(months_ahead: int = 6) -> Dict[str, Any]:
         forecasts.append({
             "month": target_month,
             "month_name": datetime(2024, target_month, 1).strftime("%B"),
-            "predicted_trends": month_data["trends"],
+            "predicted_trends": list(month_data["trends"]),
             "intensity": month_data["intensity"],
             "predicted_score": min(100, max(20, predicted_score)),
             "recommended_actions": _get_monthly_recommendations(target_month, month_data),
@@ -1607,9 +2415,24 @@ def _assess_seasonal_outlook(forecasts: List[Dict]) -> str:
 __all__ = [
     'TrendsFetcher',
     'ViralTrendScanner',
+    'TrendRecord',
+    'get_viral_scanner',
+    'KeywordMatcher',
+    'TrendsCache',
+    'SharedHTTPSession',
+    'get_http_session',
+    'close_http_session',
     'fetch_viral_trends',
     'dynamic_pricing_suggestion', 
+    'dynamic_pricing_batch',
     'generate_weekly_insights',
+    'PRICING_OPTIONAL_FIELDS',
+    'INSIGHTS_SECTIONS',
+    'INSIGHTS_MAX_WORKERS',
+    'INSIGHTS_CATEGORY_TIMEOUT',
+    'InsightsRollupStore',
+    'insights_rollup',
+    'start_insights_rollup_job',
     'get_trending_keywords_by_region',
     'analyze_competitor_trends',
     'generate_seasonal_forecast'
@@ -129,8 +129,8 @@ async def get_google_trends_real(trends_fetcher, keyword: str) -> list:
     """جلب البيانات الحقيقية من Google Trends فقط"""
     
     try:
-        # استخدام محرك الترندات الحقيقي
-        result = trends_fetcher.get_trending_keywords(keyword, timeframe='today 3-m')
+        # استخدام محرك الترندات الحقيقي (ينتظر دوره في مجدول Google Trends)
+        result = await trends_fetcher.get_trending_keywords_async(keyword, timeframe='today 3-m')
         
         if result and isinstance(result, list) and len(result) > 0:
             logger.info(f"✅ Got {len(result)} real Google trends")
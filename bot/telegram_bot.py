@@ -66,7 +66,7 @@ async def price_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("💰 جاري حساب السعر المقترح...")
         
         from ai.trends_engine import dynamic_pricing_suggestion
-        pricing = dynamic_pricing_suggestion(base_price, 75)
+        pricing = dynamic_pricing_suggestion(base_price, 75, fields=("recommendation",))
         
         response = f"💰 اقتراح التسعير:\n\n"
         response += f"💵 السعر الأساسي: ${pricing['base_price']:.2f}\n"
@@ -103,7 +103,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             response += f"📈 النقاط الفيروسية: {trend['viral_score']}%\n"
             
             from ai.trends_engine import dynamic_pricing_suggestion
-            pricing = dynamic_pricing_suggestion(19.99, trend['viral_score'])
+            pricing = dynamic_pricing_suggestion(19.99, trend['viral_score'], fields=("recommendation",))
             
             response += f"\n💰 سعر مقترح: ${pricing['suggested_price']:.2f}\n"
             response += f"📊 التوصية: {pricing.get('recommendation', 'متابعة')}"
@@ -117,6 +117,26 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Message handler error: {e}")
         await update.message.reply_text("❌ حدث خطأ في المعالجة")
 
+async def _start_background_jobs(application: Application):
+    """تشغيل المهام الخلفية عند بدء البوت"""
+    try:
+        from ai.trends_engine import start_insights_rollup_job
+        application.bot_data["insights_rollup_task"] = start_insights_rollup_job()
+    except Exception as e:
+        logger.warning(f"Background jobs start failed: {e}")
+
+async def _close_shared_resources(application: Application):
+    """إيقاف المهام الخلفية وإغلاق الموارد المشتركة عند إيقاف البوت"""
+    rollup_task = application.bot_data.pop("insights_rollup_task", None)
+    if rollup_task is not None:
+        rollup_task.cancel()
+    
+    try:
+        from ai.trends_engine import close_http_session
+        await close_http_session()
+    except Exception as e:
+        logger.warning(f"Shared resources shutdown failed: {e}")
+
 async def create_bot_application():
     """إنشاء تطبيق البوت"""
     
@@ -124,7 +144,13 @@ async def create_bot_application():
     if not token:
         raise ValueError("TELEGRAM_TOKEN not found in environment variables")
     
-    application = Application.builder().token(token).build()
+    application = (
+        Application.builder()
+        .token(token)
+        .post_init(_start_background_jobs)
+        .post_shutdown(_close_shared_resources)
+        .build()
+    )
     
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("trends", trends_command))
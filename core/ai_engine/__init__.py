@@ -5,7 +5,7 @@
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # إعداد التسجيل
 logger = logging.getLogger(__name__)
@@ -88,12 +88,13 @@ def get_engine_status() -> Dict[str, Any]:
             "last_error": str(e)
         }
 
-async def analyze_trends(keyword: str) -> Dict[str, Any]:
+async def analyze_trends(keyword: str, user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     تحليل ترند محدد
     
     Args:
         keyword: الكلمة المفتاحية للتحليل
+        user_id: معرف المستخدم (حد الطلبات لكل مستخدم)
         
     Returns:
         Dict مع نتائج التحليل
@@ -111,7 +112,7 @@ async def analyze_trends(keyword: str) -> Dict[str, Any]:
         }
     
     try:
-        return await engine.analyze_trends(keyword)
+        return await engine.analyze_trends(keyword, user_id=user_id)
     except Exception as e:
         logger.error(f"❌ Trends analysis failed: {e}")
         return {
@@ -124,13 +125,15 @@ async def analyze_trends(keyword: str) -> Dict[str, Any]:
             "error": str(e)
         }
 
-async def get_viral_trends(category: str = "technology", limit: int = 10) -> Dict[str, Any]:
+async def get_viral_trends(category: str = "technology", limit: int = 10,
+                           user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     الحصول على الترندات الفيروسية
     
     Args:
         category: فئة الترندات
         limit: عدد النتائج المطلوب
+        user_id: معرف المستخدم (حد الطلبات لكل مستخدم)
         
     Returns:
         Dict مع قائمة الترندات
@@ -145,7 +148,7 @@ async def get_viral_trends(category: str = "technology", limit: int = 10) -> Dic
         }
     
     try:
-        return await engine.get_viral_trends(category, limit)
+        return await engine.get_viral_trends(category, limit, user_id)
     except Exception as e:
         logger.error(f"❌ Viral trends fetch failed: {e}")
         return {
@@ -155,7 +158,9 @@ async def get_viral_trends(category: str = "technology", limit: int = 10) -> Dic
             "error": str(e)
         }
 
-async def suggest_pricing(base_price: float, viral_score: int, category: str = "general") -> Dict[str, Any]:
+async def suggest_pricing(base_price: float, viral_score: int, category: str = "general",
+                          fields: Optional[List[str]] = None,
+                          user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     اقتراح التسعير الذكي
     
@@ -163,6 +168,8 @@ async def suggest_pricing(base_price: float, viral_score: int, category: str = "
         base_price: السعر الأساسي
         viral_score: نقاط الفيروسية
         category: الفئة
+        fields: الأقسام المطلوبة فقط (None = الكل)
+        user_id: معرف المستخدم (حد الطلبات لكل مستخدم)
         
     Returns:
         Dict مع اقتراح التسعير
@@ -184,7 +191,7 @@ async def suggest_pricing(base_price: float, viral_score: int, category: str = "
         }
     
     try:
-        return await engine.suggest_pricing(base_price, viral_score, category)
+        return await engine.suggest_pricing(base_price, viral_score, category, fields, user_id)
     except Exception as e:
         logger.error(f"❌ Pricing suggestion failed: {e}")
         return {
@@ -197,13 +204,17 @@ async def suggest_pricing(base_price: float, viral_score: int, category: str = "
             "error": str(e)
         }
 
-async def generate_insights(time_period: str = "week", categories: list = None) -> Dict[str, Any]:
+async def generate_insights(time_period: str = "week", categories: list = None,
+                            sections: Optional[List[str]] = None,
+                            user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     توليد الرؤى والتحليلات
     
     Args:
         time_period: الفترة الزمنية
         categories: قائمة الفئات
+        sections: الأقسام المطلوبة فقط (None = الكل)
+        user_id: معرف المستخدم (حد الطلبات لكل مستخدم)
         
     Returns:
         Dict مع الرؤى المُولدة
@@ -220,7 +231,7 @@ async def generate_insights(time_period: str = "week", categories: list = None)
         }
     
     try:
-        return await engine.generate_insights(time_period, categories)
+        return await engine.generate_insights(time_period, categories, sections, user_id)
     except Exception as e:
         logger.error(f"❌ Insights generation failed: {e}")
         return {
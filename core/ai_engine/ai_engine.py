@@ -6,16 +6,26 @@
 """
 
 import asyncio
+import functools
+import hashlib
+import heapq
+import itertools
 import logging
 import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
 import random
 
 # استيراد المحركات المختلفة
 try:
-    from ai.trends_engine import TrendsFetcher, ViralTrendScanner, fetch_viral_trends
+    from ai.trends_engine import TrendsFetcher, ViralTrendScanner, fetch_viral_trends, get_viral_scanner
     from ai.trends_engine import dynamic_pricing_suggestion, generate_weekly_insights
     AI_ENGINES_AVAILABLE = True
 except ImportError as e:
@@ -25,6 +35,509 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# المصادر الخارجية التي تستدعيها كل واجهة (أسماء apis في ai_config.json)
+UPSTREAMS_BY_ENTRY_POINT = {
+    "analyze_trends": ("google_trends", "reddit"),
+    "get_viral_trends": (),
+    "suggest_pricing": (),
+    "generate_insights": ()
+}
+
+def trends_cache_key(keyword: str, options: Dict[str, Any]) -> str:
+    """
+    مفتاح كاش ثابت بين العمليات لتحليل الترندات
+    
+    hash() عشوائي لكل عملية - فلا تُصاب طبقة القرص بعد إعادة التشغيل
+    """
+    encoded = json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+    return f"trends_{keyword}_{hashlib.sha1(encoded).hexdigest()}"
+
+class DiskCacheTier:
+    """
+    💾 طبقة كاش دائمة (L2) على SQLite تحت كاش الذاكرة
+    
+    - القيم تُحفظ JSON مضغوط بـ zlib (لا pickle - الملف لا ينفذ كوداً عند القراءة)
+    - أوقات الحفظ والانتهاء بساعة الحائط لتبقى صالحة بعد إعادة التشغيل
+    - أخطاء القرص تُسجل ولا تُفشل الطلب
+    """
+    
+    def __init__(self, db_path: str = "ai_cache.db", max_entries: int = 10000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.errors = 0
+        self.bytes_written = 0
+        
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS engine_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_engine_cache_expires ON engine_cache(expires_at)")
+    
+    @staticmethod
+    def _encode(data: Any) -> bytes:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+        return zlib.compress(payload.encode("utf-8"), 6)
+    
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+    
+    def put(self, key: str, data: Any, stored_at: float, expires_at: float):
+        """حفظ نتيجة على القرص"""
+        try:
+            blob = self._encode(data)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO engine_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, blob, stored_at, expires_at)
+                )
+            self.writes += 1
+            self.bytes_written += len(blob)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Disk cache write failed for {key}: {e}")
+    
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """قراءة نتيجة صالحة من القرص - (البيانات، وقت الحفظ)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, stored_at FROM engine_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            if row is None:
+                return None
+            self.reads += 1
+            return self._decode(row[0]), row[1]
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Disk cache read failed for {key}: {e}")
+            return None
+    
+    def load_recent(self, limit: int) -> List[Tuple[str, Any, float]]:
+        """أحدث النتائج الصالحة (الأقدم أولاً) لتسخين كاش الذاكرة"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, value, stored_at FROM engine_cache WHERE expires_at > ? "
+                    "ORDER BY stored_at DESC LIMIT ?",
+                    (time.time(), limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Disk cache warm-up failed: {e}")
+            return []
+        
+        loaded = []
+        for key, blob, stored_at in reversed(rows):
+            try:
+                loaded.append((key, self._decode(blob), stored_at))
+            except (zlib.error, ValueError):
+                self.errors += 1
+        self.reads += len(loaded)
+        return loaded
+    
+    def purge(self) -> int:
+        """حذف المنتهي والأقدم بعد max_entries"""
+        try:
+            with self._lock:
+                removed = self._conn.execute(
+                    "DELETE FROM engine_cache WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+                removed += self._conn.execute(
+                    "DELETE FROM engine_cache WHERE key IN ("
+                    "SELECT key FROM engine_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+            return removed
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Disk cache purge failed: {e}")
+            return 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """إحصائيات طبقة القرص"""
+        try:
+            with self._lock:
+                entries = self._conn.execute("SELECT COUNT(*) FROM engine_cache").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {
+            "path": self.db_path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "reads": self.reads,
+            "writes": self.writes,
+            "bytes_written": self.bytes_written,
+            "errors": self.errors
+        }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class EngineResultCache:
+    """
+    🗃️ كاش نتائج المحرك مع stale-while-revalidate
+    
+    - النتيجة الحديثة (أصغر من ttl) تُعاد مباشرة
+    - النتيجة المنتهية ضمن نافذة stale_ttl تُعاد فوراً وتُحدث بمهمة خلفية واحدة
+    - النتيجة المفقودة تُحسب مرة واحدة لكل الطلبات المتزامنة
+    - الانتهاء عبر heap حسب موعد الحذف (O(log n) للإدراج) والإخلاء حسب LRU عند تجاوز max_entries
+    - طبقة قرص اختيارية (l2): الكتابة تمر إليها والقراءة الفائتة تبحث فيها (في thread خارج event loop)
+    """
+    
+    def __init__(self, ttl: float = 300, stale_ttl: float = 3600, max_entries: int = 1000,
+                 l2: Optional[DiskCacheTier] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.l2 = l2
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # (موعد الحذف، رقم تسلسلي، المفتاح) - العناصر القديمة تُتجاهل عند السحب
+        self._expiry_heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.sweeps = 0
+        self.l2_hits = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry["timestamp"] < self.ttl
+    
+    def set(self, key: str, data: Any, age: float = 0.0, persist: bool = True):
+        """
+        حفظ نتيجة محسوبة مع إخلاء الأقدم استخداماً عند تجاوز الحد
+        
+        Args:
+            age: عمر النتيجة بالثواني (للنتائج المحملة من القرص)
+            persist: الكتابة إلى طبقة القرص أيضاً
+        """
+        now = time.monotonic()
+        timestamp = now - age
+        expires_at = timestamp + self.ttl + self.stale_ttl
+        if expires_at <= now:
+            return
+        
+        if persist and self.l2 is not None:
+            self.l2.put(key, data, *self._l2_times(age))
+        
+        self._entries[key] = {"data": data, "timestamp": timestamp, "expires_at": expires_at}
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), key))
+        
+        # تنظيف الكاش القديم - يسحب المنتهي فقط من رأس الـ heap
+        self.cleanup(now)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        
+        # إعادة بناء الـ heap إذا تراكمت فيه عناصر ملغاة
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [item for item in self._expiry_heap
+                                 if self._entries.get(item[2], {}).get("expires_at") == item[0]]
+            heapq.heapify(self._expiry_heap)
+    
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """حذف النتائج الأقدم من نافذة stale"""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] == expires_at:
+                del self._entries[key]
+                removed += 1
+        self.expirations += removed
+        return removed
+    
+    def _l2_times(self, age: float = 0.0) -> Tuple[float, float]:
+        """(وقت الحفظ، وقت الانتهاء) بساعة الحائط لطبقة القرص"""
+        stored_at = time.time() - age
+        return stored_at, stored_at + self.ttl + self.stale_ttl
+    
+    async def _load_from_l2(self, key: str) -> Optional[Dict[str, Any]]:
+        """نقل نتيجة من القرص إلى الذاكرة مع الحفاظ على عمرها (SQLite وzlib في thread)"""
+        row = await asyncio.to_thread(self.l2.get, key)
+        if row is None:
+            return None
+        data, stored_at = row
+        self.set(key, data, age=max(0.0, time.time() - stored_at), persist=False)
+        self.l2_hits += 1
+        return self._entries.get(key)
+    
+    def warm(self, limit: Optional[int] = None) -> int:
+        """تسخين كاش الذاكرة من القرص (أحدث النتائج أولاً في ترتيب LRU)"""
+        if self.l2 is None:
+            return 0
+        
+        loaded = self.l2.load_recent(limit or self.max_entries)
+        now = time.time()
+        for key, data, stored_at in loaded:
+            self.set(key, data, age=max(0.0, now - stored_at), persist=False)
+        return len(loaded)
+    
+    async def run_sweeper(self, interval: float):
+        """مهمة خلفية تحذف النتائج المنتهية كل interval ثانية"""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.cleanup()
+            if self.l2 is not None:
+                removed += await asyncio.to_thread(self.l2.purge)
+            self.sweeps += 1
+            if removed:
+                logger.info(f"🧹 Cache sweeper removed {removed} expired entries")
+    
+    async def get_or_refresh(self, key: str, factory: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        جلب النتيجة مع التحديث في الخلفية عند انتهاء صلاحيتها
+        
+        Args:
+            key: مفتاح الكاش
+            factory: دالة تعيد coroutine للحساب
+            cacheable: شرط حفظ النتيجة (النتائج الجزئية لا تُحفظ)
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.l2 is not None:
+            entry = await self._load_from_l2(key)
+        if entry is not None:
+            age = time.monotonic() - entry["timestamp"]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry["data"]
+            if age < self.ttl + self.stale_ttl:
+                # إعادة النسخة القديمة فوراً - والتحديث في الخلفية
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, factory, cacheable)
+                return entry["data"]
+        
+        self.misses += 1
+        # shield: إلغاء طلب واحد لا يلغي الحساب المشترك
+        return await asyncio.shield(self._refresh(key, factory, cacheable))
+    
+    def _refresh(self, key: str, factory: Callable[[], Awaitable[Any]],
+                 cacheable: Optional[Callable[[Any], bool]]) -> asyncio.Task:
+        """مهمة حساب واحدة لكل مفتاح"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._compute(key, factory, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._refresh_done(key, done))
+        return task
+    
+    async def _compute(self, key: str, factory: Callable[[], Awaitable[Any]],
+                       cacheable: Optional[Callable[[Any], bool]]) -> Any:
+        self.refreshes += 1
+        result = await factory()
+        if cacheable is None or cacheable(result):
+            self.set(key, result, persist=False)
+            if self.l2 is not None:
+                # الكتابة على القرص خارج event loop
+                await asyncio.to_thread(self.l2.put, key, result, *self._l2_times())
+        return result
+    
+    def _refresh_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # قراءة الاستثناء تمنع تحذير "exception was never retrieved" للتحديث الخلفي
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+            logger.warning(f"⚠️ Cache refresh failed for {key}: {task.exception()}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """إحصائيات الكاش"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "sweeps": self.sweeps,
+            "heap_size": len(self._expiry_heap),
+            "inflight": len(self._inflight),
+            "l2_hits": self.l2_hits,
+            "l2": self.l2.stats() if self.l2 is not None else None
+        }
+
+class RateLimitExceeded(Exception):
+    """⛔ تجاوز حد الطلبات - الانتظار المطلوب أطول من المسموح"""
+    
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded ({scope}) - retry after {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """🪣 دلو رموز: rate_per_minute رمز في الدقيقة بسعة capacity"""
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def wait_time(self, now: float) -> float:
+        """الانتظار اللازم حتى يتوفر رمز (الرصيد السالب = طلبات في الطابور)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+    
+    def consume(self):
+        self.tokens -= 1
+
+class RateLimiter:
+    """
+    🚦 محدد معدل الطلبات للمحرك
+    
+    - دلو عام (max_requests_per_minute) ودلو لكل مستخدم ودلو لكل مصدر خارجي
+    - الطلب ينتظر دوره إذا كان الانتظار ضمن max_wait وإلا يُرفض بـ RateLimitExceeded
+    """
+    
+    def __init__(self, requests_per_minute: float, per_user_per_minute: float,
+                 upstream_limits: Optional[Dict[str, float]] = None,
+                 max_wait: float = 10.0, max_user_buckets: int = 10000):
+        self.global_bucket = TokenBucket(requests_per_minute)
+        self.per_user_per_minute = per_user_per_minute
+        self.upstream_buckets = {name: TokenBucket(limit) for name, limit in (upstream_limits or {}).items()}
+        self.max_wait = max_wait
+        self.max_user_buckets = max_user_buckets
+        self._user_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+    
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            bucket = self._user_buckets[user_id] = TokenBucket(self.per_user_per_minute)
+            if len(self._user_buckets) > self.max_user_buckets:
+                self._user_buckets.popitem(last=False)
+        self._user_buckets.move_to_end(user_id)
+        return bucket
+    
+    async def acquire(self, user_id: Optional[str] = None) -> float:
+        """حجز طلب من الدلو العام ودلو المستخدم - يعيد مدة الانتظار"""
+        buckets = [("global", self.global_bucket)]
+        if user_id is not None:
+            buckets.append((f"user:{user_id}", self._user_bucket(str(user_id))))
+        return await self._acquire(buckets)
+    
+    async def acquire_upstream(self, *names: str) -> float:
+        """حجز طلب من دلاء المصادر الخارجية (عند الجلب الفعلي فقط)"""
+        buckets = [(f"upstream:{name}", self.upstream_buckets[name])
+                   for name in names if name in self.upstream_buckets]
+        return await self._acquire(buckets) if buckets else 0.0
+    
+    async def _acquire(self, buckets: List[tuple]) -> float:
+        now = time.monotonic()
+        waits = [(bucket.wait_time(now), scope) for scope, bucket in buckets]
+        wait, scope = max(waits)
+        
+        if wait > self.max_wait:
+            # الرفض لا يستهلك رموزاً
+            self.rejected[scope] = self.rejected.get(scope, 0) + 1
+            logger.warning(f"⛔ Rate limit hit on {scope} - retry after {wait:.1f}s")
+            raise RateLimitExceeded(scope, wait)
+        
+        for _, bucket in buckets:
+            bucket.consume()
+        self.admitted += 1
+        
+        if wait > 0:
+            self.waited += 1
+            self.total_wait += wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+            await asyncio.sleep(wait)
+        return wait
+    
+    def stats(self) -> Dict[str, Any]:
+        """إحصائيات محدد المعدل"""
+        return {
+            "admitted": self.admitted,
+            "rejected": sum(self.rejected.values()),
+            "rejected_by_scope": dict(self.rejected),
+            "queued": self.waited,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "average_wait_seconds": round(self.total_wait / self.waited, 3) if self.waited else 0.0,
+            "max_wait_seconds": round(self.max_wait_seen, 3),
+            "tracked_users": len(self._user_buckets),
+            "upstreams": list(self.upstream_buckets)
+        }
+
+class LoopLagMonitor:
+    """
+    ⏱️ قياس تأخر حلقة الأحداث
+    
+    ينام interval ثانية ويقيس الفرق بين موعد الاستيقاظ المتوقع والفعلي -
+    أي عمل متزامن يحجز الحلقة يظهر مباشرة في التأخر.
+    """
+    
+    def __init__(self, interval: float = 0.5, window: int = 240):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.samples_total = 0
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._samples.append(lag)
+            self.samples_total += 1
+            self.max_lag = max(self.max_lag, lag)
+            if lag > 1.0:
+                logger.warning(f"🐢 Event loop lag: {lag * 1000:.0f}ms")
+    
+    def stats(self) -> Dict[str, Any]:
+        """إحصائيات التأخر بالمللي ثانية (على آخر window عينة)"""
+        if not self._samples:
+            return {"samples": 0}
+        
+        lags = sorted(self._samples)
+        return {
+            "samples": self.samples_total,
+            "last_ms": round(self._samples[-1] * 1000, 2),
+            "mean_ms": round(sum(lags) / len(lags) * 1000, 2),
+            "p95_ms": round(lags[int(0.95 * (len(lags) - 1))] * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2)
+        }
+
 class BraveBotAIEngine:
     """
     🎯 المحرك الأساسي للذكاء الاصطناعي
@@ -37,8 +550,22 @@ class BraveBotAIEngine:
         self.status = "initializing"
         self.last_update = datetime.now()
         self.engines = {}
-        self.cache = {}
         self.config = self._load_config()
+        performance = self.config["performance"]
+        self.cache = EngineResultCache(
+            ttl=self.config["cache_duration"],
+            stale_ttl=self.config["stale_while_revalidate"],
+            max_entries=performance.get("max_cache_size", 1000),
+            l2=self._create_disk_cache()
+        )
+        warmed = self.cache.warm()
+        if warmed:
+            logger.info(f"♨️ Warmed {warmed} cache entries from disk")
+        self._cache_sweeper: Optional[asyncio.Task] = None
+        self.rate_limiter = self._create_rate_limiter()
+        self.executor = self._create_executor()
+        self.loop_lag = LoopLagMonitor(performance.get("loop_lag_interval", 0.5))
+        self._loop_lag_task: Optional[asyncio.Task] = None
         
         logger.info("🚀 Initializing BraveBot AI Engine...")
         self._initialize_engines()
@@ -47,6 +574,7 @@ class BraveBotAIEngine:
         """تحميل إعدادات المحرك"""
         default_config = {
             "cache_duration": 300,  # 5 دقائق
+            "stale_while_revalidate": 3600,  # مدة تقديم النتيجة القديمة أثناء تحديثها
             "max_requests_per_minute": 30,
             "fallback_mode": True,
             "debug_mode": False,
@@ -54,6 +582,21 @@ class BraveBotAIEngine:
                 "trends": True,
                 "pricing": True,
                 "insights": True
+            },
+            "rate_limiting": {
+                "per_user_requests_per_minute": 10,
+                "max_queue_wait": 10
+            },
+            "performance": {
+                "cache_cleanup_interval": 1800,
+                "max_cache_size": 1000,
+                "async_timeout": 30,
+                "executor": "thread",  # thread | process
+                "executor_workers": 4,
+                "loop_lag_interval": 0.5,
+                "disk_cache": True,
+                "disk_cache_path": "ai_cache.db",
+                "disk_cache_max_entries": 10000
             }
         }
         
@@ -68,6 +611,54 @@ class BraveBotAIEngine:
         
         return default_config
     
+    def _create_rate_limiter(self) -> RateLimiter:
+        """إنشاء محدد المعدل من الإعدادات"""
+        rate_config = self.config.get("rate_limiting", {})
+        upstream_limits = {
+            name: api["rate_limit"]
+            for name, api in self.config.get("apis", {}).items()
+            if api.get("enabled", True) and api.get("rate_limit")
+        }
+        return RateLimiter(
+            requests_per_minute=self.config["max_requests_per_minute"],
+            per_user_per_minute=rate_config.get("per_user_requests_per_minute", 10),
+            upstream_limits=upstream_limits,
+            max_wait=rate_config.get("max_queue_wait", 10)
+        )
+    
+    def _create_disk_cache(self) -> Optional[DiskCacheTier]:
+        """إنشاء طبقة الكاش الدائمة (None إذا كانت معطلة أو تعذر فتحها)"""
+        performance = self.config["performance"]
+        if not performance.get("disk_cache", True):
+            return None
+        try:
+            return DiskCacheTier(
+                db_path=performance.get("disk_cache_path", "ai_cache.db"),
+                max_entries=performance.get("disk_cache_max_entries", 10000)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk cache unavailable - memory only: {e}")
+            return None
+    
+    def _create_executor(self) -> Executor:
+        """
+        إنشاء المنفذ الذي تعمل عليه استدعاءات المحركات المتزامنة
+        
+        process: عزل كامل عن الحلقة لكن كل عملية لها كاش وملخصات خاصة بها
+        """
+        performance = self.config["performance"]
+        workers = performance.get("executor_workers", 4)
+        if performance.get("executor", "thread") == "process":
+            logger.info(f"⚙️ Engine executor: process pool ({workers} workers)")
+            return ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"⚙️ Engine executor: thread pool ({workers} workers)")
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-engine")
+    
+    async def _run_sync(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """تشغيل دالة متزامنة على المنفذ دون حجز حلقة الأحداث"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
     def _initialize_engines(self):
         """تهيئة جميع محركات الـ AI"""
         try:
@@ -75,7 +666,7 @@ class BraveBotAIEngine:
                 # تهيئة محرك الترندات
                 if self.config["engines"]["trends"]:
                     self.engines["trends_fetcher"] = TrendsFetcher()
-                    self.engines["viral_scanner"] = ViralTrendScanner()
+                    self.engines["viral_scanner"] = get_viral_scanner()
                     logger.info("✅ Trends engines initialized")
                 
                 self.status = "ready"
@@ -96,31 +687,67 @@ class BraveBotAIEngine:
             "engines_available": AI_ENGINES_AVAILABLE,
             "active_engines": list(self.engines.keys()),
             "cache_size": len(self.cache),
+            "cache": self.cache.stats(),
+            "rate_limits": self.rate_limiter.stats(),
+            "loop_lag": self.loop_lag.stats(),
             "uptime_minutes": int((datetime.now() - self.last_update).total_seconds() / 60)
         }
     
-    async def analyze_trends(self, keyword: str, **kwargs) -> Dict[str, Any]:
+    def _ensure_background_tasks(self):
+        """تشغيل مهمة تنظيف الكاش ومراقب تأخر الحلقة في حلقة الأحداث الحالية (مرة واحدة)"""
+        loop = asyncio.get_running_loop()
+        sweeper = self._cache_sweeper
+        if sweeper is None or sweeper.done() or sweeper.get_loop() is not loop:
+            interval = self.config["performance"].get("cache_cleanup_interval", 1800)
+            self._cache_sweeper = loop.create_task(self.cache.run_sweeper(interval))
+            logger.info(f"🧹 Cache sweeper started (every {interval}s)")
+        
+        monitor = self._loop_lag_task
+        if monitor is None or monitor.done() or monitor.get_loop() is not loop:
+            self._loop_lag_task = loop.create_task(self.loop_lag.run())
+    
+    def stop_cache_sweeper(self):
+        """إيقاف مهمة تنظيف الكاش"""
+        if self._cache_sweeper is not None:
+            self._cache_sweeper.cancel()
+            self._cache_sweeper = None
+    
+    def close(self):
+        """إيقاف المهام الخلفية والمنفذ"""
+        self.stop_cache_sweeper()
+        if self._loop_lag_task is not None:
+            self._loop_lag_task.cancel()
+            self._loop_lag_task = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache.l2 is not None:
+            self.cache.l2.close()
+    
+    async def analyze_trends(self, keyword: str, user_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
         🔍 تحليل الترندات - الواجهة الموحدة
         """
         try:
-            cache_key = f"trends_{keyword}_{hash(str(kwargs))}"
-            
-            # فحص الكاش
-            if self._is_cached(cache_key):
-                logger.info(f"📋 Using cached data for: {keyword}")
-                return self.cache[cache_key]["data"]
+            self._ensure_background_tasks()
+            await self.rate_limiter.acquire(user_id)
             
             # تحليل حقيقي
             if self.status == "ready" and "trends_fetcher" in self.engines:
                 trends_fetcher = self.engines["trends_fetcher"]
-                result = trends_fetcher.analyze_combined_trends(
-                    keyword=keyword,
-                    **kwargs
-                )
+                cache_key = trends_cache_key(keyword, kwargs)
+                
+                if cache_key in self.cache:
+                    logger.info(f"📋 Using cached data for: {keyword}")
                 
-                # حفظ في الكاش
-                self._cache_result(cache_key, result)
+                async def fetch() -> Dict[str, Any]:
+                    # دلاء المصادر الخارجية تُستهلك عند الجلب الفعلي فقط
+                    await self.rate_limiter.acquire_upstream(*UPSTREAMS_BY_ENTRY_POINT["analyze_trends"])
+                    return await trends_fetcher.analyze_combined_trends(keyword=keyword, **kwargs)
+                
+                result = await self.cache.get_or_refresh(
+                    cache_key,
+                    fetch,
+                    cacheable=lambda data: not data.get("degraded_sections") and "error" not in data
+                )
                 
                 logger.info(f"✅ Trends analysis completed for: {keyword}")
                 return result
@@ -132,43 +759,48 @@ class BraveBotAIEngine:
             logger.error(f"❌ Trends analysis failed: {e}")
             return self._fallback_trends_analysis(keyword, error=str(e))
     
-    async def get_viral_trends(self, category: str = "technology", limit: int = 10) -> Dict[str, Any]:
+    async def get_viral_trends(self, category: str = "technology", limit: int = 10,
+                               user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         🔥 الحصول على الترندات الفيروسية
         """
         try:
-            cache_key = f"viral_{category}_{limit}"
-            
-            if self._is_cached(cache_key):
-                return self.cache[cache_key]["data"]
+            self._ensure_background_tasks()
+            await self.rate_limiter.acquire(user_id)
             
             if self.status == "ready" and "viral_scanner" in self.engines:
-                viral_scanner = self.engines["viral_scanner"]
-                result = viral_scanner.get_category_trends(
-                    category=category,
-                    limit=limit
-                )
+                # fetch_viral_trends تستخدم نفس الكاشف المشترك وتصلح للإرسال لعملية أخرى
+                async def scan() -> Dict[str, Any]:
+                    return await self._run_sync(fetch_viral_trends, keyword=category, limit=limit)
                 
-                self._cache_result(cache_key, result)
-                return result
+                return await self.cache.get_or_refresh(f"viral_{category}_{limit}", scan)
             
             # استخدام الدالة المستقلة كـ fallback
-            return fetch_viral_trends(keyword=category, limit=limit)
+            return await self._run_sync(fetch_viral_trends, keyword=category, limit=limit)
             
         except Exception as e:
             logger.error(f"❌ Viral trends failed: {e}")
             return self._fallback_viral_trends(category, limit)
     
-    async def suggest_pricing(self, base_price: float, viral_score: int, category: str = "general") -> Dict[str, Any]:
+    async def suggest_pricing(self, base_price: float, viral_score: int, category: str = "general",
+                              fields: Optional[List[str]] = None,
+                              user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         💰 اقتراح التسعير الذكي
+        
+        fields: الحقول الاختيارية المطلوبة فقط (None = التقرير الكامل)
         """
         try:
+            self._ensure_background_tasks()
+            await self.rate_limiter.acquire(user_id)
+            
             # استخدام محرك التسعير المستقل
-            result = dynamic_pricing_suggestion(
+            result = await self._run_sync(
+                dynamic_pricing_suggestion,
                 base_price=base_price,
                 viral_score=viral_score,
-                category=category
+                category=category,
+                fields=fields
             )
             
             logger.info(f"💰 Pricing suggestion: {base_price} -> {result.get('suggested_price')}")
@@ -178,14 +810,23 @@ class BraveBotAIEngine:
             logger.error(f"❌ Pricing suggestion failed: {e}")
             return self._fallback_pricing(base_price, viral_score, category)
     
-    async def generate_insights(self, time_period: str = "week", categories: List[str] = None) -> Dict[str, Any]:
+    async def generate_insights(self, time_period: str = "week", categories: List[str] = None,
+                                sections: Optional[List[str]] = None,
+                                user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         📊 توليد الرؤى الأسبوعية
+        
+        sections: أقسام التقرير المطلوبة فقط (None = التقرير الكامل)
         """
         try:
-            result = generate_weekly_insights(
+            self._ensure_background_tasks()
+            await self.rate_limiter.acquire(user_id)
+            
+            result = await self._run_sync(
+                generate_weekly_insights,
                 time_period=time_period,
-                categories=categories
+                categories=categories,
+                sections=sections
             )
             
             logger.info(f"📊 Weekly insights generated for: {time_period}")
@@ -195,39 +836,6 @@ class BraveBotAIEngine:
             logger.error(f"❌ Insights generation failed: {e}")
             return self._fallback_insights(time_period)
     
-    def _is_cached(self, cache_key: str) -> bool:
-        """فحص وجود البيانات في الكاش"""
-        if cache_key not in self.cache:
-            return False
-        
-        cache_entry = self.cache[cache_key]
-        cache_age = (datetime.now() - cache_entry["timestamp"]).total_seconds()
-        
-        return cache_age < self.config["cache_duration"]
-    
-    def _cache_result(self, cache_key: str, data: Any):
-        """حفظ النتيجة في الكاش"""
-        self.cache[cache_key] = {
-            "data": data,
-            "timestamp": datetime.now()
-        }
-        
-        # تنظيف الكاش القديم
-        self._cleanup_cache()
-    
-    def _cleanup_cache(self):
-        """تنظيف الكاش القديم"""
-        current_time = datetime.now()
-        expired_keys = []
-        
-        for key, entry in self.cache.items():
-            age = (current_time - entry["timestamp"]).total_seconds()
-            if age > self.config["cache_duration"]:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.cache[key]
-    
     def _fallback_trends_analysis(self, keyword: str, error: str = None) -> Dict[str, Any]:
         """تحليل ترندات احتياطي"""
         viral_score = random.randint(25, 85)
@@ -344,20 +952,25 @@ async def analyze_trends(keyword: str, **kwargs) -> Dict[str, Any]:
     engine = get_ai_engine()
     return await engine.analyze_trends(keyword, **kwargs)
 
-async def get_viral_trends(category: str = "technology", limit: int = 10) -> Dict[str, Any]:
+async def get_viral_trends(category: str = "technology", limit: int = 10,
+                           user_id: Optional[str] = None) -> Dict[str, Any]:
     """دالة سريعة للترندات الفيروسية"""
     engine = get_ai_engine()
-    return await engine.get_viral_trends(category, limit)
+    return await engine.get_viral_trends(category, limit, user_id)
 
-async def suggest_pricing(base_price: float, viral_score: int, category: str = "general") -> Dict[str, Any]:
+async def suggest_pricing(base_price: float, viral_score: int, category: str = "general",
+                          fields: Optional[List[str]] = None,
+                          user_id: Optional[str] = None) -> Dict[str, Any]:
     """دالة سريعة لاقتراح التسعير"""
     engine = get_ai_engine()
-    return await engine.suggest_pricing(base_price, viral_score, category)
+    return await engine.suggest_pricing(base_price, viral_score, category, fields, user_id)
 
-async def generate_insights(time_period: str = "week", categories: List[str] = None) -> Dict[str, Any]:
+async def generate_insights(time_period: str = "week", categories: List[str] = None,
+                            sections: Optional[List[str]] = None,
+                            user_id: Optional[str] = None) -> Dict[str, Any]:
     """دالة سريعة لتوليد الرؤى"""
     engine = get_ai_engine()
-    return await engine.generate_insights(time_period, categories)
+    return await engine.generate_insights(time_period, categories, sections, user_id)
 
 def get_engine_status() -> Dict[str, Any]:
     """الحصول على حالة المحرك"""
@@ -369,6 +982,13 @@ ai_engine = get_ai_engine
 
 __all__ = [
     'BraveBotAIEngine',
+    'EngineResultCache',
+    'DiskCacheTier',
+    'trends_cache_key',
+    'RateLimiter',
+    'RateLimitExceeded',
+    'TokenBucket',
+    'LoopLagMonitor',
     'get_ai_engine',
     'analyze_trends',
     'get_viral_trends', 
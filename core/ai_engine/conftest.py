@@ -0,0 +1,18 @@
+import sys
+import types
+
+# trend_analyzer يستورد pytrends عند التحميل - بديل بسيط إذا لم تكن المكتبة مثبتة
+# (الاختبارات تستبدل _fetch_interest_over_time فلا يُستخدم TrendReq فعلياً)
+try:
+    import pytrends.request  # noqa: F401
+except ImportError:
+    class TrendReq:
+        def __init__(self, *args, **kwargs):
+            raise RuntimeError("pytrends is not installed")
+
+    request = types.ModuleType("pytrends.request")
+    request.TrendReq = TrendReq
+    package = types.ModuleType("pytrends")
+    package.request = request
+    sys.modules.setdefault("pytrends", package)
+    sys.modules.setdefault("pytrends.request", request)
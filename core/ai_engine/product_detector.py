@@ -1,16 +1,20 @@
 import asyncio
 import aiohttp
+import os
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, replace
+from typing import List, Dict, Optional, Tuple
 import logging
 from .trend_analyzer import TrendAnalyzer
 from .profit_calculator import ProfitCalculator
 from .risk_manager import RiskManager
+from .product_features import GOLDEN_NICHES, NICHE_GROUPS, get_feature_extractor
 
-@dataclass
+@dataclass(slots=True)
 class ViralProduct:
     name: str
     category: str
@@ -23,6 +27,142 @@ class ViralProduct:
     risk_level: str
     seasonality: Dict[str, float]
 
+# التقييم الدفعي: أقل من الحد يُقيّم داخل العملية، وأكثر منه يُوزع على مجمع عمليات
+DETECTION_CHUNK_SIZE = 500
+DETECTION_PROCESS_THRESHOLD = 2000
+
+# أقصى عدد منتجات تُحفظ بصماتها لإعادة التقييم التزايدي
+DETECTION_FINGERPRINT_MAX_ENTRIES = 10000
+
+def _build_viral_product(product_data: Dict, amazon_price: float,
+                         profit_calculator: ProfitCalculator, risk_manager: RiskManager) -> ViralProduct:
+    """🎯 تقييم منتج واحد (ربحية + مخاطر + إشارات)"""
+    keyword = product_data['keyword']
+    
+    profit_analysis = profit_calculator.calculate_comprehensive_profit(
+        product_name=keyword,
+        amazon_price=amazon_price,
+        trend_data=product_data
+    )
+    
+    # تقييم المخاطر
+    risk_assessment = risk_manager.assess_product_risk(
+        product_name=keyword,
+        amazon_price=amazon_price,
+        ebay_price=profit_analysis.ebay_price,
+        trend_data=product_data
+    )
+    
+    # إشارات الانتشار الفيروسي
+    viral_signals = []
+    if product_data['trend_score'] > 80:
+        viral_signals.append('🔥 Trending on Google')
+    if profit_analysis.profit_margin > 70:
+        viral_signals.append('💰 High Profit Potential')
+    if product_data['seasonality']:
+        viral_signals.append('📅 Seasonal Opportunity')
+    if risk_assessment.risk_level == 'Low':
+        viral_signals.append('🛡️ Low Risk Investment')
+    
+    return ViralProduct(
+        name=keyword,
+        category=product_data['category'],
+        trend_score=product_data['trend_score'],
+        amazon_price=amazon_price,
+        ebay_avg_price=profit_analysis.ebay_price,
+        profit_margin=profit_analysis.profit_margin,
+        confidence=profit_analysis.confidence_level,
+        viral_signals=viral_signals,
+        risk_level=risk_assessment.risk_level,
+        seasonality=product_data['seasonality']
+    )
+
+_worker_components: Optional[Tuple[ProfitCalculator, RiskManager]] = None
+
+def _score_chunk(chunk: List[Dict], amazon_prices: List[float], seed: int) -> List[ViralProduct]:
+    """تقييم دفعة منتجات داخل عملية عاملة (المكونات تُنشأ مرة لكل عملية)"""
+    global _worker_components
+    
+    if _worker_components is None:
+        _worker_components = (ProfitCalculator(), RiskManager())
+    # بذرة لكل دفعة - العمليات المنسوخة بـ fork تبدأ بنفس حالة المولد
+    np.random.seed(seed)
+    profit_calculator, risk_manager = _worker_components
+    return [
+        _build_viral_product(product_data, price, profit_calculator, risk_manager)
+        for product_data, price in zip(chunk, amazon_prices)
+    ]
+
+class ProductFingerprintStore:
+    """
+    🧬 بصمات مدخلات المنتجات مع آخر نتيجة تقييم
+    
+    البصمة = (trend_score, growth_rate, amazon_price المقدم, الشهر, الموسمية) والمفتاح
+    (keyword, category) - كل ما يقرأه _build_viral_product وحاسبتا الربح والمخاطر.
+    profit_score وrisk لا تدخل فيها: تُستخدم للفلترة قبل التقييم فقط.
+    إذا لم تتغير البصمة تُعاد نسخة من النتيجة السابقة بدل إعادة حساب الربحية والمخاطر.
+    """
+    
+    def __init__(self, max_entries: int = DETECTION_FINGERPRINT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[tuple, ViralProduct]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def key(product_data: Dict) -> Tuple[str, str]:
+        return (product_data['keyword'], product_data.get('category', ''))
+    
+    @staticmethod
+    def fingerprint(product_data: Dict, month: int) -> tuple:
+        seasonality = product_data.get('seasonality') or {}
+        return (
+            product_data.get('trend_score'),
+            product_data.get('growth_rate'),
+            product_data.get('amazon_price'),
+            month,
+            tuple(sorted(seasonality.items()))
+        )
+    
+    @staticmethod
+    def _copy(product: ViralProduct) -> ViralProduct:
+        # نسخة مستقلة - تعديل النتيجة المعادة لا يغير المحفوظ
+        seasonality = dict(product.seasonality) if product.seasonality is not None else None
+        return replace(product, viral_signals=list(product.viral_signals), seasonality=seasonality)
+    
+    def lookup(self, key: Tuple[str, str], fingerprint: tuple) -> Optional[ViralProduct]:
+        """نسخة من النتيجة السابقة إذا لم تتغير المدخلات"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._copy(entry[1])
+    
+    def store(self, key: Tuple[str, str], fingerprint: tuple, product: ViralProduct):
+        self._entries[key] = (fingerprint, self._copy(product))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
 class ViralProductDetector:
     """🔥 AI-Powered Viral Product Detection Engine"""
     
@@ -34,20 +174,28 @@ class ViralProductDetector:
         self.profit_calculator = ProfitCalculator()
         self.risk_manager = RiskManager()
         
+        # مجمع العمليات للدفعات الكبيرة (يُنشأ عند الحاجة)
+        self.max_workers = max(1, (os.cpu_count() or 2) - 1)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        
+        # بصمات المدخلات - المنتجات التي لم تتغير لا يُعاد تقييمها
+        self.fingerprints = ProductFingerprintStore()
+        
         # High-profit niches 2025
         self.golden_niches = {
-            'eco_fashion': {'weight': 35.6, 'keywords': ['sustainable', 'eco', 'organic']},
-            'health_tech': {'weight': 42.3, 'keywords': ['wellness', 'fitness', 'health']},
-            'beauty_care': {'weight': 28.9, 'keywords': ['skincare', 'beauty', 'cosmetic']},
-            'gaming': {'weight': 31.2, 'keywords': ['gaming', 'controller', 'headset']},
-            'outdoor': {'weight': 25.7, 'keywords': ['outdoor', 'camping', 'hiking']},
-            'smart_home': {'weight': 38.4, 'keywords': ['smart', 'home', 'automation']},
-            'phone_accessories': {'weight': 45.1, 'keywords': ['phone case', 'charger', 'wireless']},
-            'pet_supplies': {'weight': 33.8, 'keywords': ['pet', 'dog', 'cat', 'toy']}
+            niche: {'weight': weight, 'keywords': list(keywords)}
+            for niche, (weight, keywords) in GOLDEN_NICHES.items()
         }
+        self._niche_weights = [info['weight'] for info in self.golden_niches.values()]
     
-    async def detect_viral_products(self, limit: int = 20) -> List[ViralProduct]:
-        """🎯 اكتشاف المنتجات الفيروسية المربحة"""
+    async def detect_viral_products(self, limit: Optional[int] = 20) -> List[ViralProduct]:
+        """
+        🎯 اكتشاف المنتجات الفيروسية المربحة
+        
+        Args:
+            limit: أقصى عدد مرشحين يُقيّمون (None = كل المرشحين - فحص الكتالوج الكامل
+                   يتجاوز DETECTION_PROCESS_THRESHOLD فيُوزع على مجمع العمليات)
+        """
         viral_products = []
         
         try:
@@ -60,11 +208,10 @@ class ViralProductDetector:
             # فلترة المنتجات عالية الربح
             high_profit = self._filter_high_profit_products(ai_predictions)
             
-            # تحليل المخاطر والموسمية
-            for product_data in high_profit[:limit]:
-                viral_product = await self._create_viral_product(product_data)
-                if viral_product.profit_margin > 40:  # 40%+ profit margin
-                    viral_products.append(viral_product)
+            # تحليل المخاطر والموسمية - دفعة واحدة لكل المرشحين
+            candidates = high_profit if limit is None else high_profit[:limit]
+            scored = await self._score_candidates(candidates)
+            viral_products = [p for p in scored if p.profit_margin > 40]  # 40%+ profit margin
             
             return sorted(viral_products, key=lambda x: x.confidence, reverse=True)
             
@@ -103,15 +250,15 @@ class ViralProductDetector:
         """💰 حساب نقاط الربحية"""
         base_score = product.get('trend_score', 0)
         
-        # تعزيز النقاط للفئات عالية الربح
-        keyword = product['keyword'].lower()
-        for niche, info in self.golden_niches.items():
-            if any(kw in keyword for kw in info['keywords']):
-                base_score *= (1 + info['weight'] / 100)
-                break
+        # تعزيز النقاط للفئات عالية الربح (أول فئة مطابقة)
+        extractor = get_feature_extractor()
+        features = extractor.features(product['keyword'])
+        niche = extractor.first_group(features, NICHE_GROUPS)
+        if niche >= 0:
+            base_score *= (1 + self._niche_weights[niche] / 100)
         
         # تحليل الطلب مقابل العرض
-        demand_supply_ratio = self._estimate_demand_supply(keyword)
+        demand_supply_ratio = self._estimate_demand_supply(product['keyword'])
         
         return min(base_score * demand_supply_ratio, 100)
     
@@ -120,12 +267,15 @@ class ViralProductDetector:
         # محاكاة ذكية لنسبة الطلب للعرض
         base_ratio = 1.0
         
+        extractor = get_feature_extractor()
+        features = extractor.features(keyword)
+        
         # كلمات عالية الطلب
-        if any(word in keyword.lower() for word in ['wireless', 'smart', 'portable', 'bluetooth']):
+        if extractor.has(features, 'high_demand'):
             base_ratio += 0.3
         
         # كلمات متوسطة الطلب
-        if any(word in keyword.lower() for word in ['gaming', 'fitness', 'kitchen']):
+        if extractor.has(features, 'medium_demand'):
             base_ratio += 0.2
         
         # إضافة تقلب واقعي
@@ -139,7 +289,8 @@ class ViralProductDetector:
         trend_score = product.get('trend_score', 50)
         
         # مخاطر المنافسة
-        competition_risk = 'High' if any(word in keyword.lower() for word in ['phone case', 'charger']) else 'Medium'
+        extractor = get_feature_extractor()
+        competition_risk = 'High' if extractor.has(extractor.features(keyword), 'crowded') else 'Medium'
         
         # مخاطر الطلب
         demand_risk = 'Low' if trend_score > 70 else 'Medium' if trend_score > 40 else 'High'
@@ -165,50 +316,88 @@ class ViralProductDetector:
         
         return high_profit
     
-    async def _create_viral_product(self, product_data: Dict) -> ViralProduct:
-        """🎯 إنشاء كائن المنتج الفيروسي"""
-        keyword = product_data['keyword']
+    async def _score_candidates(self, candidates: List[Dict]) -> List[ViralProduct]:
+        """
+        📦 تقييم المرشحين دفعة واحدة (تزايدياً)
         
-        # حساب الأسعار باستخدام ProfitCalculator
-        amazon_price = np.random.uniform(10, 100)  # محاكاة سعر Amazon
+        المرشحون الذين لم تتغير بصمة مدخلاتهم منذ آخر فحص تُعاد نتائجهم المحفوظة،
+        والباقي فقط يُقيّم. الترتيب يطابق ترتيب المدخلات.
+        """
+        if not candidates:
+            return []
         
-        profit_analysis = self.profit_calculator.calculate_comprehensive_profit(
-            product_name=keyword,
-            amazon_price=amazon_price,
-            trend_data=product_data
-        )
+        month = datetime.now().month
+        results: List[Optional[ViralProduct]] = [None] * len(candidates)
+        changed = []
         
-        # تقييم المخاطر
-        risk_assessment = self.risk_manager.assess_product_risk(
-            product_name=keyword,
-            amazon_price=amazon_price,
-            ebay_price=profit_analysis.ebay_price,
-            trend_data=product_data
-        )
+        for index, product_data in enumerate(candidates):
+            key = self.fingerprints.key(product_data)
+            fingerprint = self.fingerprints.fingerprint(product_data, month)
+            cached = self.fingerprints.lookup(key, fingerprint)
+            if cached is not None:
+                results[index] = cached
+            else:
+                changed.append((index, key, fingerprint))
         
-        # إشارات الانتشار الفيروسي
-        viral_signals = []
-        if product_data['trend_score'] > 80:
-            viral_signals.append('🔥 Trending on Google')
-        if profit_analysis.profit_margin > 70:
-            viral_signals.append('💰 High Profit Potential')
-        if product_data['seasonality']:
-            viral_signals.append('📅 Seasonal Opportunity')
-        if risk_assessment.risk_level == 'Low':
-            viral_signals.append('🛡️ Low Risk Investment')
-        
-        return ViralProduct(
-            name=keyword,
-            category=product_data['category'],
-            trend_score=product_data['trend_score'],
-            amazon_price=amazon_price,
-            ebay_avg_price=profit_analysis.ebay_price,
-            profit_margin=profit_analysis.profit_margin,
-            confidence=profit_analysis.confidence_level,
-            viral_signals=viral_signals,
-            risk_level=risk_assessment.risk_level,
-            seasonality=product_data['seasonality']
-        )
+        if changed:
+            scored = await self._score_changed([candidates[index] for index, _, _ in changed])
+            for (index, key, fingerprint), product in zip(changed, scored):
+                results[index] = product
+                self.fingerprints.store(key, fingerprint, product)
+        
+        if len(changed) < len(candidates):
+            self.logger.info(f"♻️ Reused {len(candidates) - len(changed)}/{len(candidates)} unchanged candidates")
+        
+        return results
+    
+    async def _score_changed(self, candidates: List[Dict]) -> List[ViralProduct]:
+        """
+        تقييم المرشحين المتغيرين
+        
+        الأسعار تُسحب كلها مرة واحدة، والدفعات الكبيرة تُقسم على مجمع عمليات
+        (العمل حسابي بحت فلا فائدة من تزامن asyncio).
+        """
+        # سعر Amazon المقدم أو محاكاة له
+        simulated = np.random.uniform(10, 100, size=len(candidates))
+        amazon_prices = [
+            product_data.get('amazon_price') or float(price)
+            for product_data, price in zip(candidates, simulated)
+        ]
+        
+        if len(candidates) < DETECTION_PROCESS_THRESHOLD or self.max_workers < 2:
+            return [
+                _build_viral_product(product_data, price, self.profit_calculator, self.risk_manager)
+                for product_data, price in zip(candidates, amazon_prices)
+            ]
+        
+        loop = asyncio.get_running_loop()
+        pool = self._get_process_pool()
+        starts = range(0, len(candidates), DETECTION_CHUNK_SIZE)
+        seeds = np.random.randint(0, 2**31 - 1, size=len(starts))
+        
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool, _score_chunk,
+                candidates[start:start + DETECTION_CHUNK_SIZE],
+                amazon_prices[start:start + DETECTION_CHUNK_SIZE],
+                int(seed)
+            )
+            for start, seed in zip(starts, seeds)
+        ))
+        
+        self.logger.info(f"📦 Scored {len(candidates)} candidates in {len(chunks)} chunks")
+        return [product for chunk in chunks for product in chunk]
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+    
+    def close(self):
+        """إيقاف مجمع العمليات"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
     
     def get_detection_summary(self, viral_products: List[ViralProduct]) -> Dict:
         """📋 ملخص الاكتشاف"""
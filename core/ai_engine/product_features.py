@@ -0,0 +1,141 @@
+"""
+🏷️ BraveBot Product Feature Extractor
+=====================================
+استخراج كل ميزات الكلمات من اسم المنتج بتمريرة واحدة (bitset) لكل المقيّمين
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from keyword_matcher import KeywordMatcher
+from seasonality import PRODUCT_DEMAND_RULES, PRODUCT_RISK_RULES
+
+# ===== مجموعات الكلمات (كل مجموعة = بت واحد) =====
+
+PRODUCT_KEYWORD_GROUPS = {
+    # ProfitCalculator - مضاعف سعر eBay
+    'tech': ('gaming', 'tech', 'electronics'),
+    'luxury': ('luxury', 'premium', 'pro'),
+    'generic': ('generic', 'basic', 'simple'),
+    # ProfitCalculator - المخاطر وتحليل السوق
+    'profit_competition': ('phone case', 'charger', 'cable'),
+    'holiday': ('christmas', 'halloween', 'valentine'),
+    'market_high_competition': ('phone case', 'charger', 'earbuds', 'cable'),
+    'market_low_competition': ('professional', 'specialized', 'niche'),
+    # RiskManager - المنافسة والمخاطر التنظيمية
+    'high_competition': ('phone case', 'charger', 'cable', 'earbuds', 'bluetooth speaker', 'power bank'),
+    'medium_competition': ('gaming', 'fitness', 'home decor', 'kitchen'),
+    'high_regulatory': ('electronics', 'battery', 'charger', 'medical', 'health', 'food', 'cosmetic', 'toy'),
+    'medium_regulatory': ('automotive', 'jewelry', 'clothing'),
+    # ViralProductDetector - الطلب والعرض
+    'high_demand': ('wireless', 'smart', 'portable', 'bluetooth'),
+    'medium_demand': ('gaming', 'fitness', 'kitchen'),
+    'crowded': ('phone case', 'charger')
+}
+
+# الفئات عالية الربح 2025: (الوزن، الكلمات) - أول فئة مطابقة تُطبق
+GOLDEN_NICHES = {
+    'eco_fashion': (35.6, ('sustainable', 'eco', 'organic')),
+    'health_tech': (42.3, ('wellness', 'fitness', 'health')),
+    'beauty_care': (28.9, ('skincare', 'beauty', 'cosmetic')),
+    'gaming': (31.2, ('gaming', 'controller', 'headset')),
+    'outdoor': (25.7, ('outdoor', 'camping', 'hiking')),
+    'smart_home': (38.4, ('smart', 'home', 'automation')),
+    'phone_accessories': (45.1, ('phone case', 'charger', 'wireless')),
+    'pet_supplies': (33.8, ('pet', 'dog', 'cat', 'toy'))
+}
+
+# مجموعات مرتبة "أول مطابقة" (الموسمية من seasonality)
+NICHE_GROUPS = tuple(f'niche:{niche}' for niche in GOLDEN_NICHES)
+SEASONAL_DEMAND_GROUPS = tuple(f'seasonal_demand:{i}' for i in range(len(PRODUCT_DEMAND_RULES)))
+SEASONAL_RISK_GROUPS = tuple(f'seasonal_risk:{i}' for i in range(len(PRODUCT_RISK_RULES)))
+
+FEATURE_CACHE_SIZE = 65536
+
+def _all_groups() -> Dict[str, Tuple[str, ...]]:
+    groups = dict(PRODUCT_KEYWORD_GROUPS)
+    groups.update((group, words) for group, (_, words) in zip(NICHE_GROUPS, GOLDEN_NICHES.values()))
+    groups.update((group, words) for group, (words, _, _) in zip(SEASONAL_DEMAND_GROUPS, PRODUCT_DEMAND_RULES))
+    groups.update((group, words) for group, (_, words, _) in zip(SEASONAL_RISK_GROUPS, PRODUCT_RISK_RULES))
+    return groups
+
+class ProductFeatureExtractor:
+    """
+    🏷️ مستخرج ميزات أسماء المنتجات
+
+    bitset لكل المجموعات من KeywordMatcher المشترك - النتائج مخزنة لكل اسم.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]], cache_size: int = FEATURE_CACHE_SIZE):
+        if len(groups) > 64:
+            raise ValueError(f"At most 64 feature groups are supported, got {len(groups)}")
+
+        self.groups = tuple(groups)
+        self._bits = {group: 1 << index for index, group in enumerate(self.groups)}
+        self._matcher = KeywordMatcher(list(groups.items()))
+        self.features = lru_cache(maxsize=cache_size)(self._matcher.mask)
+
+    def bit(self, group: str) -> int:
+        """قناع البت لمجموعة"""
+        return self._bits[group]
+
+    def has(self, bits: int, group: str) -> bool:
+        """هل الاسم يحتوي كلمة من المجموعة"""
+        return bool(bits & self._bits[group])
+
+    def first_group(self, bits: int, groups: Sequence[str]) -> int:
+        """رقم أول مجموعة مطابقة من قائمة مرتبة (-1 إن لم توجد)"""
+        for index, group in enumerate(groups):
+            if bits & self._bits[group]:
+                return index
+        return -1
+
+    # ===== الدفعات =====
+
+    def feature_array(self, names: Sequence[str]) -> np.ndarray:
+        """bitset لكل اسم (uint64) - كل اسم فريد يُفحص مرة واحدة"""
+        codes, unique_names = pd.factorize(pd.Series(names, dtype=object).astype(str))
+        unique_bits = np.fromiter((self.features(name) for name in unique_names),
+                                  dtype=np.uint64, count=len(unique_names))
+        return unique_bits[codes]
+
+    def column(self, bits: np.ndarray, group: str) -> np.ndarray:
+        """عمود منطقي: هل كل اسم يحتوي كلمة من المجموعة"""
+        return (bits & np.uint64(self._bits[group])) != 0
+
+    def first_group_column(self, bits: np.ndarray, groups: Sequence[str]) -> np.ndarray:
+        """رقم أول مجموعة مطابقة لكل اسم (-1 إن لم توجد)"""
+        rules = np.full(len(bits), -1, dtype=np.int64)
+        for index in reversed(range(len(groups))):
+            rules = np.where(self.column(bits, groups[index]), index, rules)
+        return rules
+
+    def cache_info(self):
+        return self.features.cache_info()
+
+_extractor: Optional[ProductFeatureExtractor] = None
+_extractor_lock = threading.Lock()
+
+def get_feature_extractor() -> ProductFeatureExtractor:
+    """المستخرج المشترك لكل المقيّمين"""
+    global _extractor
+
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = ProductFeatureExtractor(_all_groups())
+    return _extractor
+
+__all__ = [
+    'ProductFeatureExtractor',
+    'get_feature_extractor',
+    'PRODUCT_KEYWORD_GROUPS',
+    'GOLDEN_NICHES',
+    'NICHE_GROUPS',
+    'SEASONAL_DEMAND_GROUPS',
+    'SEASONAL_RISK_GROUPS'
+]
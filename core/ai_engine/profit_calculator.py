@@ -1,11 +1,60 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
-@dataclass
+from seasonality import get_seasonal_index
+from .product_features import SEASONAL_DEMAND_GROUPS, get_feature_extractor
+from .result_store import ColumnarResultStore
+
+# تعديلات مضاعف سعر eBay حسب مجموعات كلمات اسم المنتج (product_features)
+EBAY_MULTIPLIER_ADJUSTMENTS = (
+    ('tech', 0.3),       # منتجات تقنية أغلى
+    ('luxury', 0.4),     # منتجات راقية
+    ('generic', -0.2)    # منتجات بسيطة أرخص
+)
+
+# محاكاة مونت كارلو: عدد عناصر المصفوفة (منتجات × سيناريوهات) لكل دفعة
+MONTE_CARLO_DRAWS = 10000
+MONTE_CARLO_CHUNK_ELEMENTS = 4_000_000
+MONTE_CARLO_PERCENTILES = (5, 25, 50, 75, 95)
+MONTE_CARLO_PERCENTILE_BINS = 2048
+
+def _histogram_percentiles(values: np.ndarray, percentiles: Tuple[float, ...],
+                           bins: int = MONTE_CARLO_PERCENTILE_BINS) -> np.ndarray:
+    """
+    نسب مئوية لكل صف من هيستوغرام (bincount واحد لكل الصفوف)
+    
+    أسرع بكثير من np.percentile (تقسيم كامل لكل صف)، والخطأ أقل من عرض خانة
+    واحدة (مدى الصف / bins) - أصغر من خطأ العينة في المحاكاة نفسها.
+    """
+    rows, draws = values.shape
+    low = values.min(axis=1).astype(np.float64)
+    width = (values.max(axis=1) - low) / bins
+    width[width == 0] = 1
+    
+    index = values - low[:, None].astype(values.dtype)
+    index *= (1 / width)[:, None].astype(values.dtype)
+    index = index.astype(np.int32)
+    np.minimum(index, bins - 1, out=index)
+    index += (np.arange(rows, dtype=np.int32) * bins)[:, None]
+    
+    counts = np.bincount(index.ravel(), minlength=rows * bins).reshape(rows, bins)
+    cumulative = np.cumsum(counts, axis=1)
+    row_index = np.arange(rows)
+    
+    result = np.empty((len(percentiles), rows))
+    for i, percentile in enumerate(percentiles):
+        target = percentile / 100 * draws
+        bin_index = np.minimum(np.count_nonzero(cumulative < target, axis=1), bins - 1)
+        below = np.where(bin_index > 0, cumulative[row_index, np.maximum(bin_index - 1, 0)], 0)
+        inside = np.maximum(counts[row_index, bin_index], 1)
+        result[i] = low + (bin_index + (target - below) / inside) * width
+    return result
+
+@dataclass(slots=True)
 class ProfitAnalysis:
     """📊 تحليل الربحية"""
     product_name: str
@@ -37,6 +86,15 @@ class ProfitCalculator:
             'currency_fluctuation': 0.02  # 2% تقلبات العملة
         }
         
+        # نطاقات سيناريوهات المحاكاة (مضاعفات منتظمة للقيم الأساسية)
+        # كل نطاق متمركز على 1.0 - متوسط السيناريوهات يساوي التقدير النقطي أعلاه
+        self.simulation_ranges = {
+            'price_factor': (0.9, 1.1),           # تقلب سعر البيع ±10%
+            'ebay_fees': (0.8, 1.2),              # 8% - 12% رسوم eBay حسب الفئة والعروض
+            'return_rate': (0.0, 2.0),            # 0% - 10% إرجاع
+            'currency_fluctuation': (-1.0, 3.0)   # -2% - 6% تقلبات العملة
+        }
+        
         # عوامل المخاطر
         self.risk_factors = {
             'high_competition': 0.3,
@@ -102,16 +160,12 @@ class ProfitCalculator:
         base_multiplier = 1.6
         
         # تعديل حسب نوع المنتج
-        product_lower = product_name.lower()
-        
-        if any(word in product_lower for word in ['gaming', 'tech', 'electronics']):
-            base_multiplier += 0.3  # منتجات تقنية أغلى
-        
-        if any(word in product_lower for word in ['luxury', 'premium', 'pro']):
-            base_multiplier += 0.4  # منتجات راقية
+        extractor = get_feature_extractor()
+        features = extractor.features(product_name)
         
-        if any(word in product_lower for word in ['generic', 'basic', 'simple']):
-            base_multiplier -= 0.2  # منتجات بسيطة أرخص
+        for group, adjustment in EBAY_MULTIPLIER_ADJUSTMENTS:
+            if extractor.has(features, group):
+                base_multiplier += adjustment
         
         # تعديل حسب بيانات الاتجاه
         if trend_data:
@@ -181,12 +235,13 @@ class ProfitCalculator:
             risk_score += 15  # منتجات رخيصة جداً قد تكون مشبوهة
         
         # مخاطر المنافسة (حسب نوع المنتج)
-        product_lower = product_name.lower()
-        if any(word in product_lower for word in ['phone case', 'charger', 'cable']):
+        extractor = get_feature_extractor()
+        features = extractor.features(product_name)
+        if extractor.has(features, 'profit_competition'):
             risk_score += self.risk_factors['high_competition'] * 100
         
         # مخاطر الموسمية
-        if any(word in product_lower for word in ['christmas', 'halloween', 'valentine']):
+        if extractor.has(features, 'holiday'):
             risk_score += self.risk_factors['seasonal_product'] * 100
         
         # مخاطر الطلب (حسب بيانات الاتجاه)
@@ -225,7 +280,8 @@ class ProfitCalculator:
     
     def _analyze_market_conditions(self, product_name: str, trend_data: Dict = None) -> Dict:
         """📊 تحليل ظروف السوق"""
-        product_lower = product_name.lower()
+        extractor = get_feature_extractor()
+        features = extractor.features(product_name)
         
         # تحليل الطلب
         demand = 'Medium'  # افتراضي
@@ -240,11 +296,11 @@ class ProfitCalculator:
         competition = 'Medium'  # افتراضي
         
         # منتجات عالية المنافسة
-        if any(word in product_lower for word in ['phone case', 'charger', 'earbuds', 'cable']):
+        if extractor.has(features, 'market_high_competition'):
             competition = 'High'
         
         # منتجات متخصصة أقل منافسة
-        elif any(word in product_lower for word in ['professional', 'specialized', 'niche']):
+        elif extractor.has(features, 'market_low_competition'):
             competition = 'Low'
         
         return {
@@ -254,69 +310,266 @@ class ProfitCalculator:
     
     def _calculate_seasonal_factor(self, product_name: str) -> float:
         """📅 حساب العامل الموسمي"""
-        current_month = datetime.now().month
-        product_lower = product_name.lower()
+        extractor = get_feature_extractor()
+        rule = extractor.first_group(extractor.features(product_name), SEASONAL_DEMAND_GROUPS)
+        return float(get_seasonal_index().factor_for_rule(rule))
+    
+    def batch_analyze_products(self, products: Union[List[Dict], pd.DataFrame],
+                               as_frame: bool = False,
+                               rng: Optional[np.random.Generator] = None,
+                               as_store: bool = False
+                               ) -> Union[List[ProfitAnalysis], pd.DataFrame, ColumnarResultStore]:
+        """
+        📦 تحليل دفعي للمنتجات (مسار أعمدة NumPy)
+        
+        Args:
+            products: قائمة قواميس (name, amazon_price, ebay_price, trend_data)
+                      أو DataFrame بالأعمدة name, amazon_price, ebay_price, trend_score, growth_rate
+            as_frame: إعادة DataFrame بأعمدة ProfitAnalysis بدل قائمة الكائنات
+            rng: مولد أرقام عشوائية (للاختبار)
+            as_store: إعادة ColumnarResultStore (للكتالوجات الكبيرة - بدون كائن لكل منتج)
+        """
+        frame = self.analyze_frame(products, rng=rng)
+        if as_store:
+            return ColumnarResultStore.from_frame(frame, ProfitAnalysis)
+        return frame if as_frame else self.frame_to_analyses(frame)
+    
+    def analyze_frame(self, products: Union[List[Dict], pd.DataFrame],
+                      rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+        """
+        📊 حساب الربحية لكل الصفوف بعمليات أعمدة - نفس منطق calculate_comprehensive_profit
+        
+        الصفوف بسعر Amazon صفري أو مفقود تُستبعد (كانت تفشل في المسار الفردي).
+        النتيجة مرتبة حسب هامش الربح تنازلياً.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        inputs = self._valid_batch_inputs(products)
+        prices = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        
+        count = len(prices)
+        trend_score = inputs['trend_score'].fillna(50).to_numpy(dtype=np.float64)
+        growth_rate = inputs['growth_rate'].fillna(0).to_numpy(dtype=np.float64)
+        
+        # ميزات الكلمات لكل صف (كل اسم فريد يُفحص مرة واحدة)
+        extractor = get_feature_extractor()
+        features = extractor.feature_array(inputs['name'].to_numpy())
+        
+        def has_any(group: str) -> np.ndarray:
+            return extractor.column(features, group)
+        
+        # تقدير سعر eBay للصفوف التي لم يُقدم لها سعر
+        ebay_price = inputs['ebay_price'].to_numpy(dtype=np.float64, copy=True)
+        missing = np.isnan(ebay_price)
+        if missing.any():
+            multiplier = self._ebay_multiplier_columns(prices, trend_score, features)
+            estimated = prices[missing] * multiplier[missing] * rng.uniform(0.9, 1.1, size=int(missing.sum()))
+            ebay_price[missing] = np.round(estimated, 2)
+        
+        # حساب التكاليف الإجمالية والربح الصافي
+        total_cost = self._total_cost_columns(prices)
+        net_profit = ebay_price - total_cost
+        profit_margin = np.divide(net_profit, total_cost, out=np.zeros(count), where=total_cost > 0) * 100
+        roi = np.divide(net_profit, prices, out=np.zeros(count), where=prices > 0) * 100
+        
+        # نقاط المخاطر
+        markup = (ebay_price - prices) / prices * 100
+        risk_score = np.select([markup < 20, markup < 40], [40.0, 20.0], 0.0)
+        risk_score += np.select([prices > 200, prices < 5], [25.0, 15.0], 0.0)
+        risk_score += np.where(has_any('profit_competition'), self.risk_factors['high_competition'] * 100, 0.0)
+        risk_score += np.where(has_any('holiday'), self.risk_factors['seasonal_product'] * 100, 0.0)
+        risk_score += np.where(trend_score < 30, self.risk_factors['low_demand'] * 100, 0.0)
+        risk_score = np.minimum(risk_score, 100)
         
-        seasonal_boost = 1.0  # عامل افتراضي
+        # مستوى الثقة
+        confidence = 70 - risk_score * 0.5
+        confidence += np.select([trend_score > 70, trend_score < 30], [15.0, -20.0], 0.0)
+        confidence += np.select([growth_rate > 20, growth_rate < -10], [10.0, -15.0], 0.0)
+        confidence = np.clip(confidence, 10, 95)
         
-        # منتجات الكريسماس (نوفمبر - ديسمبر)
-        if any(word in product_lower for word in ['gift', 'decoration', 'christmas']):
-            if current_month in [11, 12]:
-                seasonal_boost = 1.8
-            elif current_month in [9, 10]:
-                seasonal_boost = 1.3
-            else:
-                seasonal_boost = 0.7
-        
-        # منتجات الصيف (مايو - أغسطس)
-        elif any(word in product_lower for word in ['outdoor', 'swimming', 'travel', 'beach']):
-            if current_month in [5, 6, 7, 8]:
-                seasonal_boost = 1.6
-            elif current_month in [3, 4, 9]:
-                seasonal_boost = 1.2
-            else:
-                seasonal_boost = 0.8
-        
-        # منتجات العودة للمدرسة (يوليو - سبتمبر)
-        elif any(word in product_lower for word in ['laptop', 'backpack', 'stationery', 'desk']):
-            if current_month in [7, 8, 9]:
-                seasonal_boost = 1.7
-            elif current_month in [6, 10]:
-                seasonal_boost = 1.3
-            else:
-                seasonal_boost = 0.9
-        
-        # منتجات الفتنس (يناير - مارس)
-        elif any(word in product_lower for word in ['fitness', 'yoga', 'protein', 'gym']):
-            if current_month in [1, 2, 3]:
-                seasonal_boost = 1.5
-            elif current_month in [4, 12]:
-                seasonal_boost = 1.2
-            else:
-                seasonal_boost = 0.9
+        # تحليل السوق
+        demand = np.select([trend_score > 70, trend_score < 30], ['High', 'Low'], 'Medium')
+        competition = np.select(
+            [has_any('market_high_competition'), has_any('market_low_competition')],
+            ['High', 'Low'], 'Medium'
+        )
         
-        return seasonal_boost
-    
-    def batch_analyze_products(self, products: List[Dict]) -> List[ProfitAnalysis]:
-        """📦 تحليل دفعي للمنتجات"""
-        analyses = []
-        
-        for product in products:
-            try:
-                analysis = self.calculate_comprehensive_profit(
-                    product_name=product.get('name', 'Unknown Product'),
-                    amazon_price=product.get('amazon_price', 0),
-                    estimated_ebay_price=product.get('ebay_price'),
-                    trend_data=product.get('trend_data')
-                )
-                analyses.append(analysis)
-            except Exception as e:
-                self.logger.error(f"Error analyzing {product.get('name', 'Unknown')}: {e}")
-                continue
+        # العامل الموسمي ونقطة التعادل
+        seasonal_factor = get_seasonal_index().factor_for_rule(
+            extractor.first_group_column(features, SEASONAL_DEMAND_GROUPS)
+        )
+        break_even = np.maximum(1, np.floor(50 / np.maximum(net_profit, 0.01))).astype(np.int64)
+        
+        frame = pd.DataFrame({
+            'product_name': inputs['name'].to_numpy(),
+            'amazon_price': prices,
+            'ebay_price': ebay_price,
+            'profit_amount': net_profit,
+            'profit_margin': profit_margin,
+            'roi': roi,
+            'break_even_quantity': break_even,
+            'risk_score': risk_score,
+            'confidence_level': confidence,
+            'market_demand': demand,
+            'competition_level': competition,
+            'seasonal_factor': seasonal_factor
+        })
         
         # ترتيب حسب هامش الربح
-        analyses.sort(key=lambda x: x.profit_margin, reverse=True)
-        return analyses
+        return frame.sort_values('profit_margin', ascending=False, kind='stable').reset_index(drop=True)
+    
+    @staticmethod
+    def frame_to_analyses(frame: pd.DataFrame) -> List[ProfitAnalysis]:
+        """تحويل نتيجة analyze_frame إلى كائنات ProfitAnalysis"""
+        columns = [field.name for field in fields(ProfitAnalysis)]
+        return [ProfitAnalysis(*row) for row in frame[columns].itertuples(index=False, name=None)]
+    
+    def simulate_profit_distribution(self, products: Union[List[Dict], pd.DataFrame],
+                                     draws: int = MONTE_CARLO_DRAWS,
+                                     percentiles: Tuple[float, ...] = MONTE_CARLO_PERCENTILES,
+                                     rng: Optional[np.random.Generator] = None,
+                                     chunk_elements: int = MONTE_CARLO_CHUNK_ELEMENTS,
+                                     exact_percentiles: bool = False) -> pd.DataFrame:
+        """
+        🎲 توزيع الربح الصافي بمحاكاة مونت كارلو (مصفوفات NumPy)
+        
+        لكل منتج تُسحب `draws` سيناريوهات لسعر البيع ورسوم eBay والإرجاع وتقلبات العملة
+        ضمن simulation_ranges. المنتجات تُعالج على دفعات بحيث لا تتجاوز المصفوفة
+        chunk_elements عنصراً مهما كان حجم الكتالوج.
+        
+        Args:
+            products: نفس مدخلات batch_analyze_products
+            draws: عدد السيناريوهات لكل منتج
+            percentiles: النسب المئوية المطلوبة للربح الصافي
+            rng: مولد أرقام عشوائية (للاختبار)
+            chunk_elements: أقصى عدد عناصر (منتجات × سيناريوهات) لكل دفعة
+            exact_percentiles: np.percentile بدل تقدير الهيستوغرام (أبطأ بمرتين تقريباً)
+        
+        Returns:
+            DataFrame بترتيب المدخلات: product_name, amazon_price, ebay_price, expected_profit,
+            profit_std, profit_p{N} لكل نسبة, probability_of_loss
+        """
+        if draws < 1:
+            raise ValueError(f"draws must be at least 1, got {draws}")
+        if chunk_elements < 1:
+            raise ValueError(f"chunk_elements must be at least 1, got {chunk_elements}")
+        
+        rng = rng if rng is not None else np.random.default_rng()
+        inputs = self._valid_batch_inputs(products)
+        prices = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        trend_score = inputs['trend_score'].fillna(50).to_numpy(dtype=np.float64)
+        
+        # سعر eBay الأساسي: المقدم أو التقدير بدون التقلب العشوائي (التقلب من السيناريوهات)
+        ebay_price = inputs['ebay_price'].to_numpy(dtype=np.float64, copy=True)
+        missing = np.isnan(ebay_price)
+        if missing.any():
+            features = get_feature_extractor().feature_array(inputs['name'].to_numpy())
+            ebay_price[missing] = (prices * self._ebay_multiplier_columns(prices, trend_score, features))[missing]
+        
+        # الأجزاء الثابتة من التكلفة لكل منتج
+        costs = self.additional_costs
+        fixed_cost = prices * (1 + costs['paypal_fees']) + costs['shipping_cost'] + costs['packaging_cost']
+        varying = [
+            (prices * costs[name], self.simulation_ranges[name])
+            for name in ('ebay_fees', 'return_rate', 'currency_fluctuation')
+        ]
+        
+        count = len(prices)
+        results = {
+            'expected_profit': np.empty(count),
+            'profit_std': np.empty(count),
+            'probability_of_loss': np.empty(count)
+        }
+        bands = np.empty((len(percentiles), count))
+        
+        rows_per_chunk = max(1, chunk_elements // draws)
+        for start in range(0, count, rows_per_chunk):
+            rows = slice(start, min(start + rows_per_chunk, count))
+            shape = (rows.stop - rows.start, draws)
+            
+            # الربح = سعر البيع × عامل السعر - التكلفة الثابتة - التكاليف المتغيرة
+            low, high = self.simulation_ranges['price_factor']
+            profit = rng.random(shape, dtype=np.float32)
+            profit *= (ebay_price[rows] * (high - low))[:, None]
+            profit += (ebay_price[rows] * low - fixed_cost[rows])[:, None]
+            
+            scenario = np.empty(shape, dtype=np.float32)
+            for base, (low, high) in varying:
+                rng.random(shape, dtype=np.float32, out=scenario)
+                scenario *= (base[rows] * (high - low))[:, None]
+                scenario += (base[rows] * low)[:, None]
+                profit -= scenario
+            
+            results['expected_profit'][rows] = profit.mean(axis=1)
+            results['profit_std'][rows] = profit.std(axis=1)
+            results['probability_of_loss'][rows] = np.count_nonzero(profit < 0, axis=1) / draws
+            if exact_percentiles:
+                bands[:, rows] = np.percentile(profit, percentiles, axis=1)
+            else:
+                bands[:, rows] = _histogram_percentiles(profit, percentiles)
+        
+        frame = pd.DataFrame({
+            'product_name': inputs['name'].to_numpy(),
+            'amazon_price': prices,
+            'ebay_price': np.round(ebay_price, 2),
+            'expected_profit': results['expected_profit'],
+            'profit_std': results['profit_std']
+        })
+        for percentile, band in zip(percentiles, bands):
+            frame[f'profit_p{percentile:g}'] = band
+        frame['probability_of_loss'] = results['probability_of_loss']
+        return frame
+    
+    def _valid_batch_inputs(self, products: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+        """المدخلات الموحدة بدون الصفوف ذات سعر Amazon صفري أو مفقود (تفشل في المسار الفردي)"""
+        inputs = self._batch_inputs(products)
+        prices = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        valid = np.isfinite(prices) & (prices != 0)
+        if not valid.all():
+            self.logger.error(f"Skipping {int((~valid).sum())} products without a usable amazon_price")
+            inputs = inputs[valid]
+        return inputs
+    
+    def _ebay_multiplier_columns(self, prices: np.ndarray, trend_score: np.ndarray,
+                                 features: np.ndarray) -> np.ndarray:
+        """💡 نسخة أعمدة من مضاعف _estimate_ebay_price (بدون التقلب العشوائي)"""
+        extractor = get_feature_extractor()
+        multiplier = np.full(len(prices), 1.6)
+        for group, adjustment in EBAY_MULTIPLIER_ADJUSTMENTS:
+            multiplier += np.where(extractor.column(features, group), adjustment, 0.0)
+        multiplier += np.select([trend_score > 80, trend_score < 30], [0.5, -0.3], 0.0)
+        multiplier += np.select([prices < 10, prices > 100], [0.8, -0.2], 0.0)
+        return np.clip(multiplier, 1.2, 3.0)
+    
+    def _total_cost_columns(self, prices: np.ndarray) -> np.ndarray:
+        """💸 نسخة أعمدة من _calculate_total_cost"""
+        costs = self.additional_costs
+        fees = (prices * costs['ebay_fees'] + prices * costs['paypal_fees'] +
+                (costs['shipping_cost'] + costs['packaging_cost']) +
+                prices * costs['return_rate'] + prices * costs['currency_fluctuation'])
+        return np.round(prices + fees, 2)
+    
+    @staticmethod
+    def _batch_inputs(products: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+        """توحيد المدخلات إلى أعمدة name, amazon_price, ebay_price, trend_score, growth_rate"""
+        if isinstance(products, pd.DataFrame):
+            frame = products
+        else:
+            trend = [product.get('trend_data') or {} for product in products]
+            frame = pd.DataFrame({
+                'name': [product.get('name', 'Unknown Product') for product in products],
+                'amazon_price': [product.get('amazon_price', 0) for product in products],
+                'ebay_price': [product.get('ebay_price') for product in products],
+                'trend_score': [t.get('trend_score') for t in trend],
+                'growth_rate': [t.get('growth_rate') for t in trend]
+            })
+        
+        columns = {}
+        columns['name'] = frame['name'] if 'name' in frame else pd.Series('Unknown Product', index=frame.index)
+        columns['amazon_price'] = pd.to_numeric(frame['amazon_price'], errors='coerce')
+        for column in ('ebay_price', 'trend_score', 'growth_rate'):
+            columns[column] = (pd.to_numeric(frame[column], errors='coerce') if column in frame
+                               else pd.Series(np.nan, index=frame.index))
+        return pd.DataFrame(columns)
     
     def get_profit_recommendations(self, analysis: ProfitAnalysis) -> List[str]:
         """💡 توصيات الربح"""
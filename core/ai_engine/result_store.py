@@ -0,0 +1,250 @@
+"""
+🗃️ BraveBot Columnar Result Store
+=================================
+تخزين نتائج التحليل الكبيرة كأعمدة NumPy بدل قائمة كائنات - مع عرض صفوف كسول
+"""
+
+import logging
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Arrow اختياري - للتصدير فقط
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# أنواع الأعمدة
+_NUMBER = "number"        # مصفوفة رقمية/منطقية كما هي
+_NULLABLE = "nullable"    # أرقام اختيارية (NaN = None)
+_DATETIME = "datetime"    # datetime64[us]
+_DICTIONARY = "dict"      # أكواد + قيم فريدة (نصوص، Enum)
+_OBJECT = "object"        # قوائم وقواميس وغيرها
+
+def _smallest_code_dtype(size: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+class _Column:
+    """عمود واحد مرمز"""
+
+    __slots__ = ("kind", "values", "categories")
+
+    def __init__(self, kind: str, values: np.ndarray, categories: Optional[np.ndarray] = None):
+        self.kind = kind
+        self.values = values
+        self.categories = categories
+
+    @classmethod
+    def encode(cls, values) -> "_Column":
+        if isinstance(values, np.ndarray):
+            if values.dtype.kind in "biuf":
+                return cls(_NUMBER, values)
+            if values.dtype.kind == "M":
+                return cls(_DATETIME, values.astype("datetime64[us]"))
+
+        values = list(values)
+        present = [value for value in values if value is not None]
+        has_none = len(present) != len(values)
+        kinds = {type(value) for value in present}
+
+        if kinds and all(issubclass(kind, (bool, np.bool_)) for kind in kinds) and not has_none:
+            return cls(_NUMBER, np.array(values, dtype=bool))
+
+        if kinds and all(issubclass(kind, (int, float, np.integer, np.floating))
+                         and not issubclass(kind, (bool, np.bool_)) for kind in kinds):
+            if has_none:
+                return cls(_NULLABLE, np.array([np.nan if v is None else v for v in values], dtype=np.float64))
+            return cls(_NUMBER, np.array(values))
+
+        if kinds and all(issubclass(kind, datetime) for kind in kinds) and not has_none:
+            try:
+                return cls(_DATETIME, np.array(values, dtype="datetime64[us]"))
+            except (TypeError, ValueError):
+                pass  # مثلاً datetime مع منطقة زمنية
+
+        try:
+            codes, categories = pd.factorize(pd.Series(values, dtype=object))
+        except TypeError:
+            categories = None  # قيم غير قابلة للتجزئة (قوائم، قواميس)
+
+        # الترميز يفيد فقط مع التكرار - القيم شبه الفريدة (أسماء المنتجات) تبقى كما هي
+        if categories is not None and len(categories) <= len(values) // 2:
+            return cls(_DICTIONARY, codes.astype(_smallest_code_dtype(len(categories))),
+                       np.asarray(categories, dtype=object))
+
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return cls(_OBJECT, array)
+
+    def get(self, index: int) -> Any:
+        value = self.values[index]
+        if self.kind == _DICTIONARY:
+            return None if value < 0 else self.categories[value]
+        if self.kind == _NULLABLE:
+            return None if np.isnan(value) else float(value)
+        if self.kind == _OBJECT:
+            return value
+        return value.item()
+
+    def array(self) -> np.ndarray:
+        """العمود كمصفوفة مفكوكة"""
+        if self.kind == _DICTIONARY:
+            decoded = np.empty(len(self.values), dtype=object)
+            valid = self.values >= 0
+            decoded[valid] = self.categories[self.values[valid]]
+            decoded[~valid] = None
+            return decoded
+        return self.values
+
+    def take(self, indices: np.ndarray) -> "_Column":
+        return _Column(self.kind, self.values[indices], self.categories)
+
+    @property
+    def nbytes(self) -> int:
+        size = self.values.nbytes
+        if self.categories is not None:
+            size += self.categories.nbytes
+        return size
+
+class RowView:
+    """عرض كسول لصف واحد - القيم تُقرأ من الأعمدة عند الطلب"""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "ColumnarResultStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            column = self._store._columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return column.get(self._index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: column.get(self._index) for name, column in self._store._columns.items()}
+
+    def to_record(self):
+        """تحويل الصف إلى كائن من نوع السجل الأصلي"""
+        return self._store.record_type(**self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"RowView({self._store.record_type.__name__}, {self.to_dict()!r})"
+
+class ColumnarResultStore:
+    """
+    🗃️ مخزن نتائج عمودي
+
+    - كل حقل من السجل (dataclass) يُخزن كمصفوفة NumPy واحدة
+    - النصوص المتكررة (مستويات المخاطر، الفئات، Enum) تُرمز كأكواد صغيرة
+    - store[i] يعيد RowView بدون إنشاء كائن، وrecords() ينشئ الكائنات عند الحاجة
+    """
+
+    def __init__(self, record_type: type, columns: Dict[str, _Column], length: int):
+        self.record_type = record_type
+        self._columns = columns
+        self._length = length
+
+    @classmethod
+    def from_records(cls, records: Sequence, record_type: Optional[type] = None) -> "ColumnarResultStore":
+        """بناء المخزن من قائمة سجلات dataclass"""
+        if record_type is None:
+            if not records:
+                raise ValueError("record_type is required for an empty store")
+            record_type = type(records[0])
+        if not is_dataclass(record_type):
+            raise TypeError(f"{record_type!r} is not a dataclass")
+
+        columns = {
+            field.name: _Column.encode([getattr(record, field.name) for record in records])
+            for field in fields(record_type)
+        }
+        return cls(record_type, columns, len(records))
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, record_type: type) -> "ColumnarResultStore":
+        """بناء المخزن من DataFrame بأسماء حقول السجل (مثل نتائج analyze_frame)"""
+        columns = {
+            field.name: _Column.encode(frame[field.name].to_numpy())
+            for field in fields(record_type)
+        }
+        return cls(record_type, columns, len(frame))
+
+    # ===== الوصول =====
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> RowView:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        for index in range(self._length):
+            yield RowView(self, index)
+
+    @property
+    def field_names(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """عمود كامل كمصفوفة NumPy"""
+        return self._columns[name].array()
+
+    def take(self, indices) -> "ColumnarResultStore":
+        """مخزن جديد بالصفوف المحددة (ترتيب، فلترة، أفضل N)"""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        columns = {name: column.take(indices) for name, column in self._columns.items()}
+        return ColumnarResultStore(self.record_type, columns, len(indices))
+
+    def records(self) -> List:
+        """إنشاء كل السجلات ككائنات"""
+        return [view.to_record() for view in self]
+
+    # ===== التصدير =====
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {}
+        for name, column in self._columns.items():
+            if column.kind == _DICTIONARY and all(isinstance(c, str) for c in column.categories):
+                data[name] = pd.Categorical.from_codes(column.values, categories=column.categories)
+            else:
+                data[name] = column.array()
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """تصدير كجدول Arrow (يتطلب pyarrow)"""
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for to_arrow()")
+        return pa.Table.from_pandas(self.to_frame(), preserve_index=False)
+
+    @property
+    def nbytes(self) -> int:
+        """حجم الأعمدة بالبايت (بدون محتوى الكائنات في أعمدة object)"""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def __repr__(self) -> str:
+        return f"ColumnarResultStore({self.record_type.__name__}, rows={self._length})"
+
+__all__ = [
+    'ColumnarResultStore',
+    'RowView',
+    'ARROW_AVAILABLE'
+]
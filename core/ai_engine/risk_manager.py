@@ -1,11 +1,34 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
 
-@dataclass
+from seasonality import get_seasonal_index
+from .product_features import SEASONAL_RISK_GROUPS, get_feature_extractor
+
+# ترتيب أعمدة مصفوفة عوامل المخاطر (نفس مفاتيح risk_weights)
+RISK_FACTOR_COLUMNS = (
+    'price_volatility',
+    'competition_level',
+    'market_demand',
+    'seasonality',
+    'supplier_reliability',
+    'regulatory_risk'
+)
+
+# حدود ظهور كل عامل في قائمة risk_factors
+RISK_FACTOR_ALERTS = {
+    'price_volatility': (70, "⚠️ High price volatility ({:.1f}%)"),
+    'competition_level': (60, "🥊 High competition level ({:.1f}%)"),
+    'market_demand': (50, "📉 Market demand concerns ({:.1f}%)"),
+    'seasonality': (40, "📅 Seasonal dependency ({:.1f}%)"),
+    'supplier_reliability': (30, "🏪 Supplier reliability concerns ({:.1f}%)"),
+    'regulatory_risk': (25, "📋 Regulatory compliance risk ({:.1f}%)")
+}
+
+@dataclass(slots=True)
 class RiskAssessment:
     """⚠️ تقييم المخاطر"""
     product_name: str
@@ -48,44 +71,15 @@ class RiskManager:
                            market_data: Dict = None) -> RiskAssessment:
         """🎯 تقييم مخاطر المنتج الشامل"""
         
-        risk_factors = []
-        risk_scores = {}
-        
-        # تحليل تقلبات الأسعار
-        price_volatility = self._assess_price_volatility(amazon_price, ebay_price)
-        risk_scores['price_volatility'] = price_volatility
-        if price_volatility > 70:
-            risk_factors.append(f"⚠️ High price volatility ({price_volatility:.1f}%)")
-        
-        # تحليل مستوى المنافسة
-        competition_risk = self._assess_competition_risk(product_name, market_data)
-        risk_scores['competition_level'] = competition_risk
-        if competition_risk > 60:
-            risk_factors.append(f"🥊 High competition level ({competition_risk:.1f}%)")
-        
-        # تحليل طلب السوق
-        demand_risk = self._assess_demand_risk(trend_data)
-        risk_scores['market_demand'] = demand_risk
-        if demand_risk > 50:
-            risk_factors.append(f"📉 Market demand concerns ({demand_risk:.1f}%)")
-        
-        # تحليل المخاطر الموسمية
-        seasonal_risk = self._assess_seasonal_risk(product_name)
-        risk_scores['seasonality'] = seasonal_risk
-        if seasonal_risk > 40:
-            risk_factors.append(f"📅 Seasonal dependency ({seasonal_risk:.1f}%)")
-        
-        # تحليل موثوقية المورد
-        supplier_risk = self._assess_supplier_risk(amazon_price)
-        risk_scores['supplier_reliability'] = supplier_risk
-        if supplier_risk > 30:
-            risk_factors.append(f"🏪 Supplier reliability concerns ({supplier_risk:.1f}%)")
-        
-        # المخاطر التنظيمية
-        regulatory_risk = self._assess_regulatory_risk(product_name)
-        risk_scores['regulatory_risk'] = regulatory_risk
-        if regulatory_risk > 25:
-            risk_factors.append(f"📋 Regulatory compliance risk ({regulatory_risk:.1f}%)")
+        risk_scores = {
+            'price_volatility': self._assess_price_volatility(amazon_price, ebay_price),
+            'competition_level': self._assess_competition_risk(product_name, market_data),
+            'market_demand': self._assess_demand_risk(trend_data),
+            'seasonality': self._assess_seasonal_risk(product_name),
+            'supplier_reliability': self._assess_supplier_risk(amazon_price),
+            'regulatory_risk': self._assess_regulatory_risk(product_name)
+        }
+        risk_factors = self._risk_factor_alerts(risk_scores)
         
         # حساب النقاط الإجمالية للمخاطر
         overall_risk = sum(score * self.risk_weights[factor] 
@@ -117,6 +111,171 @@ class RiskManager:
             confidence_interval=confidence_interval
         )
     
+    def _risk_factor_alerts(self, risk_scores: Dict[str, float]) -> List[str]:
+        """🚩 رسائل العوامل التي تجاوزت حدودها"""
+        alerts = []
+        for factor, score in risk_scores.items():
+            threshold, message = RISK_FACTOR_ALERTS[factor]
+            if score > threshold:
+                alerts.append(message.format(score))
+        return alerts
+    
+    @property
+    def weight_vector(self) -> np.ndarray:
+        """أوزان العوامل بترتيب RISK_FACTOR_COLUMNS"""
+        return np.array([self.risk_weights[factor] for factor in RISK_FACTOR_COLUMNS])
+    
+    def assess_batch(self, products: Union[List[Dict], pd.DataFrame],
+                     as_frame: bool = True) -> Union[pd.DataFrame, List[RiskAssessment]]:
+        """
+        📦 تقييم مخاطر دفعة منتجات (أعمدة NumPy) - نفس منطق assess_product_risk
+        
+        Args:
+            products: قائمة قواميس (name, amazon_price, ebay_price, trend_data, market_data)
+                      أو DataFrame بالأعمدة name, amazon_price, ebay_price,
+                      trend_score, growth_rate, competition_level
+            as_frame: إعادة DataFrame (افتراضي) أو قائمة RiskAssessment
+        
+        Returns:
+            أعمدة العوامل الستة + overall_risk_score, risk_level, max_investment,
+            stop_loss_price, confidence_lower, confidence_upper
+        """
+        inputs = self._batch_inputs(products)
+        
+        amazon_price = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        valid = np.isfinite(amazon_price) & (amazon_price != 0)
+        if not valid.all():
+            self.logger.error(f"Skipping {int((~valid).sum())} products without a usable amazon_price")
+            inputs = inputs[valid]
+        
+        factors = self.risk_factor_matrix(inputs)
+        
+        # المجموع الموزون كضرب مصفوفات (n×6 @ 6)
+        overall_risk = factors @ self.weight_vector
+        
+        amazon_price = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        ebay_price = inputs['ebay_price'].to_numpy(dtype=np.float64)
+        
+        max_investment = amazon_price * 10 * np.maximum(0.1, 1 - overall_risk / 100)
+        max_investment = np.maximum(amazon_price, np.minimum(max_investment, amazon_price * 50))
+        volatility = 0.05 + overall_risk / 2000
+        
+        frame = pd.DataFrame(factors, columns=RISK_FACTOR_COLUMNS)
+        frame.insert(0, 'product_name', inputs['name'].to_numpy())
+        frame['overall_risk_score'] = overall_risk
+        frame['risk_level'] = np.select(
+            [overall_risk <= self.risk_thresholds['low'], overall_risk <= self.risk_thresholds['medium']],
+            ['Low', 'Medium'], 'High'
+        )
+        frame['max_investment'] = max_investment
+        frame['stop_loss_price'] = np.round(ebay_price * (1 - (0.1 + overall_risk / 1000)), 2)
+        frame['confidence_lower'] = np.round(ebay_price * (1 - volatility), 2)
+        frame['confidence_upper'] = np.round(ebay_price * (1 + volatility), 2)
+        
+        return frame if as_frame else self.frame_to_assessments(frame)
+    
+    def risk_factor_matrix(self, inputs: pd.DataFrame) -> np.ndarray:
+        """
+        🧮 مصفوفة عوامل المخاطر (n × 6) بترتيب RISK_FACTOR_COLUMNS
+        
+        Args:
+            inputs: أعمدة موحدة من _batch_inputs
+        """
+        count = len(inputs)
+        amazon_price = inputs['amazon_price'].to_numpy(dtype=np.float64)
+        ebay_price = inputs['ebay_price'].to_numpy(dtype=np.float64)
+        trend_score = inputs['trend_score'].to_numpy(dtype=np.float64)
+        growth_rate = inputs['growth_rate'].to_numpy(dtype=np.float64)
+        
+        # ميزات الكلمات لكل صف (كل اسم فريد يُفحص مرة واحدة)
+        extractor = get_feature_extractor()
+        features = extractor.feature_array(inputs['name'].to_numpy())
+        
+        def has_any(group: str) -> np.ndarray:
+            return extractor.column(features, group)
+        
+        factors = np.empty((count, len(RISK_FACTOR_COLUMNS)))
+        
+        # تقلبات الأسعار
+        factors[:, 0] = np.minimum(np.abs(ebay_price - amazon_price) / amazon_price * 50, 100)
+        
+        # المنافسة
+        competition = 30 + np.where(has_any('high_competition'), 40, 0) \
+            + np.where(has_any('medium_competition'), 20, 0)
+        market_level = inputs['competition_level'].to_numpy()
+        competition = competition + np.select([market_level == 'High', market_level == 'Medium'], [25, 10], 0)
+        factors[:, 1] = np.minimum(competition, 100)
+        
+        # الطلب (50 عند غياب بيانات الاتجاه)
+        has_trend = ~(np.isnan(trend_score) & np.isnan(growth_rate))
+        trend_score = np.where(np.isnan(trend_score), 50, trend_score)
+        growth_rate = np.where(np.isnan(growth_rate), 0, growth_rate)
+        demand = np.maximum(0, 100 - trend_score)
+        demand += np.select([growth_rate < -20, growth_rate < 0, growth_rate > 50], [30, 15, 10], 0)
+        factors[:, 2] = np.where(has_trend, np.minimum(demand, 100), 50)
+        
+        # الموسمية
+        factors[:, 3] = get_seasonal_index().risk_for_rule(
+            extractor.first_group_column(features, SEASONAL_RISK_GROUPS)
+        )
+        
+        # المورد
+        factors[:, 4] = 15 + np.select(
+            [amazon_price < 5, amazon_price < 10, amazon_price > 200, amazon_price > 100],
+            [40, 20, 25, 10], 0
+        )
+        
+        # التنظيمية
+        factors[:, 5] = 5 + np.where(has_any('high_regulatory'), 25, 0) \
+            + np.where(has_any('medium_regulatory'), 15, 0)
+        
+        return factors
+    
+    def frame_to_assessments(self, frame: pd.DataFrame) -> List[RiskAssessment]:
+        """تحويل نتيجة assess_batch إلى كائنات RiskAssessment"""
+        assessments = []
+        factor_columns = list(RISK_FACTOR_COLUMNS)
+        for row, scores in zip(frame.itertuples(index=False), frame[factor_columns].to_numpy()):
+            risk_factors = self._risk_factor_alerts(dict(zip(factor_columns, scores)))
+            assessments.append(RiskAssessment(
+                product_name=row.product_name,
+                overall_risk_score=row.overall_risk_score,
+                risk_level=row.risk_level,
+                risk_factors=risk_factors,
+                mitigation_strategies=self._generate_mitigation_strategies(risk_factors, row.risk_level),
+                max_investment=row.max_investment,
+                stop_loss_price=row.stop_loss_price,
+                confidence_interval=(row.confidence_lower, row.confidence_upper)
+            ))
+        return assessments
+    
+    @staticmethod
+    def _batch_inputs(products: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+        """توحيد المدخلات إلى أعمدة name, amazon_price, ebay_price, trend_score, growth_rate, competition_level"""
+        if isinstance(products, pd.DataFrame):
+            frame = products
+        else:
+            trend = [product.get('trend_data') or {} for product in products]
+            market = [product.get('market_data') or {} for product in products]
+            frame = pd.DataFrame({
+                'name': [product.get('name', 'Unknown Product') for product in products],
+                'amazon_price': [product.get('amazon_price', 0) for product in products],
+                'ebay_price': [product.get('ebay_price', 0) for product in products],
+                # trend_data بدون trend_score يعني 50 كما في المسار الفردي
+                'trend_score': [t.get('trend_score', 50) if t else None for t in trend],
+                'growth_rate': [t.get('growth_rate') for t in trend],
+                'competition_level': [m.get('competition_level') for m in market]
+            })
+        
+        columns = {}
+        columns['name'] = frame['name'] if 'name' in frame else pd.Series('Unknown Product', index=frame.index)
+        for column in ('amazon_price', 'ebay_price', 'trend_score', 'growth_rate'):
+            columns[column] = (pd.to_numeric(frame[column], errors='coerce') if column in frame
+                               else pd.Series(np.nan, index=frame.index))
+        columns['competition_level'] = (frame['competition_level'] if 'competition_level' in frame
+                                        else pd.Series(None, index=frame.index, dtype=object))
+        return pd.DataFrame(columns)
+    
     def _assess_price_volatility(self, amazon_price: float, ebay_price: float) -> float:
         """💹 تقييم تقلبات الأسعار"""
         price_difference = abs(ebay_price - amazon_price)
@@ -129,24 +288,16 @@ class RiskManager:
     
     def _assess_competition_risk(self, product_name: str, market_data: Dict = None) -> float:
         """🥊 تقييم مخاطر المنافسة"""
-        product_lower = product_name.lower()
+        extractor = get_feature_extractor()
+        features = extractor.features(product_name)
         base_risk = 30  # مخاطر أساسية
         
         # منتجات عالية المنافسة
-        high_competition_products = [
-            'phone case', 'charger', 'cable', 'earbuds', 
-            'bluetooth speaker', 'power bank'
-        ]
-        
-        if any(product in product_lower for product in high_competition_products):
+        if extractor.has(features, 'high_competition'):
             base_risk += 40
         
         # منتجات متوسطة المنافسة
-        medium_competition_products = [
-            'gaming', 'fitness', 'home decor', 'kitchen'
-        ]
-        
-        if any(product in product_lower for product in medium_competition_products):
+        if extractor.has(features, 'medium_competition'):
             base_risk += 20
         
         # تعديل حسب بيانات السوق
@@ -182,28 +333,9 @@ class RiskManager:
     
     def _assess_seasonal_risk(self, product_name: str) -> float:
         """📅 تقييم المخاطر الموسمية"""
-        current_month = datetime.now().month
-        product_lower = product_name.lower()
-        
-        seasonal_risk = 10  # مخاطر أساسية منخفضة
-        
-        # منتجات موسمية قوية
-        seasonal_products = {
-            'christmas': (['gift', 'decoration', 'tree', 'lights'], [11, 12]),
-            'summer': (['outdoor', 'swimming', 'beach', 'camping'], [5, 6, 7, 8]),
-            'winter': (['heating', 'warm', 'coat', 'blanket'], [12, 1, 2]),
-            'back_to_school': (['school', 'student', 'backpack', 'laptop'], [7, 8, 9])
-        }
-        
-        for season, (keywords, peak_months) in seasonal_products.items():
-            if any(keyword in product_lower for keyword in keywords):
-                if current_month in peak_months:
-                    seasonal_risk += 5  # في الموسم = مخاطر أقل
-                else:
-                    seasonal_risk += 50  # خارج الموسم = مخاطر عالية
-                break
-        
-        return min(seasonal_risk, 100)
+        extractor = get_feature_extractor()
+        rule = extractor.first_group(extractor.features(product_name), SEASONAL_RISK_GROUPS)
+        return float(get_seasonal_index().risk_for_rule(rule))
     
     def _assess_supplier_risk(self, amazon_price: float) -> float:
         """🏪 تقييم مخاطر المورد"""
@@ -225,24 +357,16 @@ class RiskManager:
     
     def _assess_regulatory_risk(self, product_name: str) -> float:
         """📋 تقييم المخاطر التنظيمية"""
-        product_lower = product_name.lower()
+        extractor = get_feature_extractor()
+        features = extractor.features(product_name)
         base_risk = 5
         
         # منتجات عالية المخاطر التنظيمية
-        high_risk_categories = [
-            'electronics', 'battery', 'charger', 'medical', 
-            'health', 'food', 'cosmetic', 'toy'
-        ]
-        
-        if any(category in product_lower for category in high_risk_categories):
+        if extractor.has(features, 'high_regulatory'):
             base_risk += 25
         
         # منتجات متوسطة المخاطر
-        medium_risk_categories = [
-            'automotive', 'jewelry', 'clothing'
-        ]
-        
-        if any(category in product_lower for category in medium_risk_categories):
+        if extractor.has(features, 'medium_regulatory'):
             base_risk += 15
         
         return min(base_risk, 100)
@@ -336,55 +460,96 @@ class RiskManager:
         
         return (round(lower_bound, 2), round(upper_bound, 2))
     
-    def portfolio_risk_analysis(self, products: List[Dict]) -> Dict:
-        """📊 تحليل مخاطر المحفظة"""
-        if not products:
+    def portfolio_risk_analysis(self, products: Union[List[Dict], pd.DataFrame],
+                                returns: Optional[np.ndarray] = None) -> Dict:
+        """
+        📊 تحليل مخاطر المحفظة (تجميع NumPy - مناسب للمخزون الكامل)
+        
+        Args:
+            products: قائمة قواميس أو DataFrame بالأعمدة investment, risk_score, category, price
+            returns: مصفوفة عوائد تاريخية (فترات × منتجات) لحساب تقلب المحفظة بالتغاير
+        """
+        if len(products) == 0:
             return {"error": "No products provided"}
         
-        total_investment = sum(p.get('investment', 0) for p in products)
-        risk_scores = [p.get('risk_score', 50) for p in products]
+        frame = products if isinstance(products, pd.DataFrame) else pd.DataFrame(list(products))
+        investments = self._portfolio_column(frame, 'investment', 0.0)
+        risk_scores = self._portfolio_column(frame, 'risk_score', 50.0)
+        total_investment = float(investments.sum())
+        
+        low = int(np.count_nonzero(risk_scores <= 30))
+        high = int(np.count_nonzero(risk_scores > 60))
         
         portfolio_risk = {
-            'total_products': len(products),
+            'total_products': len(frame),
             'total_investment': total_investment,
-            'average_risk_score': np.mean(risk_scores),
+            'average_risk_score': float(risk_scores.mean()),
             'risk_distribution': {
-                'low_risk': sum(1 for score in risk_scores if score <= 30),
-                'medium_risk': sum(1 for score in risk_scores if 30 < score <= 60),
-                'high_risk': sum(1 for score in risk_scores if score > 60)
+                'low_risk': low,
+                'medium_risk': len(risk_scores) - low - high,
+                'high_risk': high
             },
-            'diversification_score': self._calculate_diversification_score(products),
+            'diversification_score': self._calculate_diversification_score(frame),
             'recommendations': self._get_portfolio_recommendations(risk_scores, total_investment)
         }
         
+        # أوزان الاستثمار: المخاطر الموزونة والتركيز (مؤشر هيرفندال)
+        if total_investment > 0:
+            weights = investments / total_investment
+            portfolio_risk['weighted_risk_score'] = float(weights @ risk_scores)
+            portfolio_risk['concentration_index'] = float(weights @ weights)
+            
+            if returns is not None:
+                portfolio_risk['portfolio_volatility'] = self._portfolio_volatility(weights, returns)
+        
         return portfolio_risk
     
-    def _calculate_diversification_score(self, products: List[Dict]) -> float:
+    @staticmethod
+    def _portfolio_column(frame: pd.DataFrame, column: str, default: float) -> np.ndarray:
+        """عمود رقمي من المحفظة مع قيمة افتراضية للمفقود"""
+        if column not in frame:
+            return np.full(len(frame), default)
+        return pd.to_numeric(frame[column], errors='coerce').fillna(default).to_numpy(dtype=np.float64)
+    
+    @staticmethod
+    def _portfolio_volatility(weights: np.ndarray, returns: np.ndarray) -> float:
+        """📉 تقلب المحفظة sqrt(wᵀ Σ w) من مصفوفة التغاير"""
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.ndim != 2 or returns.shape[1] != len(weights) or returns.shape[0] < 2:
+            raise ValueError(f"returns must be (periods >= 2, {len(weights)}), got {returns.shape}")
+        
+        covariance = np.cov(returns, rowvar=False)
+        return float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+    
+    def _calculate_diversification_score(self, frame: pd.DataFrame) -> float:
         """🎯 حساب نقاط التنويع"""
-        if len(products) <= 1:
+        count = len(frame)
+        if count <= 1:
             return 0
         
         # تنويع الفئات
-        categories = [p.get('category', 'unknown') for p in products]
-        unique_categories = len(set(categories))
-        category_score = min(unique_categories / len(products), 1.0) * 50
+        categories = frame['category'].fillna('unknown') if 'category' in frame else pd.Series(['unknown'])
+        category_score = min(categories.nunique() / count, 1.0) * 50
         
         # تنويع الأسعار
-        prices = [p.get('price', 0) for p in products if p.get('price', 0) > 0]
-        if prices:
-            price_variance = np.var(prices) / (np.mean(prices) ** 2) if np.mean(prices) > 0 else 0
+        prices = self._portfolio_column(frame, 'price', 0.0)
+        prices = prices[prices > 0]
+        if prices.size:
+            mean_price = prices.mean()
+            price_variance = prices.var() / (mean_price ** 2) if mean_price > 0 else 0
             price_score = min(price_variance * 100, 50)
         else:
             price_score = 0
         
         return category_score + price_score
     
-    def _get_portfolio_recommendations(self, risk_scores: List[float], total_investment: float) -> List[str]:
+    def _get_portfolio_recommendations(self, risk_scores: np.ndarray, total_investment: float) -> List[str]:
         """💡 توصيات المحفظة"""
         recommendations = []
         
-        avg_risk = np.mean(risk_scores)
-        high_risk_count = sum(1 for score in risk_scores if score > 60)
+        risk_scores = np.asarray(risk_scores, dtype=np.float64)
+        avg_risk = risk_scores.mean()
+        high_risk_count = np.count_nonzero(risk_scores > 60)
         
         if avg_risk > 70:
             recommendations.append("🚨 Portfolio has high average risk - Consider rebalancing")
@@ -400,4 +565,4 @@ class RiskManager:
         if len(risk_scores) < 5:
             recommendations.append("📊 Consider adding more products for better diversification")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
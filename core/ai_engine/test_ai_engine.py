@@ -0,0 +1,246 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core.ai_engine.ai_engine import (
+    BraveBotAIEngine,
+    DiskCacheTier,
+    EngineResultCache,
+    LoopLagMonitor,
+    RateLimitExceeded,
+    RateLimiter,
+    TokenBucket,
+    trends_cache_key,
+)
+
+
+def test_trends_cache_key_is_stable_across_processes():
+    code = ("from core.ai_engine.ai_engine import trends_cache_key; "
+            "print(trends_cache_key('gaming chair', {'timeframe': 'today 3-m', 'geo': 'US'}))")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    keys = set()
+    for seed in ("1", "2"):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed}
+        ).stdout
+        keys.add(output.strip().splitlines()[-1])
+    assert keys == {trends_cache_key("gaming chair", {"geo": "US", "timeframe": "today 3-m"})}
+
+
+def test_disk_tier_round_trip(tmp_path):
+    tier = DiskCacheTier(str(tmp_path / "cache.db"))
+    tier.put("k", {"score": 87, "tags": ["ai", "عربي"]}, stored_at=100.0, expires_at=9e12)
+    assert tier.get("k") == ({"score": 87, "tags": ["ai", "عربي"]}, 100.0)
+    tier.put("old", {"score": 1}, stored_at=100.0, expires_at=101.0)
+    assert tier.get("old") is None
+    assert tier.purge() == 1
+    tier.close()
+
+
+def test_engine_cache_serves_from_disk_after_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def compute():
+        return {"score": 42}
+
+    async def unavailable():
+        raise AssertionError("should be served from the disk tier")
+
+    first = EngineResultCache(ttl=60, stale_ttl=600, l2=DiskCacheTier(path))
+    assert asyncio.run(first.get_or_refresh("trends_ai", compute)) == {"score": 42}
+    first.l2.close()
+
+    # عملية جديدة: الذاكرة فارغة والقراءة الفائتة تبحث في القرص
+    second = EngineResultCache(ttl=60, stale_ttl=600, l2=DiskCacheTier(path))
+    assert len(second) == 0
+    assert asyncio.run(second.get_or_refresh("trends_ai", unavailable)) == {"score": 42}
+    assert second.l2_hits == 1 and second.hits == 1
+
+    third = EngineResultCache(ttl=60, stale_ttl=600, l2=DiskCacheTier(path))
+    assert third.warm() == 1 and "trends_ai" in third
+
+
+def test_engine_cache_serves_stale_result_and_refreshes_in_background():
+    cache = EngineResultCache(ttl=0.2, stale_ttl=10)
+    versions = iter(range(1, 10))
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return {"version": next(versions)}
+
+    async def run():
+        first = await cache.get_or_refresh("k", compute)
+        fresh = await cache.get_or_refresh("k", compute)
+        await asyncio.sleep(0.25)
+        stale = await cache.get_or_refresh("k", compute)
+        await asyncio.sleep(0.05)
+        refreshed = await cache.get_or_refresh("k", compute)
+        return first, fresh, stale, refreshed
+
+    first, fresh, stale, refreshed = asyncio.run(run())
+    assert first == fresh == stale == {"version": 1}
+    assert refreshed == {"version": 2}
+    assert (cache.misses, cache.hits, cache.stale_hits, cache.refreshes) == (1, 2, 1, 2)
+
+
+def test_engine_cache_coalesces_misses_and_skips_uncacheable_results():
+    cache = EngineResultCache(ttl=60, stale_ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"degraded_sections": ["market_data"]}
+
+    async def run():
+        return await asyncio.gather(*(
+            cache.get_or_refresh("k", compute, cacheable=lambda data: not data["degraded_sections"])
+            for _ in range(5)
+        ))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and all(r == results[0] for r in results)
+    assert "k" not in cache and len(cache) == 0
+
+
+def test_engine_cache_evicts_least_recently_used():
+    cache = EngineResultCache(ttl=60, stale_ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    async def touch():
+        return await cache.get_or_refresh("a", None)
+
+    assert asyncio.run(touch()) == 1
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_engine_cache_expiry_heap_drops_expired_and_stays_bounded():
+    cache = EngineResultCache(ttl=0, stale_ttl=0.05)
+    cache.set("old", 1)
+    time.sleep(0.06)
+    cache.set("new", 2)
+    assert len(cache) == 1 and cache.expirations == 1
+
+    # إعادة حفظ نفس المفتاح تترك عناصر ملغاة في الـ heap - تُنظف عند تراكمها
+    for value in range(500):
+        cache.set("new", value)
+    assert len(cache._expiry_heap) <= 2 * len(cache) + 64
+    assert cache.cleanup(now=time.monotonic() + 1) == 1 and len(cache) == 0
+
+
+def test_token_bucket_refills_at_configured_rate():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    now = bucket.updated
+    assert bucket.wait_time(now) == 0
+    bucket.consume()
+    bucket.consume()
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(now + 10) == 0 and bucket.tokens == 2
+
+
+def test_rate_limiter_queues_within_max_wait_and_rejects_beyond():
+    limiter = RateLimiter(requests_per_minute=600, per_user_per_minute=1200,
+                          upstream_limits={"reddit": 60}, max_wait=0.15)
+    limiter.global_bucket.tokens = 1
+
+    async def run():
+        assert await limiter.acquire("u1") == 0
+        waited = await limiter.acquire("u1")
+        limiter.global_bucket.tokens = -5
+        with pytest.raises(RateLimitExceeded) as error:
+            await limiter.acquire("u2")
+        return waited, error.value
+
+    waited, error = asyncio.run(run())
+    assert 0.05 < waited <= 0.15
+    assert error.scope == "global" and error.retry_after > 0.15
+    stats = limiter.stats()
+    assert stats["admitted"] == 2 and stats["rejected"] == 1 and stats["queued"] == 1
+
+
+def test_rate_limiter_tracks_users_and_upstreams_separately():
+    limiter = RateLimiter(requests_per_minute=1000, per_user_per_minute=1,
+                          upstream_limits={"reddit": 1}, max_wait=0.01)
+
+    async def run():
+        await limiter.acquire("u1")
+        await limiter.acquire("u2")
+        with pytest.raises(RateLimitExceeded) as user_error:
+            await limiter.acquire("u1")
+        await limiter.acquire_upstream("reddit", "unknown")
+        with pytest.raises(RateLimitExceeded) as upstream_error:
+            await limiter.acquire_upstream("reddit")
+        return user_error.value.scope, upstream_error.value.scope
+
+    assert asyncio.run(run()) == ("user:u1", "upstream:reddit")
+
+
+def test_loop_lag_monitor_reports_blocking_work():
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def run():
+        task = asyncio.ensure_future(monitor.run())
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # عمل متزامن يحجز الحلقة
+        await asyncio.sleep(0.03)
+        task.cancel()
+
+    asyncio.run(run())
+    stats = monitor.stats()
+    assert stats["samples"] >= 2
+    assert stats["max_ms"] >= 80
+
+
+def test_engine_runs_sync_calls_on_executor(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.chdir(tmp_path)
+    engine = BraveBotAIEngine()
+    try:
+        async def run():
+            return await engine._run_sync(lambda value, scale=1: (threading.current_thread().name, value * scale),
+                                          21, scale=2)
+
+        thread_name, value = asyncio.run(run())
+        assert value == 42
+        assert thread_name.startswith("ai-engine")
+    finally:
+        engine.close()
+
+
+def test_package_wrappers_forward_user_and_sections(monkeypatch):
+    import core.ai_engine as package
+
+    calls = []
+
+    class RecordingEngine:
+        def __getattr__(self, name):
+            async def method(*args, **kwargs):
+                calls.append((name, args, kwargs))
+                return {}
+            return method
+
+    monkeypatch.setattr(package, "get_ai_engine", lambda: RecordingEngine())
+
+    async def run():
+        await package.analyze_trends("ai", user_id="u1")
+        await package.get_viral_trends("gaming", 5, user_id="u1")
+        await package.suggest_pricing(19.99, 70, "tech", fields=["recommendation"], user_id="u1")
+        await package.generate_insights("week", ["Gaming"], sections=["market_overview"], user_id="u1")
+
+    asyncio.run(run())
+    assert calls == [
+        ("analyze_trends", ("ai",), {"user_id": "u1"}),
+        ("get_viral_trends", ("gaming", 5, "u1"), {}),
+        ("suggest_pricing", (19.99, 70, "tech", ["recommendation"], "u1"), {}),
+        ("generate_insights", ("week", ["Gaming"], ["market_overview"], "u1"), {}),
+    ]
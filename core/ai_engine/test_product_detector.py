@@ -0,0 +1,84 @@
+import asyncio
+
+from core.ai_engine.product_detector import ProductFingerprintStore, ViralProductDetector
+
+
+def _candidate(keyword, trend_score=85, **extra):
+    return {"keyword": keyword, "category": "Tech", "trend_score": trend_score, "growth_rate": 12,
+            "amazon_price": 25.0, "seasonality": {"q4": 1.2}, **extra}
+
+
+def test_unchanged_candidates_are_reused_as_copies(monkeypatch):
+    detector = ViralProductDetector()
+    calls = []
+    original = detector._score_changed
+
+    async def counting(candidates):
+        calls.append([c["keyword"] for c in candidates])
+        return await original(candidates)
+
+    monkeypatch.setattr(detector, "_score_changed", counting)
+
+    first = asyncio.run(detector._score_candidates([_candidate("smart watch"), _candidate("yoga mat")]))
+    first[0].viral_signals.append("mutated")
+    first[0].seasonality["q4"] = 0
+
+    second = asyncio.run(detector._score_candidates([_candidate("smart watch"), _candidate("yoga mat", 90)]))
+    assert calls == [["smart watch", "yoga mat"], ["yoga mat"]]
+    assert detector.fingerprints.stats()["hits"] == 1
+    assert "mutated" not in second[0].viral_signals and second[0].seasonality == {"q4": 1.2}
+    assert second[0] is not first[0]
+    assert second[1].trend_score == 90
+
+    # تغير السعر المقدم يعيد التقييم أيضاً
+    third = asyncio.run(detector._score_candidates([_candidate("smart watch", amazon_price=30.0),
+                                                    _candidate("yoga mat", 90)]))
+    assert calls[-1] == ["smart watch"]
+    assert third[0].amazon_price == 30.0
+
+
+def test_fingerprint_ignores_filter_only_fields():
+    month = 5
+    base = ProductFingerprintStore.fingerprint(_candidate("cable"), month)
+    assert ProductFingerprintStore.fingerprint(_candidate("cable", profit_score=99, risk={}), month) == base
+    assert ProductFingerprintStore.fingerprint(_candidate("cable", growth_rate=-3), month) != base
+    assert ProductFingerprintStore.fingerprint(_candidate("cable"), month + 1) != base
+
+
+def test_large_batches_score_on_process_pool_in_input_order(monkeypatch):
+    import core.ai_engine.product_detector as product_detector
+
+    monkeypatch.setattr(product_detector, "DETECTION_PROCESS_THRESHOLD", 4)
+    monkeypatch.setattr(product_detector, "DETECTION_CHUNK_SIZE", 3)
+    detector = ViralProductDetector()
+    detector.max_workers = 2
+    candidates = [_candidate(f"smart gadget {i}", amazon_price=10.0 + i) for i in range(8)]
+    try:
+        scored = asyncio.run(detector._score_changed(candidates))
+    finally:
+        detector.close()
+
+    assert [p.name for p in scored] == [c["keyword"] for c in candidates]
+    assert [p.amazon_price for p in scored] == [c["amazon_price"] for c in candidates]
+
+
+def test_detect_viral_products_without_limit_scores_every_candidate(monkeypatch):
+    detector = ViralProductDetector()
+    products = [_candidate(f"smart wireless gadget {i}", trend_score=95) for i in range(30)]
+
+    async def trending():
+        return {"Tech": products}
+
+    seen = []
+
+    async def score(candidates):
+        seen.append(len(candidates))
+        return []
+
+    monkeypatch.setattr(detector.trend_analyzer, "analyze_trending_products", trending)
+    monkeypatch.setattr(detector, "_score_candidates", score)
+    monkeypatch.setattr(detector, "_estimate_demand_supply", lambda keyword: 1.2)
+
+    asyncio.run(detector.detect_viral_products())
+    asyncio.run(detector.detect_viral_products(limit=None))
+    assert seen == [20, 30]
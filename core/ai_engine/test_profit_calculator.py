@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from core.ai_engine.profit_calculator import ProfitCalculator
+
+PRODUCTS = [
+    {"name": "Wireless Gaming Headset", "amazon_price": 39.99, "ebay_price": 64.99},
+    {"name": "Christmas Phone Case", "amazon_price": 7.50, "ebay_price": 9.99},
+    {"name": "Professional Yoga Mat", "amazon_price": 24.00, "ebay_price": 45.00},
+]
+
+
+def test_monte_carlo_is_centred_on_point_estimate():
+    calculator = ProfitCalculator()
+    frame = calculator.simulate_profit_distribution(PRODUCTS, draws=50000, rng=np.random.default_rng(1))
+
+    assert list(frame["product_name"]) == [p["name"] for p in PRODUCTS]
+    for product, row in zip(PRODUCTS, frame.itertuples()):
+        point = calculator.calculate_comprehensive_profit(
+            product["name"], product["amazon_price"], product["ebay_price"]
+        )
+        assert row.expected_profit == pytest.approx(point.profit_amount, abs=0.1)
+        assert row.profit_p5 < row.profit_p25 < row.profit_p50 < row.profit_p75 < row.profit_p95
+        assert 0 <= row.probability_of_loss <= 1
+
+    # هامش صغير (9.99 مقابل ~12.7 تكلفة) = خسارة شبه مؤكدة
+    assert frame["probability_of_loss"].iloc[1] > 0.95
+    assert frame["probability_of_loss"].iloc[0] == 0
+
+
+def test_monte_carlo_chunking_does_not_change_results():
+    calculator = ProfitCalculator()
+    whole = calculator.simulate_profit_distribution(PRODUCTS, draws=1000, rng=np.random.default_rng(3),
+                                                    exact_percentiles=True)
+    chunked = calculator.simulate_profit_distribution(PRODUCTS, draws=1000, rng=np.random.default_rng(3),
+                                                      chunk_elements=1, exact_percentiles=True)
+    assert np.isclose(whole["expected_profit"], chunked["expected_profit"], atol=0.5).all()
+    assert (chunked["profit_p95"] > chunked["profit_p5"]).all()
+
+
+@pytest.mark.parametrize("options", [{"draws": 0}, {"chunk_elements": 0}])
+def test_monte_carlo_rejects_invalid_sizes(options):
+    with pytest.raises(ValueError):
+        ProfitCalculator().simulate_profit_distribution(PRODUCTS, **options)
+
+
+def test_batch_analysis_as_columnar_store():
+    calculator = ProfitCalculator()
+    products = PRODUCTS * 4
+    analyses = calculator.batch_analyze_products(products, rng=np.random.default_rng(0))
+    store = calculator.batch_analyze_products(products, rng=np.random.default_rng(0), as_store=True)
+
+    assert len(store) == len(analyses)
+    assert store.records() == analyses
+    assert store[0].product_name == analyses[0].product_name
+    # النصوص المتكررة مرمزة كأكواد صغيرة
+    assert store._columns["market_demand"].kind == "dict"
+    assert list(store.column("profit_margin")) == [a.profit_margin for a in analyses]
+
+
+def test_batch_analysis_matches_scalar_path():
+    calculator = ProfitCalculator()
+    products = [
+        {"name": name, "amazon_price": price, "ebay_price": ebay,
+         "trend_data": {"trend_score": trend, "growth_rate": growth}}
+        for name, price, ebay, trend, growth in [
+            ("Wireless Gaming Headset", 39.99, 64.99, 85, 25),
+            ("Christmas Phone Case", 7.50, 9.99, 20, -15),
+            ("Professional Yoga Mat", 24.00, 45.00, 55, 0),
+            ("Luxury Smart Watch", 250.00, 320.00, 75, 5),
+            ("Beach Towel", 4.00, 12.00, 35, 30),
+        ]
+    ]
+    scalar = sorted(
+        (calculator.calculate_comprehensive_profit(p["name"], p["amazon_price"], p["ebay_price"], p["trend_data"])
+         for p in products),
+        key=lambda analysis: analysis.profit_margin, reverse=True
+    )
+    batch = calculator.batch_analyze_products(products)
+
+    assert [a.product_name for a in batch] == [a.product_name for a in scalar]
+    for vector, single in zip(batch, scalar):
+        for field in ("profit_amount", "profit_margin", "roi", "risk_score", "confidence_level", "seasonal_factor"):
+            assert getattr(vector, field) == pytest.approx(getattr(single, field)), field
+        assert vector.break_even_quantity == single.break_even_quantity
+        assert (vector.market_demand, vector.competition_level) == (single.market_demand, single.competition_level)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from core.ai_engine.risk_manager import RiskManager
+
+PRODUCTS = [
+    {"name": "Bluetooth Speaker Charger", "amazon_price": 19.99, "ebay_price": 34.99,
+     "trend_data": {"trend_score": 82, "growth_rate": 15}, "market_data": {"competition_level": "High"}},
+    {"name": "Organic Dog Toy", "amazon_price": 6.50, "ebay_price": 14.00,
+     "trend_data": {"trend_score": 25, "growth_rate": -20}},
+    {"name": "Professional Camera Lens", "amazon_price": 420.00, "ebay_price": 455.00},
+    {"name": "Christmas Jewelry Box", "amazon_price": 12.00, "ebay_price": 30.00,
+     "trend_data": {"trend_score": 60}, "market_data": {"competition_level": "Low"}},
+]
+
+
+def test_assess_batch_matches_scalar_path():
+    manager = RiskManager()
+    batch = manager.assess_batch(PRODUCTS, as_frame=False)
+
+    for product, vector in zip(PRODUCTS, batch):
+        single = manager.assess_product_risk(
+            product["name"], product["amazon_price"], product["ebay_price"],
+            product.get("trend_data"), product.get("market_data")
+        )
+        assert vector.product_name == single.product_name
+        assert vector.overall_risk_score == pytest.approx(single.overall_risk_score)
+        assert vector.risk_level == single.risk_level
+        assert vector.risk_factors == single.risk_factors
+        assert vector.mitigation_strategies == single.mitigation_strategies
+        assert vector.max_investment == pytest.approx(single.max_investment)
+        assert vector.stop_loss_price == pytest.approx(single.stop_loss_price)
+        assert vector.confidence_interval == pytest.approx(single.confidence_interval)
+
+
+def test_portfolio_risk_uses_investment_weights_and_covariance():
+    manager = RiskManager()
+    portfolio = [
+        {"investment": 300, "risk_score": 20, "category": "Tech", "price": 30},
+        {"investment": 100, "risk_score": 80, "category": "Toys", "price": 10},
+    ]
+    returns = np.array([[0.01, 0.03], [0.02, -0.01], [-0.01, 0.02], [0.03, 0.00]])
+
+    result = manager.portfolio_risk_analysis(portfolio, returns=returns)
+    weights = np.array([0.75, 0.25])
+    assert result["weighted_risk_score"] == pytest.approx(35.0)
+    assert result["concentration_index"] == pytest.approx(0.625)
+    assert result["portfolio_volatility"] == pytest.approx(np.sqrt(weights @ np.cov(returns.T) @ weights))
+    assert result["risk_distribution"] == {"low_risk": 1, "medium_risk": 0, "high_risk": 1}
+
+    with pytest.raises(ValueError):
+        manager.portfolio_risk_analysis(portfolio, returns=returns[:, :1])
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+import core.ai_engine.trend_analyzer as trend_analyzer
+from core.ai_engine.trend_analyzer import (
+    PYTRENDS_ANCHOR_KEYWORD,
+    PytrendsBackoffController,
+    PytrendsScheduler,
+    TrendAnalyzer,
+)
+
+ANCHOR = PYTRENDS_ANCHOR_KEYWORD
+
+
+def _analyzer():
+    analyzer = TrendAnalyzer()
+    # معدل عالٍ بدون تهدئة - الاختبار لا ينتظر الجدولة
+    analyzer.backoff = PytrendsBackoffController(PytrendsScheduler(rate_per_minute=60000, burst=100),
+                                                 max_rate=60000)
+    return analyzer
+
+
+def test_keyword_batches_carry_anchor_and_are_rescaled(monkeypatch):
+    keywords = [f"k{i}" for i in range(10)] + [ANCHOR]
+    # مستوى الكلمة المرجعية في كل دفعة (تُعرف الدفعة بأول كلماتها)
+    anchor_levels = {"k0": 50.0, "k4": 25.0}
+    payloads = []
+
+    def fake_fetch(batch):
+        payloads.append(list(batch))
+        if batch[1] == "k8":
+            raise RuntimeError("Google Trends unavailable")
+        level = anchor_levels[batch[1]]
+        return pd.DataFrame({keyword: [level if keyword == ANCHOR else 20.0] * 4 for keyword in batch})
+
+    simulated = []
+    monkeypatch.setattr(trend_analyzer, "_fetch_interest_over_time", fake_fetch)
+    analyzer = _analyzer()
+    original_simulate = analyzer._simulate_trend_data
+
+    def simulate(keyword):
+        simulated.append(keyword)
+        return original_simulate(keyword)
+
+    monkeypatch.setattr(analyzer, "_simulate_trend_data", simulate)
+
+    results = asyncio.run(analyzer._get_keywords_trends(keywords))
+
+    # الكلمة المرجعية + 4 كلمات لكل طلب
+    assert sorted(payloads) == [[ANCHOR, "k0", "k1", "k2", "k3"],
+                                [ANCHOR, "k4", "k5", "k6", "k7"],
+                                [ANCHOR, "k8", "k9"]]
+    assert set(results) == set(keywords)
+
+    # الدفعة الأولى هي المرجع، والثانية تُضرب في 50 / 25
+    assert results["k0"]["score"] == pytest.approx(20.0)
+    assert results["k5"]["score"] == pytest.approx(40.0)
+    assert results[ANCHOR]["score"] == pytest.approx(50.0)
+
+    # الدفعة الفاشلة فقط تُحاكى
+    assert sorted(simulated) == ["k8", "k9"]
+
+
+def test_backoff_halves_rate_on_429_and_adjusts_on_latency():
+    scheduler = PytrendsScheduler(rate_per_minute=60)
+    backoff = PytrendsBackoffController(scheduler, max_rate=60, min_rate=4, base_cooldown=5)
+
+    backoff.on_rate_limited(started=0.0)
+    assert backoff.rate == 30 and backoff.cooldown == 5
+    assert scheduler.interval == pytest.approx(2.0)
+    assert backoff.stats()["cooldown_seconds"] >= 5
+
+    backoff.on_success(latency=trend_analyzer.PYTRENDS_SLOW_LATENCY + 1)
+    assert backoff.rate == pytest.approx(27)
+    backoff.on_success(latency=0.1)
+    assert backoff.rate == pytest.approx(28)
+    assert backoff.cooldown == 0
+
+
+def test_backoff_counts_one_burst_of_429s_once():
+    backoff = PytrendsBackoffController(PytrendsScheduler(rate_per_minute=60), max_rate=60, base_cooldown=5)
+    started = time.monotonic()
+
+    # كل الطلبات المتزامنة بدأت قبل الرفض الأول - تُحسب مرة واحدة
+    for _ in range(4):
+        backoff.on_rate_limited(started)
+    assert backoff.rate == 30 and backoff.cooldown == 5
+    assert backoff.rate_limited == 4
+
+    # طلب بدأ بعد بداية التهدئة ورُفض = رفض جديد
+    time.sleep(0.001)
+    backoff.on_rate_limited(time.monotonic())
+    assert backoff.rate == 15 and backoff.cooldown == 10
@@ -3,16 +3,170 @@ import aiohttp
 import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pytrends.request import TrendReq
 import logging
 from typing import Dict, List, Optional
 
+# حدود Google Trends: 5 كلمات لكل طلب - واحدة منها كلمة مرجعية مشتركة بين الدفعات
+PYTRENDS_MAX_KEYWORDS = 5
+PYTRENDS_ANCHOR_KEYWORD = 'bluetooth speaker'
+PYTRENDS_RATE_PER_MINUTE = 60
+PYTRENDS_BURST = 5
+
+# تشغيل pytrends (متزامنة) على عمال منفصلين مع إعادة محاولة متكيفة
+PYTRENDS_WORKERS = 2
+PYTRENDS_MAX_RETRIES = 3
+PYTRENDS_MIN_RATE_PER_MINUTE = 4
+PYTRENDS_SLOW_LATENCY = 5.0  # ثوانٍ - استجابة أبطأ = ضغط على الحصة
+
+class PytrendsScheduler:
+    """
+    ⏱️ جدولة طلبات Google Trends حسب المعدل
+    
+    دلو رموز بسعة burst: الطلبات الأولى تمر فوراً ثم تُوزع بفاصل 60/rate_per_minute ثانية،
+    والرصيد السالب يعني طابوراً (كل طلب يحجز موعده بالترتيب).
+    """
+    
+    def __init__(self, rate_per_minute: float = PYTRENDS_RATE_PER_MINUTE, burst: int = PYTRENDS_BURST):
+        self.interval = 60.0 / rate_per_minute
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.requests = 0
+        self.total_wait = 0.0
+    
+    def reserve(self) -> float:
+        """حجز موعد طلب - يعيد مدة الانتظار بالثواني"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+        self._updated = now
+        self._tokens -= 1
+        self.requests += 1
+        return 0.0 if self._tokens >= 0 else -self._tokens * self.interval
+    
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            self.total_wait += delay
+            await asyncio.sleep(delay)
+    
+    def stats(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'total_wait_seconds': round(self.total_wait, 2),
+            'rate_per_minute': round(60.0 / self.interval, 1),
+            'burst': self.burst
+        }
+
+# جدولة مشتركة - حد Google Trends على مستوى العنوان لا على مستوى الكائن
+_pytrends_scheduler = PytrendsScheduler()
+
+class PytrendsBackoffController:
+    """
+    🚦 تحكم متكيف في معدل طلبات Google Trends (AIMD)
+    
+    - 429: المعدل يُنصف وتبدأ فترة تهدئة تتضاعف مع تكرار الرفض
+      (رفض طلب بدأ قبل آخر رفض محسوب = نفس موجة الضغط، لا يُحسب مرة أخرى)
+    - استجابة بطيئة: تخفيض المعدل 10%
+    - نجاح: زيادة المعدل تدريجياً حتى الحد الأقصى
+    """
+    
+    def __init__(self, scheduler: PytrendsScheduler, max_rate: float = PYTRENDS_RATE_PER_MINUTE,
+                 min_rate: float = PYTRENDS_MIN_RATE_PER_MINUTE, base_cooldown: float = 5.0,
+                 max_cooldown: float = 300.0):
+        self.scheduler = scheduler
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = 0.0
+        self.cooldown_until = 0.0
+        self.limited_at = float('-inf')
+        self.rate_limited = 0
+        self.successes = 0
+        self.last_latency = 0.0
+    
+    def _apply_rate(self, rate: float):
+        self.rate = max(self.min_rate, min(self.max_rate, rate))
+        self.scheduler.interval = 60.0 / self.rate
+    
+    async def acquire(self):
+        """انتظار انتهاء التهدئة ثم موعد الجدولة"""
+        remaining = self.cooldown_until - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        await self.scheduler.acquire()
+    
+    def on_success(self, latency: float):
+        self.successes += 1
+        self.last_latency = latency
+        self.cooldown = 0.0
+        if latency > PYTRENDS_SLOW_LATENCY:
+            self._apply_rate(self.rate * 0.9)
+        else:
+            self._apply_rate(self.rate + 1)
+    
+    def on_rate_limited(self, started: float):
+        """
+        تسجيل رفض 429
+        
+        Args:
+            started: وقت بدء الطلب المرفوض (monotonic) - الطلبات المتزامنة التي بدأت قبل
+                     آخر رفض محسوب تُرفض معاً فلا تُنصف المعدل مرة أخرى
+        """
+        self.rate_limited += 1
+        if started <= self.limited_at:
+            return
+        
+        self.limited_at = time.monotonic()
+        self._apply_rate(self.rate / 2)
+        self.cooldown = min(self.max_cooldown, max(self.base_cooldown, self.cooldown * 2))
+        # jitter حتى لا تعود كل الطلبات المنتظرة في نفس اللحظة
+        self.cooldown_until = time.monotonic() + self.cooldown * random.uniform(1.0, 1.25)
+    
+    def stats(self) -> Dict:
+        return {
+            'rate_per_minute': round(self.rate, 1),
+            'cooldown_seconds': round(max(0.0, self.cooldown_until - time.monotonic()), 1),
+            'rate_limited': self.rate_limited,
+            'successes': self.successes,
+            'last_latency': round(self.last_latency, 2),
+            'scheduler': self.scheduler.stats()
+        }
+
+# حالة التحكم مشتركة بين كل كائنات TrendAnalyzer
+_pytrends_backoff = PytrendsBackoffController(_pytrends_scheduler)
+
+_pytrends_executor = ThreadPoolExecutor(max_workers=PYTRENDS_WORKERS, thread_name_prefix="pytrends")
+_pytrends_local = threading.local()
+
+def _fetch_interest_over_time(batch: List[str]) -> pd.DataFrame:
+    """طلب pytrends داخل عامل - لكل عامل TrendReq خاص لأن الكائن يحفظ حالة الطلب"""
+    client = getattr(_pytrends_local, 'client', None)
+    if client is None:
+        client = _pytrends_local.client = TrendReq(hl='en-US', tz=360)
+    client.build_payload(batch, timeframe='today 3-m')
+    return client.interest_over_time()
+
+def _is_rate_limited(error: Exception) -> bool:
+    """هل الخطأ رفض 429 من Google"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    return type(error).__name__ == 'TooManyRequestsError' or '429' in str(error)
+
 class TrendAnalyzer:
     """📈 محلل الاتجاهات المتقدم"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.pytrends = TrendReq(hl='en-US', tz=360)
+        self.scheduler = _pytrends_scheduler
+        self.backoff = _pytrends_backoff
         
         # كلمات مفتاحية ذهبية للتجارة الإلكترونية
         self.golden_keywords = {
@@ -47,17 +201,21 @@ class TrendAnalyzer:
         if not categories:
             categories = list(self.golden_keywords.keys())
         
-        trending_data = {}
+        # كل كلمات كل الفئات تُجمع في دفعات مشتركة بدل طلب لكل كلمة
+        category_keywords = {category: self.golden_keywords.get(category, [])[:5] for category in categories}
+        all_keywords = [keyword for keywords in category_keywords.values() for keyword in keywords]
+        self.logger.info(f"🔍 Analyzing {len(categories)} categories ({len(all_keywords)} keywords)...")
+        
+        try:
+            trends = await self._get_keywords_trends(all_keywords)
+        except Exception as e:
+            self.logger.error(f"Error fetching trends batch: {e}")
+            trends = {}
         
-        for category in categories:
+        trending_data = {}
+        for category, keywords in category_keywords.items():
             try:
-                self.logger.info(f"🔍 Analyzing {category} trends...")
-                category_trends = await self._analyze_category(category)
-                trending_data[category] = category_trends
-                
-                # انتظار قصير لتجنب rate limiting
-                await asyncio.sleep(1)
-                
+                trending_data[category] = self._build_category_products(category, keywords, trends)
             except Exception as e:
                 self.logger.error(f"Error analyzing {category}: {e}")
                 trending_data[category] = []
@@ -66,30 +224,30 @@ class TrendAnalyzer:
     
     async def _analyze_category(self, category: str) -> List[Dict]:
         """📊 تحليل فئة معينة"""
-        keywords = self.golden_keywords.get(category, [])
+        keywords = self.golden_keywords.get(category, [])[:5]  # أول 5 كلمات لتوفير الوقت
         if not keywords:
             return []
         
+        trends = await self._get_keywords_trends(keywords)
+        return self._build_category_products(category, keywords, trends)
+    
+    def _build_category_products(self, category: str, keywords: List[str], trends: Dict[str, Dict]) -> List[Dict]:
+        """تحويل بيانات الاتجاه إلى منتجات الفئة مرتبة حسب الربحية"""
         trending_products = []
         
-        # تحليل كل كلمة مفتاحية
-        for keyword in keywords[:5]:  # أول 5 كلمات لتوفير الوقت
+        for keyword in keywords:
             try:
-                trend_data = await self._get_keyword_trend(keyword)
-                if trend_data:
-                    trending_products.append({
-                        'keyword': keyword,
-                        'category': category,
-                        'trend_score': trend_data['score'],
-                        'growth_rate': trend_data['growth'],
-                        'search_volume': trend_data['volume'],
-                        'competition_level': self._estimate_competition(keyword),
-                        'seasonality': self._detect_seasonality(keyword),
-                        'profit_potential': self._calculate_profit_potential(trend_data)
-                    })
-                
-                await asyncio.sleep(0.5)  # تجنب rate limiting
-                
+                trend_data = trends.get(keyword) or self._simulate_trend_data(keyword)
+                trending_products.append({
+                    'keyword': keyword,
+                    'category': category,
+                    'trend_score': trend_data['score'],
+                    'growth_rate': trend_data['growth'],
+                    'search_volume': trend_data['volume'],
+                    'competition_level': self._estimate_competition(keyword),
+                    'seasonality': self._detect_seasonality(keyword),
+                    'profit_potential': self._calculate_profit_potential(trend_data)
+                })
             except Exception as e:
                 self.logger.warning(f"Failed to analyze {keyword}: {e}")
                 continue
@@ -100,29 +258,87 @@ class TrendAnalyzer:
     
     async def _get_keyword_trend(self, keyword: str) -> Optional[Dict]:
         """📈 الحصول على بيانات اتجاه الكلمة المفتاحية"""
-        try:
-            # محاولة الحصول على بيانات Google Trends
-            self.pytrends.build_payload([keyword], timeframe='today 3-m')
-            interest_over_time = self.pytrends.interest_over_time()
-            
-            if interest_over_time.empty:
+        trends = await self._get_keywords_trends([keyword])
+        return trends.get(keyword)
+    
+    async def _get_keywords_trends(self, keywords: List[str]) -> Dict[str, Dict]:
+        """
+        📈 بيانات الاتجاه لعدة كلمات بأقل عدد طلبات
+        
+        كل طلب يحمل الكلمة المرجعية + 4 كلمات. Google يطبّع كل طلب على حدة (أعلى قيمة = 100)،
+        فتُعاد معايرة كل دفعة بنسبة مستوى الكلمة المرجعية فيها إلى مستواها في الدفعة الأولى.
+        """
+        anchor = PYTRENDS_ANCHOR_KEYWORD
+        others = [keyword for keyword in dict.fromkeys(keywords) if keyword != anchor]
+        per_batch = PYTRENDS_MAX_KEYWORDS - 1
+        batches = [others[i:i + per_batch] for i in range(0, len(others), per_batch)] or [[]]
+        
+        frames = await asyncio.gather(*(self._fetch_batch([anchor] + batch) for batch in batches))
+        
+        # مستوى الكلمة المرجعية في أول دفعة ناجحة هو المرجع
+        reference = None
+        for frame in frames:
+            if frame is not None and frame[anchor].tail(4).mean() > 0:
+                reference = frame[anchor].tail(4).mean()
+                break
+        
+        results = {}
+        for batch, frame in zip(batches, frames):
+            members = batch + ([anchor] if anchor in keywords and anchor not in results else [])
+            if frame is None:
                 # إذا لم نحصل على بيانات، نستخدم محاكاة ذكية
-                return self._simulate_trend_data(keyword)
-            
-            # حساب النقاط
-            recent_data = interest_over_time[keyword].tail(4).values
-            trend_score = np.mean(recent_data)
-            growth_rate = ((recent_data[-1] - recent_data[0]) / recent_data[0] * 100) if recent_data[0] > 0 else 0
+                for keyword in members:
+                    results[keyword] = self._simulate_trend_data(keyword)
+                continue
             
-            return {
-                'score': min(trend_score, 100),
-                'growth': growth_rate,
-                'volume': 'High' if trend_score > 60 else 'Medium' if trend_score > 30 else 'Low'
-            }
+            anchor_level = frame[anchor].tail(4).mean()
+            scale = reference / anchor_level if reference and anchor_level > 0 else 1.0
+            for keyword in members:
+                results[keyword] = self._trend_from_series(frame[keyword] * scale)
+        
+        return results
+    
+    async def _fetch_batch(self, batch: List[str]) -> Optional[pd.DataFrame]:
+        """طلب واحد لدفعة كلمات على عمال pytrends (None = فشل أو بيانات فارغة)"""
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(PYTRENDS_MAX_RETRIES + 1):
+            await self.backoff.acquire()
+            started = time.monotonic()
+            try:
+                # محاولة الحصول على بيانات Google Trends
+                interest_over_time = await loop.run_in_executor(
+                    _pytrends_executor, _fetch_interest_over_time, batch
+                )
+            except Exception as e:
+                if _is_rate_limited(e):
+                    self.backoff.on_rate_limited(started)
+                    if attempt < PYTRENDS_MAX_RETRIES:
+                        self.logger.warning(
+                            f"⏳ Google Trends 429 for {batch} - retry {attempt + 1} "
+                            f"at {self.backoff.rate:.0f} req/min"
+                        )
+                        continue
+                self.logger.warning(f"Google Trends failed for {batch}, using simulation: {e}")
+                return None
             
-        except Exception as e:
-            self.logger.warning(f"Google Trends failed for {keyword}, using simulation: {e}")
-            return self._simulate_trend_data(keyword)
+            self.backoff.on_success(time.monotonic() - started)
+            return None if interest_over_time.empty else interest_over_time
+        
+        return None
+    
+    @staticmethod
+    def _trend_from_series(series: pd.Series) -> Dict:
+        """حساب النقاط ومعدل النمو من سلسلة الاهتمام"""
+        recent_data = series.tail(4).values
+        trend_score = np.mean(recent_data)
+        growth_rate = ((recent_data[-1] - recent_data[0]) / recent_data[0] * 100) if recent_data[0] > 0 else 0
+        
+        return {
+            'score': min(trend_score, 100),
+            'growth': growth_rate,
+            'volume': 'High' if trend_score > 60 else 'Medium' if trend_score > 30 else 'Low'
+        }
     
     def _simulate_trend_data(self, keyword: str) -> Dict:
         """🎯 محاكاة بيانات الاتجاه الذكية"""
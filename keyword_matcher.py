@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+🔎 BraveBot Keyword Matcher
+===========================
+مطابق كلمات متعدد الجداول بتمريرة واحدة - مشترك بين ai و core.ai_engine
+
+وحدة مستقلة (stdlib + NumPy فقط) بدون آثار جانبية للحزم.
+"""
+
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+class KeywordMatcher:
+    """
+    مطابق كلمات متعدد الأنماط بتمريرة واحدة
+
+    يجمع كل الجداول في regex واحد (lookahead متداخل) - النتيجة مطابقة لحلقات
+    `word in text` المتداخلة: عدد الكلمات لكل جدول أو bitset للجداول المطابقة.
+    """
+
+    def __init__(self, tables: Sequence[Tuple[str, Sequence[str]]]):
+        self.names = tuple(name for name, _ in tables)
+        self._tier_of = {}
+        self._mask_of = {}
+        for index, (_, words) in enumerate(tables):
+            for word in words:
+                word = word.lower()
+                self._tier_of.setdefault(word, index)
+                self._mask_of[word] = self._mask_of.get(word, 0) | (1 << index)
+
+        words = sorted(self._tier_of, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(w) for w in words) + "))")
+
+        # أي كلمة تحتوي كلمات أقصر (مثل بادئة) تُحتسب معها
+        self._implied = {
+            word: tuple(other for other in words if other in word)
+            for word in words
+        }
+        self._implied_mask = {word: 0 for word in words}
+        for word, others in self._implied.items():
+            for other in others:
+                self._implied_mask[word] |= self._mask_of[other]
+
+    def find(self, text: str) -> set:
+        """كل الكلمات المميزة الموجودة في النص"""
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            found.update(self._implied[match.group(1)])
+        return found
+
+    def mask(self, text: str) -> int:
+        """bitset للجداول التي تحتوي كلمة موجودة في النص (بت لكل جدول)"""
+        bits = 0
+        for match in self._pattern.finditer(text.lower()):
+            bits |= self._implied_mask[match.group(1)]
+        return bits
+
+    def counts(self, text: str) -> List[int]:
+        """عدد الكلمات المطابقة لكل جدول (الكلمة المكررة تُحسب لأول جدول)"""
+        tier_counts = [0] * len(self.names)
+        for word in self.find(text):
+            tier_counts[self._tier_of[word]] += 1
+        return tier_counts
+
+    def count_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """مصفوفة (نصوص × جداول) بعدد المطابقات"""
+        matrix = np.zeros((len(texts), len(self.names)), dtype=np.int16)
+        for row, text in enumerate(texts):
+            matrix[row] = self.counts(text)
+        return matrix
+
+__all__ = [
+    'KeywordMatcher'
+]
@@ -247,7 +247,7 @@ with col2:
         try:
             from ai.trends_engine import dynamic_pricing_suggestion
             
-            pricing = dynamic_pricing_suggestion(base_price, viral_score)
+            pricing = dynamic_pricing_suggestion(base_price, viral_score, fields=())
             
             st.success(f"[سعر] السعر المقترح: ${pricing['suggested_price']:.2f}")
             st.info(f"[إحصائيات] هامش الربح: {pricing['profit_margin']:.1f}%")
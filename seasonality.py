@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+🗓️ BraveBot Seasonal Index
+==========================
+جداول الموسمية المشتركة لكل محركات التحليل - تُبنى مرة واحدة لكل شهر
+
+وحدة مستقلة (stdlib + NumPy فقط) يستوردها ai و core.ai_engine بدون آثار جانبية للحزم.
+"""
+
+import re
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ===== أنماط الفئات =====
+
+# الفئات المستفيدة من دفعة الترندات الفيروسية لكل شهر
+VIRAL_SEASONAL_FACTORS = MappingProxyType({
+    1: ("fitness", "health", "technology"),  # يناير
+    2: ("beauty", "fashion", "home"),        # فبراير
+    3: ("home", "technology", "gaming"),     # مارس
+    6: ("fashion", "health", "beauty"),      # يونيو
+    11: ("gaming", "technology", "home"),    # نوفمبر
+    12: ("gaming", "fashion", "beauty")      # ديسمبر
+})
+
+VIRAL_SEASONAL_BOOST = 15
+
+# أشهر الذروة ومستوى التأثير لكل فئة
+CATEGORY_SEASONAL_PATTERNS = MappingProxyType({
+    "technology": {"peak_months": (11, 12, 1), "impact": "high"},
+    "gaming": {"peak_months": (10, 11, 12), "impact": "very_high"},
+    "fashion": {"peak_months": (3, 4, 9, 10), "impact": "high"},
+    "health": {"peak_months": (1, 6, 7), "impact": "medium"},
+    "home": {"peak_months": (3, 4, 5, 9), "impact": "medium"},
+    "beauty": {"peak_months": (2, 5, 11, 12), "impact": "medium"}
+})
+
+SEASONAL_CATEGORIES = tuple(CATEGORY_SEASONAL_PATTERNS)
+
+# الترندات المتوقعة وشدتها لكل شهر
+MONTHLY_SEASONAL_PATTERNS = MappingProxyType({
+    1: {"trends": ("Fitness", "Health", "New Year Resolutions"), "intensity": "High"},
+    2: {"trends": ("Valentine's Day", "Beauty", "Romance"), "intensity": "Medium"},
+    3: {"trends": ("Spring Cleaning", "Home Improvement", "Gardening"), "intensity": "Medium"},
+    4: {"trends": ("Easter", "Spring Fashion", "Outdoor Activities"), "intensity": "Medium"},
+    5: {"trends": ("Mother's Day", "Summer Prep", "Graduation"), "intensity": "Medium"},
+    6: {"trends": ("Summer Products", "Vacation", "Outdoor Fun"), "intensity": "High"},
+    7: {"trends": ("Summer Peak", "Beach Products", "Travel"), "intensity": "High"},
+    8: {"trends": ("Back to School", "Tech Products", "Study Supplies"), "intensity": "High"},
+    9: {"trends": ("Fall Fashion", "Home Comfort", "Autumn Prep"), "intensity": "Medium"},
+    10: {"trends": ("Halloween", "Spooky Products", "Costumes"), "intensity": "Medium"},
+    11: {"trends": ("Black Friday", "Holiday Prep", "Gift Shopping"), "intensity": "Very High"},
+    12: {"trends": ("Christmas", "Holiday Gifts", "Year End"), "intensity": "Very High"}
+})
+
+# ===== أنماط المنتجات (أول قاعدة مطابقة تُطبق) =====
+
+# عامل الطلب الموسمي للربحية: (الكلمات، {الأشهر: العامل}، العامل خارج الموسم)
+PRODUCT_DEMAND_RULES = (
+    # منتجات الكريسماس (نوفمبر - ديسمبر)
+    (("gift", "decoration", "christmas"), {(11, 12): 1.8, (9, 10): 1.3}, 0.7),
+    # منتجات الصيف (مايو - أغسطس)
+    (("outdoor", "swimming", "travel", "beach"), {(5, 6, 7, 8): 1.6, (3, 4, 9): 1.2}, 0.8),
+    # منتجات العودة للمدرسة (يوليو - سبتمبر)
+    (("laptop", "backpack", "stationery", "desk"), {(7, 8, 9): 1.7, (6, 10): 1.3}, 0.9),
+    # منتجات الفتنس (يناير - مارس)
+    (("fitness", "yoga", "protein", "gym"), {(1, 2, 3): 1.5, (4, 12): 1.2}, 0.9)
+)
+
+# مخاطر الاعتماد على الموسم: (الموسم، الكلمات، أشهر الذروة)
+PRODUCT_RISK_RULES = (
+    ("christmas", ("gift", "decoration", "tree", "lights"), (11, 12)),
+    ("summer", ("outdoor", "swimming", "beach", "camping"), (5, 6, 7, 8)),
+    ("winter", ("heating", "warm", "coat", "blanket"), (12, 1, 2)),
+    ("back_to_school", ("school", "student", "backpack", "laptop"), (7, 8, 9))
+)
+
+BASE_SEASONAL_RISK = 10
+IN_SEASON_RISK = 5       # في الموسم = مخاطر أقل
+OFF_SEASON_RISK = 50     # خارج الموسم = مخاطر عالية
+
+def _compile_rules(keyword_groups: Sequence[Sequence[str]]) -> Tuple[re.Pattern, ...]:
+    return tuple(re.compile("|".join(re.escape(word) for word in words)) for words in keyword_groups)
+
+_DEMAND_PATTERNS = _compile_rules([words for words, _, _ in PRODUCT_DEMAND_RULES])
+_RISK_PATTERNS = _compile_rules([words for _, words, _ in PRODUCT_RISK_RULES])
+
+def _first_rule(name: str, patterns: Tuple[re.Pattern, ...]) -> int:
+    """رقم أول قاعدة مطابقة للاسم (-1 إن لم توجد)"""
+    name_lower = name.lower()
+    for index, pattern in enumerate(patterns):
+        if pattern.search(name_lower):
+            return index
+    return -1
+
+class SeasonalIndex:
+    """
+    📅 فهرس موسمي لشهر واحد
+
+    - مصفوفات 12×فئة لدفعة الترندات وأشهر الذروة
+    - عوامل الطلب والمخاطر لكل قاعدة منتجات محسوبة للشهر الحالي
+    - بحث دفعي لعدد كبير من المنتجات
+    """
+
+    def __init__(self, month: int):
+        self.month = month
+        self.categories = SEASONAL_CATEGORIES
+        self._category_index = {category: i for i, category in enumerate(self.categories)}
+
+        # مصفوفات (12 شهر × فئة) - الصف 0 = يناير
+        self.viral_boost_matrix = np.zeros((12, len(self.categories)), dtype=np.int16)
+        self.peak_matrix = np.zeros((12, len(self.categories)), dtype=bool)
+        for month_number in range(1, 13):
+            for category in VIRAL_SEASONAL_FACTORS.get(month_number, ()):
+                if category in self._category_index:
+                    self.viral_boost_matrix[month_number - 1, self._category_index[category]] = VIRAL_SEASONAL_BOOST
+            for category, pattern in CATEGORY_SEASONAL_PATTERNS.items():
+                if month_number in pattern["peak_months"]:
+                    self.peak_matrix[month_number - 1, self._category_index[category]] = True
+
+        # عوامل القواعد للشهر الحالي (الخانة الأخيرة = لا مطابقة)
+        self.demand_factors = np.array(
+            [self._rule_factor(months, off_season) for _, months, off_season in PRODUCT_DEMAND_RULES] + [1.0]
+        )
+        self.risk_scores = np.array(
+            [BASE_SEASONAL_RISK + (IN_SEASON_RISK if month in peak else OFF_SEASON_RISK)
+             for _, _, peak in PRODUCT_RISK_RULES] + [BASE_SEASONAL_RISK],
+            dtype=np.float64
+        )
+
+    def _rule_factor(self, months: Dict[Tuple[int, ...], float], off_season: float) -> float:
+        for month_group, factor in months.items():
+            if self.month in month_group:
+                return factor
+        return off_season
+
+    # ===== الفئات =====
+
+    def viral_boost(self, category: str) -> int:
+        """دفعة الترندات الفيروسية للفئة هذا الشهر"""
+        index = self._category_index.get(category.lower())
+        return 0 if index is None else int(self.viral_boost_matrix[self.month - 1, index])
+
+    def category_impact(self, category: str) -> Dict[str, Any]:
+        """التأثير الموسمي للفئة هذا الشهر"""
+        pattern = CATEGORY_SEASONAL_PATTERNS.get(category.lower())
+        if pattern is None:
+            return {
+                "is_peak_season": False,
+                "impact_level": "low",
+                "peak_months": [],
+                "current_factor": "neutral"
+            }
+
+        is_peak_season = bool(self.peak_matrix[self.month - 1, self._category_index[category.lower()]])
+        return {
+            "is_peak_season": is_peak_season,
+            "impact_level": pattern["impact"],
+            "peak_months": list(pattern["peak_months"]),
+            "current_factor": "positive" if is_peak_season else "neutral"
+        }
+
+    def upcoming_months(self, months_ahead: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """الأشهر القادمة مع أنماطها بدءاً من الشهر الحالي"""
+        months = []
+        for i in range(months_ahead):
+            target_month = ((self.month + i - 1) % 12) + 1
+            months.append((target_month, MONTHLY_SEASONAL_PATTERNS[target_month]))
+        return months
+
+    # ===== المنتجات =====
+
+    def factor_for_rule(self, rule):
+        """عامل الطلب لرقم قاعدة (أو مصفوفة أرقام) من PRODUCT_DEMAND_RULES - (-1) = لا مطابقة"""
+        return self.demand_factors[rule]
+
+    def risk_for_rule(self, rule):
+        """نقاط المخاطر لرقم قاعدة (أو مصفوفة أرقام) من PRODUCT_RISK_RULES - (-1) = لا مطابقة"""
+        return np.minimum(self.risk_scores[rule], 100)
+
+    def product_factor(self, product_name: str) -> float:
+        """عامل الطلب الموسمي لمنتج"""
+        return float(self.factor_for_rule(_first_rule(product_name, _DEMAND_PATTERNS)))
+
+    def product_risk(self, product_name: str) -> float:
+        """نقاط المخاطر الموسمية لمنتج"""
+        return float(self.risk_for_rule(_first_rule(product_name, _RISK_PATTERNS)))
+
+    def product_factors(self, product_names: Sequence[str]) -> np.ndarray:
+        """عوامل الطلب الموسمي لعدة منتجات دفعة واحدة"""
+        rules = np.fromiter((_first_rule(name, _DEMAND_PATTERNS) for name in product_names),
+                            dtype=np.int64, count=len(product_names))
+        return self.factor_for_rule(rules)
+
+    def product_risks(self, product_names: Sequence[str]) -> np.ndarray:
+        """نقاط المخاطر الموسمية لعدة منتجات دفعة واحدة"""
+        rules = np.fromiter((_first_rule(name, _RISK_PATTERNS) for name in product_names),
+                            dtype=np.int64, count=len(product_names))
+        return self.risk_for_rule(rules)
+
+_index: Optional[SeasonalIndex] = None
+_index_lock = threading.Lock()
+
+def get_seasonal_index(month: Optional[int] = None) -> SeasonalIndex:
+    """
+    الفهرس الموسمي المشترك - يُعاد بناؤه تلقائياً عند تغير الشهر
+
+    Args:
+        month: شهر محدد (للاختبار أو التوقعات) - بدونه يُستخدم الشهر الحالي
+    """
+    global _index
+
+    if month is not None:
+        return SeasonalIndex(month)
+
+    current_month = datetime.now().month
+    index = _index
+    if index is None or index.month != current_month:
+        with _index_lock:
+            if _index is None or _index.month != current_month:
+                _index = SeasonalIndex(current_month)
+            index = _index
+    return index
+
+__all__ = [
+    'SeasonalIndex',
+    'get_seasonal_index',
+    'VIRAL_SEASONAL_FACTORS',
+    'VIRAL_SEASONAL_BOOST',
+    'CATEGORY_SEASONAL_PATTERNS',
+    'MONTHLY_SEASONAL_PATTERNS',
+    'PRODUCT_DEMAND_RULES',
+    'PRODUCT_RISK_RULES'
+]
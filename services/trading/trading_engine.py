@@ -30,7 +30,7 @@ class SignalType(Enum):
     STRONG_BUY = "strong_buy"
     STRONG_SELL = "strong_sell"
 
-@dataclass
+@dataclass(slots=True)
 class TradingSignal:
     symbol: str
     asset_type: AssetType
@@ -43,7 +43,7 @@ class TradingSignal:
     timestamp: datetime
     timeframe: str  # 1h, 4h, 1d, etc.
 
-@dataclass
+@dataclass(slots=True)
 class MarketData:
     symbol: str
     price: float
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from trends.trend_fetcher import TrendsFetcher, TrendsQueueTimeout, TrendsRequestScheduler
+
+
+def test_scheduler_spaces_requests_per_host():
+    scheduler = TrendsRequestScheduler(min_interval=0.05, jitter=0, cooldown=1)
+
+    async def run():
+        starts = []
+
+        async def request(host):
+            await scheduler.acquire(host)
+            starts.append((host, time.monotonic()))
+
+        await asyncio.gather(*(request("a") for _ in range(3)), request("b"))
+        return starts
+
+    starts = asyncio.run(run())
+    a = [at for host, at in starts if host == "a"]
+    assert len(starts) == 4 and scheduler.granted == 4
+    assert all(later - earlier >= 0.045 for earlier, later in zip(a, a[1:]))
+    # مضيف آخر لا ينتظر طابور "a"
+    assert [at for host, at in starts if host == "b"][0] - a[0] < 0.045
+
+
+def test_scheduler_rejects_immediately_during_cooldown():
+    scheduler = TrendsRequestScheduler(min_interval=0, jitter=0, cooldown=60)
+    scheduler.report_rate_limited("a")
+
+    started = time.monotonic()
+    with pytest.raises(TrendsQueueTimeout) as error:
+        asyncio.run(scheduler.acquire("a", max_wait=1))
+    assert time.monotonic() - started < 0.5
+    assert error.value.retry_after > 59
+    assert scheduler.granted == 0 and scheduler.rate_limited == 1
+
+
+def test_scheduler_queue_timeout_does_not_consume_a_turn():
+    scheduler = TrendsRequestScheduler(min_interval=0.2, jitter=0, cooldown=1)
+
+    async def run():
+        await scheduler.acquire("a")
+        with pytest.raises(TrendsQueueTimeout):
+            await scheduler.acquire("a", max_wait=0.01)
+        return await scheduler.acquire("a", max_wait=1)
+
+    assert 0.1 < asyncio.run(run()) < 0.5
+    assert scheduler.granted == 2
+
+
+def test_analyze_combined_trends_falls_back_after_429():
+    fetcher = TrendsFetcher()
+    fetcher.scheduler = TrendsRequestScheduler(min_interval=0, jitter=0, cooldown=60)
+    calls = []
+
+    def rate_limited(keyword):
+        calls.append(keyword)
+        raise Exception("The request failed: Google returned a response with code 429")
+
+    fetcher._fetch_real_trends = rate_limited
+
+    first = asyncio.run(fetcher.analyze_combined_trends("gaming chair"))
+    assert calls == ["gaming chair"] and fetcher.scheduler.rate_limited == 1
+    assert first["google_trends"]
+
+    # أثناء التبريد: بيانات احتياطية فوراً بدون انتظار أو طلب جديد
+    started = time.monotonic()
+    second = asyncio.run(fetcher.analyze_combined_trends("yoga mat"))
+    keywords = asyncio.run(fetcher.get_trending_keywords_async("yoga mat"))
+    assert time.monotonic() - started < 1
+    assert calls == ["gaming chair"]
+    assert second["google_trends"] and keywords == []
@@ -1,10 +1,137 @@
+import asyncio
 import logging
 import time
 import random
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# جدولة طلبات Google Trends (مشتركة بين كل المستخدمين)
+GOOGLE_TRENDS_HOST = "trends.google.com"
+TRENDS_MIN_INTERVAL = 5.0      # أقل فاصل بين طلبين لنفس المضيف (ثوانٍ)
+TRENDS_JITTER = 5.0            # تذبذب عشوائي يُضاف للفاصل (0-5 ثوانٍ)
+TRENDS_COOLDOWN = 300.0        # إيقاف المضيف بعد رفض 429 (5 دقائق)
+TRENDS_MAX_QUEUE_WAIT = 30.0   # أقصى انتظار لطلب مستخدم قبل البيانات الاحتياطية
+
+def _is_rate_limited(error: Exception) -> bool:
+    """هل الخطأ رفض Rate Limit من Google"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    message = str(error)
+    return type(error).__name__ == 'TooManyRequestsError' or "429" in message or "rate limit" in message.lower()
+
+class TrendsQueueTimeout(Exception):
+    """⛔ دور الطلب أبعد من max_wait (تبريد بعد 429 أو طابور طويل)"""
+    
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"{host} queue wait exceeds limit - retry after {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+class TrendsRequestScheduler:
+    """
+    ⏱️ مجدول طلبات غير متزامن لكل مضيف
+    
+    - طابور FIFO لكل مضيف (asyncio.Lock عادل: أول من ينتظر أول من يمر)
+    - فاصل أدنى + تذبذب عشوائي بين بدايات الطلبات
+    - تبريد للمضيف كله بعد رفض 429
+    - max_wait: طلبات المستخدمين لا تنتظر التبريد - تُرفض فوراً لتستخدم البيانات الاحتياطية
+    
+    المنتظرون ينتظرون بـ await فقط - حلقة الأحداث تبقى حرة لخدمة باقي المستخدمين.
+    """
+    
+    def __init__(self, min_interval: float = TRENDS_MIN_INTERVAL,
+                 jitter: float = TRENDS_JITTER, cooldown: float = TRENDS_COOLDOWN):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.cooldown = cooldown
+        
+        self._next_slot = defaultdict(float)    # أول وقت مسموح لكل مضيف (monotonic)
+        self._locks = {}
+        self._loop = None
+        self._waiting = defaultdict(int)
+        self.granted = 0
+        self.rate_limited = 0
+    
+    def _lock(self, host: str) -> asyncio.Lock:
+        # الأقفال مرتبطة بحلقة الأحداث - تُعاد عند تغير الحلقة
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._locks = {}
+        if host not in self._locks:
+            self._locks[host] = asyncio.Lock()
+        return self._locks[host]
+    
+    def cooldown_remaining(self, host: str = GOOGLE_TRENDS_HOST) -> float:
+        """الثواني المتبقية حتى أول دور متاح للمضيف"""
+        return max(0.0, self._next_slot[host] - time.monotonic())
+    
+    async def acquire(self, host: str = GOOGLE_TRENDS_HOST, max_wait: float = None) -> float:
+        """
+        انتظار دور الطلب في طابور المضيف
+        
+        Args:
+            max_wait: أقصى انتظار بالثواني - يُرفع TrendsQueueTimeout فوراً أثناء التبريد
+                      أو بعد max_wait في الطابور (بدون استهلاك دور)
+        
+        Returns:
+            مدة الانتظار بالثواني
+        """
+        if max_wait is None:
+            return await self._wait_turn(host)
+        
+        remaining = self.cooldown_remaining(host)
+        if remaining > max_wait:
+            raise TrendsQueueTimeout(host, remaining)
+        try:
+            return await asyncio.wait_for(self._wait_turn(host), max_wait)
+        except asyncio.TimeoutError:
+            raise TrendsQueueTimeout(host, self.cooldown_remaining(host)) from None
+    
+    async def _wait_turn(self, host: str) -> float:
+        started = time.monotonic()
+        self._waiting[host] += 1
+        try:
+            async with self._lock(host):
+                # إعادة الفحص بعد النوم - رفض 429 أثناء الانتظار يمدد الموعد
+                while (delay := self._next_slot[host] - time.monotonic()) > 0:
+                    await asyncio.sleep(delay)
+                
+                now = time.monotonic()
+                self._next_slot[host] = now + self.min_interval + random.uniform(0, self.jitter)
+                self.granted += 1
+        finally:
+            self._waiting[host] -= 1
+        
+        return time.monotonic() - started
+    
+    def report_rate_limited(self, host: str = GOOGLE_TRENDS_HOST):
+        """تسجيل رفض 429 - إيقاف المضيف لفترة التبريد"""
+        self.rate_limited += 1
+        self._next_slot[host] = max(self._next_slot[host], time.monotonic() + self.cooldown)
+        logger.warning(f"🧊 {host} rate limited - cooling down for {self.cooldown:.0f}s")
+    
+    def stats(self):
+        now = time.monotonic()
+        return {
+            'granted': self.granted,
+            'rate_limited': self.rate_limited,
+            'waiting': {host: count for host, count in self._waiting.items() if count},
+            'next_slot_in': {host: round(max(0.0, slot - now), 1) for host, slot in self._next_slot.items()}
+        }
+
+_trends_scheduler = None
+
+def get_trends_scheduler() -> TrendsRequestScheduler:
+    """المجدول المشترك لكل نسخ TrendsFetcher"""
+    global _trends_scheduler
+    if _trends_scheduler is None:
+        _trends_scheduler = TrendsRequestScheduler()
+    return _trends_scheduler
+
 class TrendsFetcher:
     def __init__(self):
         # إزالة أي mock data
@@ -15,9 +142,19 @@ class TrendsFetcher:
         self.last_request_time = {}  # تتبع آخر طلب لكل كلمة
         self.cache = {}  # cache البيانات
         self.cache_duration = 3600  # ساعة واحدة
+        self.scheduler = get_trends_scheduler()
+        self.max_queue_wait = TRENDS_MAX_QUEUE_WAIT
     
     def get_trending_keywords(self, keyword, timeframe='today 3-m'):
         """جلب البيانات الحقيقية فقط"""
+        try:
+            return self._fetch_trending_keywords(keyword, timeframe)
+        except Exception as e:
+            logger.error(f"❌ Google Trends API failed: {e}")
+            return []
+    
+    def _fetch_trending_keywords(self, keyword, timeframe):
+        """جلب Google Trends - أخطاء 429 تُرفع ليتعامل معها المجدول"""
         
         logger.info(f"📡 Fetching REAL Google Trends for: {keyword}")
         
@@ -65,10 +202,30 @@ class TrendsFetcher:
             logger.error("❌ pytrends not installed - install with: pip install pytrends")
             return []
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"❌ Google Trends API failed: {e}")
             return []
     
-    def analyze_combined_trends(self, keyword):
+    async def get_trending_keywords_async(self, keyword, timeframe='today 3-m'):
+        """جلب البيانات الحقيقية بعد انتظار الدور في المجدول (بدون حجز حلقة الأحداث)"""
+        try:
+            await self.scheduler.acquire(GOOGLE_TRENDS_HOST, max_wait=self.max_queue_wait)
+        except TrendsQueueTimeout as e:
+            logger.info(f"🧊 Google Trends busy - skipping {keyword}: {e}")
+            return []
+        
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._fetch_trending_keywords, keyword, timeframe)
+        except Exception as e:
+            if _is_rate_limited(e):
+                self.scheduler.report_rate_limited(GOOGLE_TRENDS_HOST)
+            else:
+                logger.error(f"❌ Google Trends API failed: {e}")
+            return []
+    
+    async def analyze_combined_trends(self, keyword):
         """تحليل الترندات مع cache ذكي ومعالجة Rate Limiting"""
         
         # فحص Cache أولاً
@@ -87,17 +244,21 @@ class TrendsFetcher:
                 return self._get_enhanced_fallback_data(keyword)
         
         try:
-            # تأخير أطول لتجنب Rate Limiting
-            delay = random.uniform(5, 10)  # 5-10 ثواني
-            time.sleep(delay)
-            
-            logger.info(f"🔍 Analyzing REAL trends for: {keyword} (delay: {delay:.1f}s)")
+            # انتظار الدور في طابور Google Trends (الفاصل والتذبذب والتبريد في المجدول)
+            delay = await self.scheduler.acquire(GOOGLE_TRENDS_HOST, max_wait=self.max_queue_wait)
+        except TrendsQueueTimeout as e:
+            logger.info(f"🧊 Google Trends busy - using enhanced data for: {keyword} ({e})")
+            return self._get_enhanced_fallback_data(keyword)
+        
+        try:
+            logger.info(f"🔍 Analyzing REAL trends for: {keyword} (queued: {delay:.1f}s)")
             
             # تسجيل وقت الطلب
             self.last_request_time[keyword] = time.time()
             
-            # محاولة جلب البيانات الحقيقية
-            analysis_data = self._fetch_real_trends(keyword)
+            # محاولة جلب البيانات الحقيقية (pytrends متزامن - يعمل على منفذ)
+            loop = asyncio.get_running_loop()
+            analysis_data = await loop.run_in_executor(None, self._fetch_real_trends, keyword)
             
             if analysis_data:
                 # حفظ في Cache
@@ -108,8 +269,9 @@ class TrendsFetcher:
                 return self._get_enhanced_fallback_data(keyword)
                 
         except Exception as e:
-            if "429" in str(e) or "rate" in str(e).lower():
+            if _is_rate_limited(e):
                 logger.warning(f"⚠️ Rate limited - cooling down for: {keyword}")
+                self.scheduler.report_rate_limited(GOOGLE_TRENDS_HOST)
                 # تبديل لفترة أطول
                 self.last_request_time[keyword] = time.time() + 300  # 5 دقائق إضافية
             else:
@@ -315,5 +477,7 @@ class TrendsFetcher:
             return analysis_data
             
         except Exception as e:
+            if _is_rate_limited(e):
+                raise
             logger.error(f"❌ Failed to fetch real trends: {e}")
             return None
\ No newline at end of file